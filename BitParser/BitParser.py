@@ -1,20 +1,10 @@
 import binascii
+import threading
+from bisect import bisect_right
 from pprint import pprint, pformat
-from collections.abc import MutableMapping
-
-try:
-    from bitops import get_bit, ENDIANNESS
-except ModuleNotFoundError:
-    from enum import Enum
-
-    class ENDIANNESS(Enum):
-        LITTLE = "little"
-        BIG = "big"
-
-    def get_bit(value, bit_num, endiannes=ENDIANNESS.LITTLE):
-        if endiannes == ENDIANNESS.LITTLE:
-            bit_num = 7 - bit_num
-        return (value >> bit_num) & 1
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping, Sequence
+from types import MappingProxyType
 
 
 class Dict_Returning_Key_With_Value(MutableMapping):
@@ -49,187 +39,356 @@ class SameValueRange():
     def __init__(self, range_start, range_end, number_of_bits, value, return_value_instead_of_name=False):
         self.__return_value_instead_of_name = return_value_instead_of_name
 
-        if number_of_bits < 1 and number_of_bits > 8:
-            raise AssertionError(f"Wrong number of bits passed: {number_of_bits}")
+        if number_of_bits < 1:
+            raise ValueError(f"Wrong number of bits passed: {number_of_bits}")
+        if range_start < 0 or range_end >= 1 << number_of_bits:
+            raise ValueError(f"Range {range_start}..{range_end} does not fit in {number_of_bits} bits")
 
-        self.__generated_range_descriptor = Dict_Returning_Key_With_Value({f"{flag_value:b}".zfill(number_of_bits):value for flag_value in range(range_start, range_end+1)})
+        self.range_start = range_start
+        self.range_end = range_end
+        self.number_of_bits = number_of_bits
+        self.value = value
+        # the bit-string dict is only built for callers of get_dict(); parsers use segment()
+        self.__generated_range_descriptor = None
+
+    def __repr__(self):
+        return f"SameValueRange({self.range_start}, {self.range_end}, {self.number_of_bits}, {self.value!r})"
+
+    def segment(self):
+        """Returns the range as one (start, end, label, with_value) value table segment."""
+        return (self.range_start, self.range_end, self.value, self.__return_value_instead_of_name)
 
     def get_dict(self):
+        if self.__generated_range_descriptor is None:
+            self.__generated_range_descriptor = Dict_Returning_Key_With_Value({f"{flag_value:b}".zfill(self.number_of_bits):self.value for flag_value in range(self.range_start, self.range_end+1)})
         if self.__return_value_instead_of_name:
             self.__generated_range_descriptor.enable_return_value_instead_of_name()
         return self.__generated_range_descriptor
 
 
+def _overlay_segments(old, new):
+    """Overlays two sorted lists of disjoint (start, end, label, with_value) segments; new ones win where they overlap."""
+    if not old:
+        return list(new)
+    result = []
+    position = 0
+    for start, end, label, with_value in old:
+        while position < len(new) and new[position][1] < start:
+            position += 1
+        current = start
+        covering = position
+        while covering < len(new) and new[covering][0] <= end:
+            if new[covering][0] > current:
+                result.append((current, new[covering][0] - 1, label, with_value))
+            current = max(current, new[covering][1] + 1)
+            covering += 1
+        if current <= end:
+            result.append((current, end, label, with_value))
+    result.extend(new)
+    result.sort(key=lambda segment: segment[0])
+    return result
+
+
+def _merge_segments(segments):
+    """Joins adjacent segments with the same label, so equal value tables have equal segments whatever their sources."""
+    merged = []
+    for segment in segments:
+        if merged and merged[-1][1] + 1 == segment[0] and merged[-1][2:] == segment[2:]:
+            merged[-1] = (merged[-1][0], segment[1], segment[2], segment[3])
+        else:
+            merged.append(segment)
+    return merged
+
+
+class _Undefined():
+    """Marks values without a label in dense value tables."""
+
+    def __reduce__(self):
+        # pickles as a reference to the module singleton, so identity checks survive other processes
+        return "_UNDEFINED"
+
+    def __repr__(self):
+        return "<undefined>"
+
+
+_UNDEFINED = _Undefined()
+
+VALUE_TABLE_DENSE_BITS = 10
+
+
+class ValueTable():
+    """Labels of a multi-bit field indexed by the field value.
+
+    Kept as sorted (start, end, label, with_value) ranges, so a wide range costs one entry;
+    with_value ranges label each value as "label: value". Fields of up to
+    VALUE_TABLE_DENSE_BITS bits are also expanded into a tuple of 2**n labels, making a
+    lookup a single index operation. Wider fields are looked up by bisecting the ranges.
+    """
+
+    def __init__(self, num_bits, segments, dense=True):
+        self.num_bits = num_bits
+        self.segments = tuple(segments)
+        self._starts = [segment[0] for segment in self.segments]
+        self._count = sum(end - start + 1 for start, end, _, _ in self.segments)
+        self._label_index = None
+        self.dense = self._expand() if dense and num_bits <= VALUE_TABLE_DENSE_BITS else None
+
+    def _expand(self):
+        table = [_UNDEFINED] * (1 << self.num_bits)
+        for start, end, label, with_value in self.segments:
+            if with_value:
+                table[start:end + 1] = [f"{label}: {value}" for value in range(start, end + 1)]
+            else:
+                table[start:end + 1] = [label] * (end - start + 1)
+        return tuple(table)
+
+    def lookup(self, value):
+        """Returns the label of value, or _UNDEFINED."""
+        if self.dense is not None:
+            return self.dense[value] if 0 <= value < len(self.dense) else _UNDEFINED
+        position = bisect_right(self._starts, value) - 1
+        if position >= 0:
+            start, end, label, with_value = self.segments[position]
+            if value <= end:
+                return f"{label}: {value}" if with_value else label
+        return _UNDEFINED
+
+    def __getitem__(self, value):
+        label = self.lookup(value)
+        if label is _UNDEFINED:
+            raise KeyError(value)
+        return label
+
+    def get(self, value, default=None):
+        label = self.lookup(value)
+        return default if label is _UNDEFINED else label
+
+    def __contains__(self, value):
+        return self.lookup(value) is not _UNDEFINED
+
+    def __len__(self):
+        """Number of values that have a label."""
+        return self._count
+
+    def items(self):
+        """Yields (value, label) for every defined value in ascending order."""
+        for start, end, label, with_value in self.segments:
+            for value in range(start, end + 1):
+                yield value, f"{label}: {value}" if with_value else label
+
+    def weighted_labels(self, unique=False):
+        """Returns [(label, count)] for name inference; with_value ranges appear once, weighted by their size."""
+        weighted = {}
+        for start, end, label, with_value in self.segments:
+            if with_value:
+                weighted[f"{label}: {start}"] = end - start + 1
+            elif unique:
+                weighted[label] = 1
+            else:
+                weighted[label] = weighted.get(label, 0) + end - start + 1
+        return list(weighted.items())
+
+    def find(self, label):
+        """Returns up to two values labelled label (two meaning the label is ambiguous)."""
+        if self._label_index is None:
+            plain = {}
+            with_value = {}
+            for start, end, segment_label, is_with_value in self.segments:
+                if is_with_value:
+                    with_value.setdefault(segment_label, []).append((start, end))
+                else:
+                    plain.setdefault(segment_label, []).extend(range(start, min(end, start + 1) + 1))
+            self._label_index = (plain, with_value)
+        plain, with_value = self._label_index
+
+        values = list(plain.get(label, ()))[:2]
+        if isinstance(label, str) and ": " in label:
+            prefix, _, number = label.rpartition(": ")
+            if prefix in with_value and number.isdigit() and str(int(number)) == number:
+                value = int(number)
+                values.extend(value for start, end in with_value[prefix] if start <= value <= end)
+        return sorted(values)[:2]
+
+
 class MultiBitValueParser():
+    # explicit field name (None: inferred from the labels) and whether describe lists every value
+    field_name = None
+    enumerable = True
 
     def __init__(self, *resultEvaluationDicts):
-        self.evaluator = {}
+        self._sources = resultEvaluationDicts
+        self._evaluator = None
+        self.bad_keys = []
 
+        num_bits = None
+        segments = []
         for resultEvaluationDict in resultEvaluationDicts:
             if isinstance(resultEvaluationDict, SameValueRange):
-                self.evaluator = {**self.evaluator, **resultEvaluationDict.get_dict()}
+                if resultEvaluationDict.range_start > resultEvaluationDict.range_end:
+                    continue
+                if num_bits is None:
+                    num_bits = resultEvaluationDict.number_of_bits
+                elif resultEvaluationDict.number_of_bits != num_bits:
+                    # reported like keys of the wrong width, instead of relabelling the field
+                    self.bad_keys.append(resultEvaluationDict)
+                    continue
+                new = [resultEvaluationDict.segment()]
             else:
-                self.evaluator = {**self.evaluator, **resultEvaluationDict}
+                if not resultEvaluationDict:
+                    continue
+                if num_bits is None:
+                    num_bits = len(next(iter(resultEvaluationDict)))
+                new = []
+                for key, label in resultEvaluationDict.items():
+                    # keys of a different width can never be assembled from numOfElements bits
+                    if len(key) != num_bits or not set(key) <= {"0", "1"}:
+                        self.bad_keys.append(key)
+                        continue
+                    value = int(key, 2)
+                    new.append((value, value, label, False))
+                new.sort(key=lambda segment: segment[0])
+            segments = _overlay_segments(segments, new)
+
+        if num_bits is None:
+            raise ValueError("MultiBitValueParser needs at least one value")
 
         self.bytesAssembled = ""
-        self.numOfElements = len(list(self.evaluator.keys())[0])
+        self.numOfElements = num_bits
         self.numOfElementsMissing = self.numOfElements
-
+        self.value_table = ValueTable(num_bits, _merge_segments(segments))
+
+    @property
+    def evaluator(self):
+        """Read-only view of the merged bit-string -> label dict, built on first access.
+
+        Parsing uses the value table built by the constructor, so writing to this mapping
+        raises TypeError; create a new parser to change the labels.
+        """
+        if self._evaluator is None:
+            evaluator = {}
+            for resultEvaluationDict in self._sources:
+                if isinstance(resultEvaluationDict, SameValueRange):
+                    evaluator = {**evaluator, **resultEvaluationDict.get_dict()}
+                else:
+                    evaluator = {**evaluator, **resultEvaluationDict}
+            self._evaluator = MappingProxyType(evaluator)
+        return self._evaluator
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_evaluator"] = None
+        return state
+
+    def evaluate(self, value_int):
+        """Returns the label for an assembled field value. Pure function, safe to share between threads."""
+        dense = self.value_table.dense
+        if dense is not None and 0 <= value_int < len(dense):
+            label = dense[value_int]
+        else:
+            label = self.value_table.lookup(value_int)
+        if label is _UNDEFINED:
+            raise KeyError(format(value_int, f"0{self.numOfElements}b"))
+        return label
 
     def __call__(self, value):
+        # Kept for callers feeding bits one by one; the parse functions use evaluate() and keep no state here
         if(self.numOfElementsMissing == 0):
-            self.numOfElementsMissing = len(list(self.evaluator.keys())[0])
+            self.numOfElementsMissing = self.numOfElements
             self.bytesAssembled = ""
         self.numOfElementsMissing -= 1
         self.bytesAssembled = self.bytesAssembled + value
 
         if(self.numOfElementsMissing == 0):
-            return self.evaluator[self.bytesAssembled]
+            bytesAssembled = self.bytesAssembled
+            self.bytesAssembled = ""
+            return self.evaluate(int(bytesAssembled, 2))
         else:
             return None
 
+class IntField(MultiBitValueParser):
+    """Integer field of any width, decoded with a single shift and mask.
+
+    Used like MultiBitValueParser: the same instance is repeated num_bits times in the
+    descriptor list, and the bits may span bytes. Every value is valid. labels names some
+    of them, as a dict {value: label}, a list of (start, end, label) ranges or a callable
+    value -> label; other values are labelled "name: value". Nothing is expanded per
+    value, so a 24-bit counter costs no more than a 4-bit one.
+    """
+    enumerable = False
+
+    def __init__(self, num_bits, name, labels=None):
+        if num_bits < 1:
+            raise ValueError(f"Wrong number of bits passed: {num_bits}")
+        self.field_name = name
+        self._sources = ()
+        self._evaluator = None
+        self.bad_keys = []
+        self.bytesAssembled = ""
+        self.numOfElements = num_bits
+        self.numOfElementsMissing = num_bits
+        self._label_function = labels if callable(labels) else None
+
+        max_value = (1 << num_bits) - 1
+        segments = [(0, max_value, name, True)]
+        if labels is not None and self._label_function is None:
+            if isinstance(labels, Mapping):
+                labels = [(value, value, label) for value, label in labels.items()]
+            for start, end, label in labels:
+                if start < 0 or end > max_value or start > end:
+                    raise ValueError(f"Range {start}..{end} does not fit in {num_bits} bits")
+                segments = _overlay_segments(segments, [(start, end, label, False)])
+        self.value_table = ValueTable(num_bits, _merge_segments(segments), dense=self._label_function is None)
+
+    def evaluate(self, value_int):
+        if self._label_function is not None and 0 <= value_int < 1 << self.numOfElements:
+            return self._label_function(value_int)
+        return super().evaluate(value_int)
+
+
 def pairwise(iterable):
     "s -> (s0, s1), (s2, s3), (s4, s5), ..."
     a = iter(iterable)
     return zip(a, a)
 
 
-def parse_bits_binary(bytes, descriptors: list) -> str:
-    bitFieldDescriptorLength = len(descriptors)
-
-    if bitFieldDescriptorLength % 8 != 0:
-        raise ValueError(f"Descriptor length ({bitFieldDescriptorLength}) is not divisible by 8!")
-
-    bytes_len = len(bytes)
-
-    if bytes_len != bitFieldDescriptorLength // 8:
-        raise ValueError(f"bytesStr length ({bytes_len}) does not correspond to descriptors list length ({bitFieldDescriptorLength // 8})")
-
-    results = []
-    for byteNum, byte in enumerate(bytes):
-        for bitNum in range(0, 8):
-            bit = get_bit(byte, bitNum, endiannes=ENDIANNESS.LITTLE)
-            if isinstance(descriptors[byteNum * 8 + bitNum], MultiBitValueParser):
-                ret = descriptors[byteNum * 8 + bitNum](str(bit))
-                if ret != None:
-                    results.append(ret)
-            else:
-                if bit == 1:
-                    results.append(descriptors[byteNum * 8 + bitNum])
-
-    return results
-
-
-def parse_bits(bytes, descriptors: list) -> str:
-    if isinstance(bytes, str):  # hexadecimal string is supported (like "001122AAEEFF"
-        return parse_bits_binary(binascii.unhexlify(bytes), descriptors)
-    else:
-        return parse_bits_binary(bytes, descriptors)
-
-
-def parse_bits_binary_full(bytes, descriptors: list) -> list:
-    bitFieldDescriptorLength = len(descriptors)
-
-    if bitFieldDescriptorLength % 8 != 0:
-        raise ValueError(f"Descriptor length ({bitFieldDescriptorLength}) is not divisible by 8!")
-
-    bytes_len = len(bytes)
+def parse_bits_binary(bytes, descriptors: list, offset=None, input_format=None) -> str:
+    return _cached_layout(descriptors).parse(bytes, offset, input_format)
 
-    if bytes_len != bitFieldDescriptorLength // 8:
-        raise ValueError(f"bytesStr length ({bytes_len}) does not correspond to descriptors list length ({bitFieldDescriptorLength // 8})")
 
-    results = []
-    multibit_states = {}
-    next_group_id = 0
+def parse_bits(bytes, descriptors: list, offset=None, input_format=None) -> str:
+    return _cached_layout(descriptors).parse(bytes, offset, input_format)
 
-    for byteNum, byte in enumerate(bytes):
-        for bitNum in range(0, 8):
-            descriptor_index = byteNum * 8 + bitNum
-            descriptor = descriptors[descriptor_index]
-            bit = get_bit(byte, bitNum, endiannes=ENDIANNESS.LITTLE)
 
-            if isinstance(descriptor, MultiBitValueParser):
-                state = multibit_states.get(descriptor)
-                if state is None:
-                    state = {
-                        "group_id": None,
-                        "pending_entries": [],
-                        "pending_bits": [],
-                        "pending_indices": [],
-                    }
-                    multibit_states[descriptor] = state
-
-                if not state["pending_bits"]:
-                    state["group_id"] = next_group_id
-                    next_group_id += 1
+def parse_bits_binary_full(bytes, descriptors: list, offset=None, lazy=False, input_format=None) -> list:
+    return _cached_layout(descriptors).parse_full(bytes, offset, lazy, input_format)
 
-                group_bit_index = len(state["pending_bits"])
-                entry = {
-                    "kind": "bit",
-                    "label": None,
-                    "enabled": bit == 1,
-                    "raw_bit": bit,
-                    "byte_index": byteNum,
-                    "bit_index": bitNum,
-                    "descriptor_index": descriptor_index,
-                    "group_id": state["group_id"],
-                    "group_bit_index": group_bit_index,
-                    "group_label": None,
-                }
-                results.append(entry)
-                state["pending_entries"].append(len(results) - 1)
-                state["pending_bits"].append(str(bit))
-                state["pending_indices"].append(descriptor_index)
-
-                ret = descriptor(str(bit))
-                if ret is not None:
-                    raw_bits = "".join(state["pending_bits"])
-                    summary_entry = {
-                        "kind": "multi_bit",
-                        "label": ret,
-                        "enabled": True,
-                        "raw_bits": raw_bits,
-                        "value_int": int(raw_bits, 2),
-                        "group_id": state["group_id"],
-                        "descriptor_indices": state["pending_indices"],
-                    }
-                    results.append(summary_entry)
-                    summary_index = len(results) - 1
 
-                    for entry_index in state["pending_entries"]:
-                        results[entry_index]["group_label"] = ret
-                        results[entry_index]["summary_index"] = summary_index
+def parse_bits_full(bytes, descriptors: list, offset=None, lazy=False, input_format=None) -> list:
+    return _cached_layout(descriptors).parse_full(bytes, offset, lazy, input_format)
 
-                    state["pending_entries"] = []
-                    state["pending_bits"] = []
-                    state["pending_indices"] = []
-            else:
-                results.append({
-                    "kind": "bit",
-                    "label": descriptor,
-                    "enabled": bit == 1,
-                    "raw_bit": bit,
-                    "byte_index": byteNum,
-                    "bit_index": bitNum,
-                    "descriptor_index": descriptor_index,
-                })
+def parse_int(value, descriptors: list, width_bytes=None) -> list:
+    """parse_bits() for a payload given as an int: the payload bytes read as one word in the layout's byte_order.
 
-    return results
+    With the default bit_order="msb" descriptor 0 is the most significant bit of that word;
+    with bit_order="lsb" descriptor i is bit i. Plain descriptor lists use the defaults.
+    """
+    layout = _cached_layout(descriptors)
+    if width_bytes is not None:
+        layout._check_length(width_bytes)
+    return layout._parse_value(layout._formatted_to_int(value, None, "int"))
 
 
-def parse_bits_full(bytes, descriptors: list) -> list:
-    if isinstance(bytes, str):  # hexadecimal string is supported (like "001122AAEEFF"
-        return parse_bits_binary_full(binascii.unhexlify(bytes), descriptors)
-    else:
-        return parse_bits_binary_full(bytes, descriptors)
+def _infer_multibit_name(labels):
+    return _infer_multibit_name_weighted([(label, 1) for label in labels])
 
 
-def _infer_multibit_name(labels):
-    if not labels:
+def _infer_multibit_name_weighted(weighted_labels):
+    """_infer_multibit_name() over (label, count) pairs, so a range of values is not expanded."""
+    if not weighted_labels:
         return None
 
-    colon_prefixes = [label.split(": ", 1)[0] for label in labels if ": " in label]
-    if colon_prefixes and len(colon_prefixes) == len(labels):
+    colon_prefixes = [label.split(": ", 1)[0] for label, _ in weighted_labels if ": " in label]
+    if colon_prefixes and len(colon_prefixes) == len(weighted_labels):
         unique_prefixes = set(colon_prefixes)
         if len(unique_prefixes) == 1:
             return colon_prefixes[0]
@@ -252,19 +411,15 @@ def _infer_multibit_name(labels):
 
         return None
 
-    candidates = []
-    for label in labels:
+    counts = {}
+    for label, count in weighted_labels:
         candidate = candidate_from_label(label)
         if candidate:
-            candidates.append(candidate)
+            counts[candidate] = counts.get(candidate, 0) + count
 
-    if not candidates:
+    if not counts:
         return None
 
-    counts = {}
-    for candidate in candidates:
-        counts[candidate] = counts.get(candidate, 0) + 1
-
     sorted_candidates = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
     if len(sorted_candidates) > 1 and sorted_candidates[0][1] == sorted_candidates[1][1]:
         return None
@@ -295,279 +450,1238 @@ def _parse_label_address(label, byte_length):
     if byte_index >= byte_length:
         raise ValueError(f"Byte index {byte_index} out of range for {byte_length} bytes")
 
+    # the descriptor index under the default bit and byte order; layouts map it through _column_to_index
     descriptor_index = byte_index * 8 + (7 - bit_number)
     return base, descriptor_index
 
 
 def describe_bits(descriptors: list) -> dict:
-    bitFieldDescriptorLength = len(descriptors)
-
-    if bitFieldDescriptorLength % 8 != 0:
-        raise ValueError(f"Descriptor length ({bitFieldDescriptorLength}) is not divisible by 8!")
-
-    multibit_groups = {}
-    for index, descriptor in enumerate(descriptors):
-        if isinstance(descriptor, MultiBitValueParser):
-            multibit_groups.setdefault(descriptor, {"indices": [], "first_index": index})
-            multibit_groups[descriptor]["indices"].append(index)
-
-    group_items = sorted(multibit_groups.items(), key=lambda item: item[1]["first_index"])
-    group_info = {}
-    index_to_group = {}
-    for group_id, (parser, info) in enumerate(group_items):
-        indices = info["indices"]
-        num_bits = parser.numOfElements
-        if len(indices) != num_bits:
+    return _cached_layout(descriptors).describe()
+
+
+def encode_bits(enabled_labels, descriptors: list, values=None, output_format="hex") -> str:
+    # the layout keeps its encoder, so labels resolved by one call are reused by the next
+    return _cached_layout(descriptors).encode(enabled_labels, values, output_format)
+
+
+def encode_int(enabled_labels, descriptors: list, values=None) -> int:
+    """encode_bits() returning the payload as an int."""
+    return _cached_layout(descriptors).encode(enabled_labels, values, "int")
+
+
+class _MultiBitGroup():
+    """One occurrence of a MultiBitValueParser inside a descriptor list."""
+
+    def __init__(self, group_id, parser):
+        self.group_id = group_id
+        self.parser = parser
+        self.num_bits = parser.numOfElements
+        self.indices = []
+        self.encode_name = None
+        self._name = _UNDEFINED
+        self._values = None
+
+    def analyse(self):
+        # encode_bits has always inferred the field name from unique labels only,
+        # which can differ from describe_bits when labels repeat
+        self.encode_name = self.parser.field_name or _infer_multibit_name_weighted(self.parser.value_table.weighted_labels(unique=True))
+
+    @property
+    def name(self):
+        """Field name as reported by describe_bits."""
+        if self._name is _UNDEFINED:
+            self._name = self.parser.field_name or _infer_multibit_name_weighted(self.parser.value_table.weighted_labels())
+        return self._name
+
+    @property
+    def values(self):
+        """(value_int, bit_string, label) for every defined value, sorted by value."""
+        if self._values is None:
+            # fields that accept every value are described by their ranges only
+            self._values = [
+                (value_int, format(value_int, f"0{self.num_bits}b"), label)
+                for value_int, label in self.parser.value_table.items()
+            ] if self.parser.enumerable else []
+        return self._values
+
+    def compile_extraction(self, shifts):
+        """Turns the group bit positions into (shift, mask, value shift) runs over the payload int.
+
+        The most significant payload bit of the group is the most significant value bit, so
+        with the default bit order the first descriptor is the MSB of the value.
+        """
+        runs = []
+        by_significance = sorted(range(self.num_bits), key=lambda group_bit_index: -shifts[self.indices[group_bit_index]])
+        self.targets = [None] * self.num_bits
+        for rank, group_bit_index in enumerate(by_significance):
+            self.targets[group_bit_index] = self.num_bits - 1 - rank
+        for group_bit_index in by_significance:
+            target = self.targets[group_bit_index]
+            source = shifts[self.indices[group_bit_index]]
+            if runs and runs[-1][0] == source + 1 and runs[-1][2] == target + 1:
+                runs[-1] = (source, (runs[-1][1] << 1) | 1, target)
+            else:
+                runs.append((source, 1, target))
+        self.runs = runs
+        if len(runs) == 1:
+            self.shift, self.mask = runs[0][0], runs[0][1]
+        else:
+            self.shift, self.mask = -1, 0
+
+    def place(self, value_int):
+        """Inverse of extract(): moves a field value to its bit positions in the payload int."""
+        result = 0
+        for shift, mask, target in self.runs:
+            result |= ((value_int >> target) & mask) << shift
+        return result
+
+    def extract(self, value):
+        if self.shift >= 0:
+            return (value >> self.shift) & self.mask
+        result = 0
+        for shift, mask, target in self.runs:
+            result |= ((value >> shift) & mask) << target
+        return result
+
+
+LUT_MAX_TABLES = 64
+# accepted by the input_format / output_format options; None as input_format keeps the
+# historical behaviour (str is hex, anything else is a bytes-like buffer)
+INPUT_FORMATS = ("hex", "bytes", "bytearray", "int")
+OUTPUT_FORMATS = ("hex", "bytes", "bytearray", "int")
+BIT_ORDERS = ("msb", "lsb")
+BYTE_ORDERS = ("big", "little")
+
+
+class CompiledLayout():
+    """Descriptor list analysed once, ready to be used for any number of parse/encode calls.
+
+    Results are identical to parse_bits, parse_bits_full, encode_bits and describe_bits
+    called with the same descriptors.
+
+    byte_order ("big" or "little") says how the payload bytes form one integer word and
+    bit_order says which word bit each descriptor names: "msb" (default) lists the most
+    significant bit first, "lsb" makes descriptor i bit i of the word. Both are resolved
+    into the shift table once. 'label:byte:bit' addresses and the byte_index/bit_index of
+    parse_full/describe always refer to payload bytes and the bit's position in its byte.
+    """
+
+    def __init__(self, descriptors: list, lut_max_tables=LUT_MAX_TABLES, bit_order="msb", byte_order="big"):
+        if bit_order not in BIT_ORDERS:
+            raise ValueError(f"Unknown bit_order '{bit_order}', expected one of {', '.join(BIT_ORDERS)}")
+        if byte_order not in BYTE_ORDERS:
+            raise ValueError(f"Unknown byte_order '{byte_order}', expected one of {', '.join(BYTE_ORDERS)}")
+        self.bit_order = bit_order
+        self.byte_order = byte_order
+        descriptors = tuple(descriptors)
+        bitFieldDescriptorLength = len(descriptors)
+
+        if bitFieldDescriptorLength % 8 != 0:
+            raise ValueError(f"Descriptor length ({bitFieldDescriptorLength}) is not divisible by 8!")
+
+        self.descriptors = descriptors
+        self.bit_length = bitFieldDescriptorLength
+        self.byte_length = bitFieldDescriptorLength // 8
+
+        groups = []
+        filling = {}
+        occurrences = {}
+        index_to_group = [None] * bitFieldDescriptorLength
+        single_label_positions = {}
+        for index, descriptor in enumerate(descriptors):
+            if isinstance(descriptor, MultiBitValueParser):
+                occurrences[descriptor] = occurrences.get(descriptor, 0) + 1
+                group = filling.get(descriptor)
+                if group is None:
+                    group = _MultiBitGroup(len(groups), descriptor)
+                    groups.append(group)
+                    filling[descriptor] = group
+                index_to_group[index] = (group, len(group.indices))
+                group.indices.append(index)
+                if len(group.indices) == group.num_bits:
+                    del filling[descriptor]
+            else:
+                try:
+                    single_label_positions.setdefault(descriptor, []).append(index)
+                except TypeError:
+                    # unhashable labels still parse; encode cannot look them up
+                    pass
+
+        for parser in filling:
             raise ValueError(
-                f"MultiBitValueParser expects {num_bits} bits but appears {len(indices)} times in descriptors"
+                f"MultiBitValueParser expects {parser.numOfElements} bits but appears {occurrences[parser]} times in descriptors"
             )
 
-        labels = [label for _, label in parser.evaluator.items()]
-        name = _infer_multibit_name(labels)
-        values = [
-            {
-                "bits": bit_string,
-                "label": label,
-                "value_int": int(bit_string, 2),
-            }
-            for bit_string, label in parser.evaluator.items()
-        ]
-        values.sort(key=lambda entry: entry["value_int"])
-
-        group_entry = {
-            "group_id": group_id,
-            "name": name,
-            "num_bits": num_bits,
-            "descriptor_indices": indices,
-            "values": values,
-        }
-        group_info[parser] = group_entry
-        for group_bit_index, descriptor_index in enumerate(indices):
-            index_to_group[descriptor_index] = {
+        # A parser reused for several fields parses fine, but describe/encode need one field per parser
+        self._schema_error = None
+        for parser, count in occurrences.items():
+            if count != parser.numOfElements:
+                self._schema_error = (
+                    f"MultiBitValueParser expects {parser.numOfElements} bits but appears {count} times in descriptors"
+                )
+                break
+
+        self.groups = groups
+        self._index_to_group = index_to_group
+        self._single_label_positions = single_label_positions
+        self._name_to_groups = None
+        self._label_groups = None
+        self._prefix_groups = None
+        self._encoder = None
+        self._full_positions = None
+        self._shift_owners = None
+        self._report = None
+        # the payload is read as one int in byte_order; shifts[i] is the bit of that int named by descriptor i
+        if bit_order == "msb":
+            shifts = [bitFieldDescriptorLength - 1 - index for index in range(bitFieldDescriptorLength)]
+        else:
+            shifts = list(range(bitFieldDescriptorLength))
+        for group in groups:
+            group.compile_extraction(shifts)
+        self._shifts = shifts
+        # column of each descriptor bit in the matrix produced by unpacking the payload bytes MSB-first,
+        # i.e. 8 * payload byte + position in the byte counted from its MSB
+        if byte_order == "big":
+            self._bit_columns = [bitFieldDescriptorLength - 1 - shift for shift in shifts]
+        else:
+            self._bit_columns = [(shift // 8) * 8 + 7 - shift % 8 for shift in shifts]
+        self._column_to_index = [0] * bitFieldDescriptorLength
+        for index, column in enumerate(self._bit_columns):
+            self._column_to_index[column] = index
+
+        # parse() emits labels in descriptor order; a multi-bit value is emitted at its last bit.
+        # Multi-bit entries carry the dense label tuple (or None) in the label slot.
+        index_plan = [None] * bitFieldDescriptorLength
+        for index, (descriptor, shift, group_ref) in enumerate(zip(descriptors, shifts, index_to_group)):
+            if group_ref is None:
+                index_plan[index] = (1 << shift, descriptor, 0, None)
+            else:
+                group, group_bit_index = group_ref
+                if group_bit_index == group.num_bits - 1:
+                    index_plan[index] = (group.mask, group.parser.value_table.dense, group.shift, group)
+        self._parse_plan = [entry for entry in index_plan if entry is not None]
+
+        # Bytes made only of single-bit flags are parsed with a 256-entry table per byte position
+        # (byte value -> tuple of labels); the tables are created and filled on first use.
+        # Other bytes, and flag bytes beyond lut_max_tables, use the mask-and-shift plan.
+        self.lut_max_tables = lut_max_tables
+        segments = []
+        lut_positions = []
+        for byteNum in range(self.byte_length):
+            first = byteNum * 8
+            byte_shifts = shifts[first:first + 8]
+            int_byte = self.byte_length - 1 - byte_shifts[0] // 8
+            pure = not any(index_to_group[first:first + 8]) and all(
+                shift // 8 == byte_shifts[0] // 8 for shift in byte_shifts
+            )
+            if pure and len(lut_positions) < lut_max_tables:
+                segments.append((len(lut_positions), int_byte, None))
+                lut_positions.append(first)
+            else:
+                plan = [entry for entry in index_plan[first:first + 8] if entry is not None]
+                if segments and segments[-1][2] is not None:
+                    segments[-1][2].extend(plan)
+                else:
+                    segments.append((None, int_byte, plan))
+        self._segments = segments
+        self._lut_positions = lut_positions
+        self._lut_tables = [None] * len(lut_positions)
+
+    def __getstate__(self):
+        # lazily built caches are rebuilt on demand, no need to ship them to other processes
+        state = self.__dict__.copy()
+        state["_encoder"] = None
+        state["_full_positions"] = None
+        state["_report"] = None
+        state["_lut_tables"] = [None] * len(self._lut_tables)
+        return state
+
+    def _analyse(self):
+        # label and name indexes are only needed by describe/encode, so parse-only use never pays for them
+        if self._name_to_groups is not None:
+            return
+
+        name_to_groups = {}
+        # value label -> groups, and "label: value" prefix -> groups for with_value ranges
+        label_groups = {}
+        prefix_groups = {}
+        for group in self.groups:
+            group.analyse()
+            if group.encode_name:
+                name_to_groups.setdefault(group.encode_name, []).append(group)
+            for _, _, label, with_value in group.parser.value_table.segments:
+                groups = (prefix_groups if with_value else label_groups).setdefault(label, [])
+                if not groups or groups[-1] is not group:
+                    groups.append(group)
+
+        self._label_groups = label_groups
+        self._prefix_groups = prefix_groups
+        self._name_to_groups = name_to_groups
+
+    def _groups_with_label(self, label):
+        """Multi-bit groups that have label among their values."""
+        self._analyse()
+        groups = self._label_groups.get(label, [])
+        if isinstance(label, str) and ": " in label:
+            candidates = self._prefix_groups.get(label.rpartition(": ")[0])
+            if candidates:
+                # the value must also fall in one of the group's ranges
+                extra = [group for group in candidates if group not in groups and group.parser.value_table.find(label)]
+                if extra:
+                    groups = sorted(groups + extra, key=lambda group: group.group_id)
+        return groups
+
+    def report(self) -> dict:
+        """Checks the descriptors once and returns the cached findings.
+
+        {"valid": bool, "errors": [...], "warnings": [...]}, each finding being
+        {"check", "message", "descriptor_indices"}. Errors make describe/encode fail or
+        silently drop values; warnings point at layouts that parse but are likely mistakes.
+        """
+        if self._report is None:
+            self._report = self._build_report()
+        return self._report
+
+    def validate(self) -> dict:
+        """Raises ValueError listing every error found by report(); returns the report otherwise."""
+        report = self.report()
+        if report["errors"]:
+            raise ValueError("Invalid descriptors: " + "; ".join(error["message"] for error in report["errors"]))
+        return report
+
+    def _build_report(self):
+        self._analyse()
+        errors = []
+        warnings = []
+
+        def finding(findings, check, message, indices):
+            findings.append({"check": check, "message": message, "descriptor_indices": list(indices)})
+
+        parser_groups = {}
+        for group in self.groups:
+            parser_groups.setdefault(group.parser, []).append(group)
+
+        for parser, groups in parser_groups.items():
+            indices = [index for group in groups for index in group.indices]
+            width = parser.numOfElements
+            if len(indices) != width:
+                finding(errors, "group_size", f"MultiBitValueParser expects {width} bits but appears {len(indices)} times in descriptors", indices)
+            if parser.bad_keys:
+                finding(errors, "key_width", f"MultiBitValueParser at bit {indices[0]} has keys that are not {width} bit binary strings: {parser.bad_keys}", indices)
+
+        for group in self.groups:
+            if group.indices[-1] - group.indices[0] != group.num_bits - 1:
+                finding(warnings, "contiguity", f"Multi-bit field at bits {group.indices} is not contiguous", group.indices)
+
+        for parser, groups in parser_groups.items():
+            # gaps between the sorted value table ranges, so wide fields cost one step per range
+            size = 1 << parser.numOfElements
+            missing = 0
+            examples = []
+            value = 0
+            for start, end, _, _ in parser.value_table.segments + ((size, size, None, False),):
+                start = min(start, size)
+                if start > value:
+                    missing += start - value
+                    examples.extend(format(code, f"0{parser.numOfElements}b") for code in range(value, min(start, value + 8 - len(examples))))
+                value = max(value, end + 1)
+            if missing:
+                indices = [index for group in groups for index in group.indices]
+                finding(warnings, "undefined_codes", f"{missing} of {1 << parser.numOfElements} values of the multi-bit field at bit {indices[0]} "
+                        f"have no label and fail to parse, e.g. {examples}", indices)
+
+        for label, positions in self._single_label_positions.items():
+            if len(positions) > 1:
+                finding(warnings, "duplicate_label", f"Label '{label}' is used by {len(positions)} bits; encode needs the 'label:byte:bit' form", positions)
+            label_groups = self._groups_with_label(label)
+            if label_groups:
+                indices = positions + [index for group in label_groups for index in group.indices]
+                finding(warnings, "duplicate_label", f"Label '{label}' is both a single-bit label and a multi-bit value", indices)
+
+        return {"valid": not errors, "errors": errors, "warnings": warnings}
+
+    def _address(self, label, descriptor_index):
+        """Returns the 'label:byte:bit' form accepted by encode() for the given descriptor bit."""
+        byte_index, position = divmod(self._bit_columns[descriptor_index], 8)
+        return f"{label}:{byte_index}:{7 - position}"
+
+    def _check_length(self, bytes_len):
+        if bytes_len != self.byte_length:
+            raise ValueError(f"bytesStr length ({bytes_len}) does not correspond to descriptors list length ({self.byte_length})")
+
+    def _unhexlify(self, text, offset):
+        # lengths are checked before anything is decoded
+        hex_length = 2 * self.byte_length
+        if offset is None:
+            if len(text) != hex_length:
+                if len(text) % 2:
+                    raise binascii.Error(f"Odd-length string ({len(text)} hex digits)")
+                self._check_length(len(text) // 2)
+            start = 0
+        else:
+            start = 2 * offset
+            if offset < 0 or start + hex_length > len(text):
+                raise ValueError(f"Hex string of {len(text) // 2} bytes has no room for {self.byte_length} bytes at offset {offset}")
+            text = text[start:start + hex_length]
+        try:
+            return binascii.unhexlify(text)
+        except ValueError:
+            for position, character in enumerate(text):
+                if character not in "0123456789abcdefABCDEF":
+                    raise binascii.Error(f"Non-hexadecimal character {character!r} at position {start + position}") from None
+            raise
+
+    def _window(self, buffer, offset):
+        view = memoryview(buffer)
+        if view.ndim != 1 or view.itemsize != 1:
+            view = view.cast("B")
+        end = offset + self.byte_length
+        if offset < 0 or end > len(view):
+            raise ValueError(f"Buffer of {len(view)} bytes has no room for {self.byte_length} bytes at offset {offset}")
+        return view[offset:end]
+
+    def _to_int(self, bytes, offset=None, input_format=None):
+        """Reads the payload as an int. With offset, reads byte_length bytes at that offset of a larger buffer without copying it."""
+        if input_format is not None:
+            return self._formatted_to_int(bytes, offset, input_format)
+        if isinstance(bytes, str):  # hexadecimal string is supported (like "001122AAEEFF"
+            return int.from_bytes(self._unhexlify(bytes, offset), self.byte_order)
+        if offset is None:
+            self._check_length(len(bytes))
+            return int.from_bytes(bytes, self.byte_order)
+        return int.from_bytes(self._window(bytes, offset), self.byte_order)
+
+    def _formatted_to_int(self, data, offset, input_format):
+        if input_format == "int":
+            if offset is not None:
+                raise ValueError("offset cannot be used with input_format 'int'")
+            if not isinstance(data, int) or isinstance(data, bool):
+                raise ValueError(f"input_format 'int' expects an int, got {type(data).__name__}")
+            if data < 0 or data.bit_length() > self.bit_length:
+                raise ValueError(f"Value {data} does not fit in {self.byte_length} bytes")
+            return data
+        if input_format == "hex":
+            if not isinstance(data, str):
+                raise ValueError(f"input_format 'hex' expects a str, got {type(data).__name__}")
+            return int.from_bytes(self._unhexlify(data, offset), self.byte_order)
+        if input_format in ("bytes", "bytearray"):
+            if isinstance(data, (str, int)):
+                raise ValueError(f"input_format '{input_format}' expects a bytes-like object, got {type(data).__name__}")
+            return self._to_int(data, offset)
+        raise ValueError(f"Unknown input_format '{input_format}', expected one of {', '.join(INPUT_FORMATS)}")
+
+    def _format_output(self, value, output_format):
+        if output_format == "hex":
+            if self.byte_order == "little":
+                return value.to_bytes(self.byte_length, "little").hex().upper()
+            # one formatting call, already uppercase and zero padded
+            return format(value, f"0{2 * self.byte_length}X") if self.byte_length else ""
+        if output_format == "int":
+            return value
+        if output_format == "bytes":
+            return value.to_bytes(self.byte_length, self.byte_order)
+        if output_format == "bytearray":
+            return bytearray(value.to_bytes(self.byte_length, self.byte_order))
+        raise ValueError(f"Unknown output_format '{output_format}', expected one of {', '.join(OUTPUT_FORMATS)}")
+
+    def parse(self, bytes, offset=None, input_format=None) -> list:
+        return self._parse_value(self._to_int(bytes, offset, input_format))
+
+    def _lut_entry(self, table_index, byte_value):
+        first = self._lut_positions[table_index]
+        table = self._lut_tables[table_index]
+        if table is None:
+            table = [None] * 256
+            table[0] = ()
+            self._lut_tables[table_index] = table
+        labels = tuple(
+            self.descriptors[index] for index in range(first, first + 8)
+            if (byte_value >> (self._shifts[index] % 8)) & 1
+        )
+        table[byte_value] = labels
+        return labels
+
+    def _parse_value(self, value) -> list:
+        if not self._lut_positions:
+            return self._parse_value_masks(value, self._parse_plan, [])
+
+        results = []
+        data = value.to_bytes(self.byte_length, "big")
+        tables = self._lut_tables
+        for table_index, int_byte, plan in self._segments:
+            if plan is None:
+                byte_value = data[int_byte]
+                table = tables[table_index]
+                labels = table[byte_value] if table is not None else None
+                if labels is None:
+                    labels = self._lut_entry(table_index, byte_value)
+                if labels:
+                    results.extend(labels)
+            else:
+                self._parse_value_masks(value, plan, results)
+        return results
+
+    def _parse_value_masks(self, value, plan, results) -> list:
+        append = results.append
+        for mask, label, shift, group in plan:
+            if group is None:
+                if value & mask:
+                    append(label)
+            else:
+                field = (value >> shift) & mask if shift >= 0 else group.extract(value)
+                if label is not None:
+                    field_label = label[field]
+                    if field_label is not _UNDEFINED:
+                        append(field_label)
+                        continue
+                append(group.parser.evaluate(field))
+        return results
+
+    def parse_full(self, bytes, offset=None, lazy=False, input_format=None) -> list:
+        value = self._to_int(bytes, offset, input_format)
+        if lazy:
+            return FullParseResult(self, value)
+        return self._parse_value_full(value)
+
+    def _full_plan(self):
+        """Returns ([(is_bit, descriptor_index or group)] in parse_full order, [summary position per group])."""
+        if self._full_positions is None:
+            positions = []
+            summary_positions = [None] * len(self.groups)
+            for descriptor_index, group_ref in enumerate(self._index_to_group):
+                positions.append((True, descriptor_index))
+                if group_ref and group_ref[1] == group_ref[0].num_bits - 1:
+                    summary_positions[group_ref[0].group_id] = len(positions)
+                    positions.append((False, group_ref[0]))
+            self._full_positions = (positions, summary_positions)
+        return self._full_positions
+
+    def _owner_of_shift(self):
+        """Descriptor index of every bit of the payload int, indexed by shift."""
+        if self._shift_owners is None:
+            owners = [0] * self.bit_length
+            for index, shift in enumerate(self._shifts):
+                owners[shift] = index
+            self._shift_owners = owners
+        return self._shift_owners
+
+    def _parse_value_full(self, value) -> list:
+        descriptors = self.descriptors
+        index_to_group = self._index_to_group
+        results = []
+        append = results.append
+        pending_entries = {}
+
+        for descriptor_index, (shift, column, group_ref) in enumerate(zip(self._shifts, self._bit_columns, index_to_group)):
+            bit = (value >> shift) & 1
+            byteNum = column >> 3
+            bitNum = column & 7
+
+            if group_ref is None:
+                append({
+                    "kind": "bit",
+                    "label": descriptors[descriptor_index],
+                    "enabled": bit == 1,
+                    "raw_bit": bit,
+                    "byte_index": byteNum,
+                    "bit_index": bitNum,
+                    "descriptor_index": descriptor_index,
+                })
+                continue
+
+            group, group_bit_index = group_ref
+            group_id = group.group_id
+            entry = {
+                "kind": "bit",
+                "label": None,
+                "enabled": bit == 1,
+                "raw_bit": bit,
+                "byte_index": byteNum,
+                "bit_index": bitNum,
+                "descriptor_index": descriptor_index,
                 "group_id": group_id,
                 "group_bit_index": group_bit_index,
-                "group_name": name,
+                "group_label": None,
             }
+            results.append(entry)
+            pending_entries.setdefault(group_id, []).append(entry)
 
-    bits = []
-    for index, descriptor in enumerate(descriptors):
-        entry = {
-            "descriptor_index": index,
-            "byte_index": index // 8,
-            "bit_index": index % 8,
-        }
-        group = index_to_group.get(index)
-        if group:
-            entry.update({
-                "kind": "multi_bit",
-                "label": None,
-                "group_id": group["group_id"],
-                "group_bit_index": group["group_bit_index"],
-                "group_name": group["group_name"],
+            if group_bit_index == group.num_bits - 1:
+                value_int = group.extract(value)
+                ret = group.parser.evaluate(value_int)
+                summary_index = len(results)
+                results.append({
+                    "kind": "multi_bit",
+                    "label": ret,
+                    "enabled": True,
+                    "raw_bits": format(value_int, f"0{group.num_bits}b"),
+                    "value_int": value_int,
+                    "group_id": group_id,
+                    "descriptor_indices": list(group.indices),
+                })
+                for group_entry in pending_entries.pop(group_id):
+                    group_entry["group_label"] = ret
+                    group_entry["summary_index"] = summary_index
+
+        return results
+
+    def describe(self) -> dict:
+        if self._schema_error:
+            raise ValueError(self._schema_error)
+        self._analyse()
+
+        bits = []
+        append = bits.append
+        # one dict literal per bit; describe_bits() runs this on every call
+        for index, (descriptor, column, group_ref) in enumerate(zip(self.descriptors, self._bit_columns, self._index_to_group)):
+            if group_ref is None:
+                append({
+                    "descriptor_index": index,
+                    "byte_index": column >> 3,
+                    "bit_index": column & 7,
+                    "kind": "bit",
+                    "label": descriptor,
+                })
+            else:
+                group, group_bit_index = group_ref
+                append({
+                    "descriptor_index": index,
+                    "byte_index": column >> 3,
+                    "bit_index": column & 7,
+                    "kind": "multi_bit",
+                    "label": None,
+                    "group_id": group.group_id,
+                    "group_bit_index": group_bit_index,
+                    "group_name": group.name,
+                })
+
+        multi_bit = []
+        for group in self.groups:
+            multi_bit.append({
+                "group_id": group.group_id,
+                "name": group.name,
+                "num_bits": group.num_bits,
+                "descriptor_indices": list(group.indices),
+                "values": [
+                    {
+                        "bits": bit_string,
+                        "label": label,
+                        "value_int": value_int,
+                    }
+                    for value_int, bit_string, label in group.values
+                ],
+                "type": "enum" if group.parser.enumerable else "int",
+                "ranges": [
+                    {
+                        "start": start,
+                        "end": end,
+                        "label": label,
+                        "with_value": with_value,
+                    }
+                    for start, end, label, with_value in group.parser.value_table.segments
+                ],
             })
+
+        return {
+            "byte_length": self.byte_length,
+            "bits": bits,
+            "multi_bit": multi_bit,
+        }
+
+    def encoder(self, cache_size=0):
+        """Returns a BitEncoder for this layout, optionally caching up to cache_size results."""
+        return BitEncoder(self, cache_size)
+
+    def encode(self, enabled_labels, values=None, output_format="hex") -> str:
+        if self._encoder is None:
+            self._encoder = BitEncoder(self)
+        return self._encoder.encode(enabled_labels, values, output_format)
+
+    def specialize(self, debug=False):
+        """Returns a SpecializedLayout: parse() and parse_full() generated as straight-line code for this layout.
+
+        debug=True writes the generated source to stderr, a path writes it to that file;
+        either way tracebacks then show the generated lines. The source is also kept as
+        .source on the result.
+        """
+        from BitParser.specialize import SpecializedLayout
+        return SpecializedLayout(self, debug)
+
+    def select(self, names) -> "LayoutSelection":
+        """Returns a parser that decodes only the given single-bit labels and multi-bit fields.
+
+        Fields are named like in describe(); 'label:byte:bit' picks one of repeated labels.
+        """
+        if isinstance(names, str):
+            raise ValueError("names must be an iterable of strings")
+        return LayoutSelection(self, [self._selection_target(name) for name in names])
+
+    def _selection_target(self, name):
+        """Returns the descriptor index of a single-bit label or the group of a multi-bit field."""
+        if not isinstance(name, str):
+            raise ValueError("names must contain only strings")
+        self._analyse()
+        base, column = _parse_label_address(name, self.byte_length)
+        if column is not None:
+            index = self._column_to_index[column]
+            group_ref = self._index_to_group[index]
+            if group_ref is None:
+                if self.descriptors[index] != base:
+                    raise ValueError(f"Label '{base}' does not match descriptor {self._address(self.descriptors[index], index)}")
+                return index
+            group = group_ref[0]
+            if base not in (group.name, group.encode_name) and not (group.name is None and base == "field"):
+                raise ValueError(f"'{base}' does not match the name of the multi-bit field at {self._address(base, index)}")
+            return group
+
+        positions = self._single_label_positions.get(name, [])
+        groups = [group for group in self.groups if name in (group.name, group.encode_name)]
+        if len(positions) + len(groups) > 1:
+            raise ValueError(f"'{name}' matches several fields; use 'name:byte:bit'")
+        if positions:
+            return positions[0]
+        if groups:
+            return groups[0]
+        raise ValueError(f"Unknown label or field '{name}'")
+
+    def _label_term(self, label):
+        """Returns (mask, expected): the bits a label covers in the payload int and their value when it is set."""
+        if not isinstance(label, str):
+            raise ValueError("labels must contain only strings")
+        if self._encoder is None:
+            self._encoder = BitEncoder(self)
+        encoder = self._encoder
+        base, column = _parse_label_address(label, self.byte_length)
+        if column is not None:
+            index = self._column_to_index[column]
+            expected = encoder._encode_addressed_label(base, index, set())
+            group_ref = self._index_to_group[index]
+            if group_ref is None:
+                return expected, expected
+            group = group_ref[0]
+            return group.place((1 << group.num_bits) - 1), expected
+
+        entry = encoder._label_index.get(label) or encoder._resolve(label)
+        if entry[0] == "single":
+            return entry[1], entry[1]
+        if entry[0] == "multi":
+            group = entry[1]
+            return group.place((1 << group.num_bits) - 1), entry[2]
+        raise ValueError(entry[1])
+
+    def any_set(self, labels) -> "BitPredicate":
+        """Returns a predicate that is True when at least one of labels is present in a payload.
+
+        Single-bit labels are tested with one mask; a multi-bit value label ("temperature
+        too high") adds a compare of its field.
+        """
+        if isinstance(labels, str):
+            raise ValueError("labels must be an iterable of strings")
+        flag_mask = 0
+        terms = []
+        for label in labels:
+            mask, expected = self._label_term(label)
+            if mask == expected and not mask & (mask - 1):
+                flag_mask |= mask
+            else:
+                terms.append((mask, expected))
+        return BitPredicate(self, flag_mask, 0, terms)
+
+    def all_set(self, labels) -> "BitPredicate":
+        """Returns a predicate that is True when every one of labels is present in a payload.
+
+        All labels, multi-bit values included, are folded into one mask-and-compare.
+        """
+        if isinstance(labels, str):
+            raise ValueError("labels must be an iterable of strings")
+        mask = 0
+        expected = 0
+        for label in labels:
+            term_mask, term_expected = self._label_term(label)
+            if (expected ^ term_expected) & mask & term_mask:
+                raise ValueError(f"Label '{label}' contradicts another label of the same multi-bit field")
+            mask |= term_mask
+            expected |= term_expected
+        return BitPredicate(self, mask, expected)
+
+
+class LayoutSelection():
+    """Parser for a subset of the fields of a compiled layout, returned by CompiledLayout.select().
+
+    Only the payload bytes spanned by the selected fields are read and only their masks
+    are evaluated. parse() returns the same labels parse() of the layout would, restricted
+    to the selection, in descriptor order.
+    """
+
+    def __init__(self, layout, targets):
+        if not targets:
+            raise ValueError("select() needs at least one label or field")
+        self.layout = layout
+
+        emit = {}
+        payload_bytes = set()
+        contiguous = True
+        for target in targets:
+            if isinstance(target, _MultiBitGroup):
+                emit[target.indices[-1]] = target
+                indices = target.indices
+                contiguous = contiguous and target.shift >= 0
+            else:
+                emit[target] = None
+                indices = [target]
+            payload_bytes.update(layout._bit_columns[index] // 8 for index in indices)
+
+        first = min(payload_bytes)
+        last = max(payload_bytes)
+        if not contiguous:
+            # split fields are extracted with their absolute shifts, so the window keeps bit 0 of the payload int
+            if layout.byte_order == "big":
+                last = layout.byte_length - 1
+            else:
+                first = 0
+        base = 8 * (layout.byte_length - 1 - last) if layout.byte_order == "big" else 8 * first
+        self._first = first
+        self._end = last + 1
+        self._base = base
+        self._window_mask = (1 << 8 * (last + 1 - first)) - 1
+
+        plan = []
+        for index in sorted(emit):
+            group = emit[index]
+            if group is None:
+                plan.append((1 << (layout._shifts[index] - base), layout.descriptors[index], 0, None))
+            else:
+                shift = group.shift - base if group.shift >= 0 else -1
+                plan.append((group.mask, group.parser.value_table.dense, shift, group))
+        self._plan = plan
+
+    def _window_value(self, data, offset, input_format):
+        layout = self.layout
+        if input_format is None and not isinstance(data, str):
+            if offset is None:
+                layout._check_length(len(data))
+                if isinstance(data, (bytes, bytearray)):
+                    return int.from_bytes(data[self._first:self._end], layout.byte_order)
+                offset = 0
+            return int.from_bytes(layout._window(data, offset)[self._first:self._end], layout.byte_order)
+        return (layout._to_int(data, offset, input_format) >> self._base) & self._window_mask
+
+    def parse(self, bytes, offset=None, input_format=None) -> list:
+        return self.layout._parse_value_masks(self._window_value(bytes, offset, input_format), self._plan, [])
+
+
+class BitPredicate():
+    """Label test over the payload int of a compiled layout, returned by any_set()/all_set().
+
+    all_set: value & mask == expected. any_set: value & mask is non-zero (single-bit labels)
+    or one of the (mask, expected) terms of multi-bit value labels matches.
+    """
+
+    def __init__(self, layout, mask, expected, terms=None):
+        self.layout = layout
+        self.mask = mask
+        self.expected = expected
+        self.terms = terms
+        self.require_all = terms is None
+
+    def test_int(self, value) -> bool:
+        if self.require_all:
+            return value & self.mask == self.expected
+        if value & self.mask:
+            return True
+        for mask, expected in self.terms:
+            if value & mask == expected:
+                return True
+        return False
+
+    def __call__(self, bytes, offset=None, input_format=None) -> bool:
+        return self.test_int(self.layout._to_int(bytes, offset, input_format))
+
+
+class BitEncoder():
+    """Encodes labels and multi-bit values of one compiled layout.
+
+    Each label is resolved once to the (mask, value) it contributes, so an encode call is a
+    dict lookup and an OR per label. Results can be returned as int, bytes or uppercase hex.
+    """
+
+    def __init__(self, layout, cache_size=0):
+        layout = compile_descriptors(layout)
+        layout._analyse()
+        self.layout = layout
+        self.cache_size = cache_size
+        self._cache = OrderedDict() if cache_size else None
+        self._cache_lock = threading.Lock()
+        self._label_index = {}
+
+    def _resolve(self, label):
+        """Returns ("single", mask), ("multi", group, value) or ("error", message) for a plain label."""
+        layout = self.layout
+        positions = layout._single_label_positions.get(label)
+        groups = layout._groups_with_label(label)
+        if positions and groups:
+            entry = ("error", f"Label '{label}' is ambiguous between single and multi-bit descriptors")
+        elif positions:
+            if len(positions) > 1:
+                entry = ("error", f"Label '{label}' matches multiple bits; use 'label:byte:bit'")
+            else:
+                entry = ("single", 1 << layout._shifts[positions[0]])
+        elif groups:
+            label_values = groups[0].parser.value_table.find(label)
+            if len(groups) > 1:
+                entry = ("error", f"Label '{label}' matches multiple multi-bit groups")
+            elif len(label_values) != 1:
+                entry = ("error", f"Label '{label}' is ambiguous for multi-bit encoding")
+            else:
+                entry = ("multi", groups[0], groups[0].place(label_values[0]))
         else:
-            entry.update({
-                "kind": "bit",
-                "label": descriptor,
-            })
-        bits.append(entry)
+            entry = ("error", f"Unknown label '{label}'")
+        self._label_index[label] = entry
+        return entry
 
-    return {
-        "byte_length": bitFieldDescriptorLength // 8,
-        "bits": bits,
-        "multi_bit": [group_info[parser] for parser, _ in group_items],
-    }
+    def _place_value(self, group, name, value):
+        if not isinstance(value, int):
+            raise ValueError(f"Value for '{name}' must be an integer")
+        if value < 0:
+            raise ValueError(f"Value for '{name}' must be non-negative")
+        if value not in group.parser.value_table:
+            raise ValueError(f"Value {value} for '{name}' is not defined in descriptors")
+        return group.place(value)
+
+    def _encode_addressed_label(self, label_base, descriptor_index, group_set):
+        layout = self.layout
+        group_ref = layout._index_to_group[descriptor_index]
+        if group_ref is None:
+            if layout.descriptors[descriptor_index] != label_base:
+                byte_index, position = divmod(layout._bit_columns[descriptor_index], 8)
+                raise ValueError(
+                    f"Label '{label_base}' does not match descriptor at byte {byte_index} bit {7 - position}"
+                )
+            return 1 << layout._shifts[descriptor_index]
+
+        group = group_ref[0]
+        label_values = group.parser.value_table.find(label_base)
+        if not label_values:
+            raise ValueError(f"Unknown label '{label_base}' for addressed multi-bit field")
+        if group in group_set:
+            raise ValueError(f"Multi-bit field '{label_base}' is already set")
+        if len(label_values) != 1:
+            raise ValueError(f"Label '{label_base}' is ambiguous for multi-bit encoding")
+        group_set.add(group)
+        return group.place(label_values[0])
+
+    def _encode(self, enabled_labels, values) -> int:
+        layout = self.layout
+        byte_length = layout.byte_length
+
+        if layout._schema_error:
+            raise ValueError(layout._schema_error)
+
+        result = 0
+        group_set = set()
+        used_single_labels = set()
+
+        unused_values = {}
+        addressed_values = []
+        for key, value in values.items():
+            if not isinstance(key, str):
+                raise ValueError("values keys must be strings")
+            base, column = _parse_label_address(key, byte_length)
+            if column is None:
+                unused_values[base] = value
+            else:
+                addressed_values.append((base, layout._column_to_index[column], value))
+
+        for base, descriptor_index, value in addressed_values:
+            group_ref = layout._index_to_group[descriptor_index]
+            if group_ref is None:
+                raise ValueError(f"Addressed value '{base}' does not point to a multi-bit field")
+
+            group = group_ref[0]
+            if group.encode_name and base != group.encode_name:
+                raise ValueError(f"Addressed value '{base}' does not match field name '{group.encode_name}'")
+            if group in group_set:
+                raise ValueError(f"Multi-bit field '{base}' is already set")
+            result |= self._place_value(group, base, value)
+            group_set.add(group)
+
+        if unused_values:
+            for name, groups in layout._name_to_groups.items():
+                if name in unused_values and len(groups) > 1:
+                    raise ValueError(f"Multi-bit field name '{name}' is ambiguous; use 'name:byte:bit'")
+
+            for group in layout.groups:
+                name = group.encode_name
+                if name and name in unused_values:
+                    result |= self._place_value(group, name, unused_values.pop(name))
+                    group_set.add(group)
+
+        label_index = self._label_index
+        for label in enabled_labels:
+            label_base, column = _parse_label_address(label, byte_length)
+            if column is not None:
+                result |= self._encode_addressed_label(label_base, layout._column_to_index[column], group_set)
+                continue
+
+            entry = label_index.get(label) or self._resolve(label)
+            kind = entry[0]
+            if kind == "single":
+                if label in used_single_labels:
+                    raise ValueError(f"Unknown label '{label}'")
+                used_single_labels.add(label)
+                result |= entry[1]
+            elif kind == "multi":
+                group = entry[1]
+                if group in group_set:
+                    raise ValueError(f"Multi-bit group for '{label}' is already set")
+                group_set.add(group)
+                result |= entry[2]
+            else:
+                raise ValueError(entry[1])
 
+        if unused_values:
+            unknown = ", ".join(sorted(unused_values.keys()))
+            raise ValueError(f"Unknown multi-bit field(s): {unknown}")
 
-def encode_bits(enabled_labels, descriptors: list, values=None) -> str:
-    bitFieldDescriptorLength = len(descriptors)
+        if len(group_set) != len(layout.groups):
+            for group in layout.groups:
+                if group not in group_set:
+                    name = group.encode_name or "unnamed"
+                    raise ValueError(f"Missing value for multi-bit field '{name}'")
 
-    if bitFieldDescriptorLength % 8 != 0:
-        raise ValueError(f"Descriptor length ({bitFieldDescriptorLength}) is not divisible by 8!")
+        return result
 
-    byte_length = bitFieldDescriptorLength // 8
+    def encode_int(self, enabled_labels, values=None) -> int:
+        """Returns the encoded payload as an int, in the layout's word order (see parse_int())."""
+        if values is None:
+            values = {}
 
-    if values is None:
-        values = {}
+        if isinstance(enabled_labels, (str, bytes)):
+            raise ValueError("enabled_labels must be an iterable of strings")
 
-    if isinstance(enabled_labels, (str, bytes)):
-        raise ValueError("enabled_labels must be an iterable of strings")
+        enabled_labels = list(enabled_labels or [])
+        for label in enabled_labels:
+            if not isinstance(label, str):
+                raise ValueError("enabled_labels must contain only strings")
 
-    enabled_labels = list(enabled_labels or [])
-    for label in enabled_labels:
-        if not isinstance(label, str):
-            raise ValueError("enabled_labels must contain only strings")
+        if not isinstance(values, dict):
+            raise ValueError("values must be a dict mapping field names to integers")
 
-    if not isinstance(values, dict):
-        raise ValueError("values must be a dict mapping field names to integers")
+        if self._cache is None:
+            return self._encode(enabled_labels, values)
 
-    single_label_positions = {}
-    multibit_groups = {}
-    for index, descriptor in enumerate(descriptors):
-        if isinstance(descriptor, MultiBitValueParser):
-            multibit_groups.setdefault(descriptor, []).append(index)
-        else:
-            single_label_positions.setdefault(descriptor, []).append(index)
-
-    group_info = {}
-    name_to_groups = {}
-    index_to_group = {}
-    for parser, indices in multibit_groups.items():
-        num_bits = parser.numOfElements
-        if len(indices) != num_bits:
-            raise ValueError(
-                f"MultiBitValueParser expects {num_bits} bits but appears {len(indices)} times in descriptors"
-            )
+        # results do not depend on label order; repeated labels always fail, so they bypass the cache.
+        # Value types are part of the key: 1.0 and True compare equal to 1 but do not encode alike.
+        try:
+            key = (frozenset(enabled_labels), frozenset((name, type(value), value) for name, value in values.items()))
+        except TypeError:
+            key = None
+        if key is None or len(key[0]) != len(enabled_labels):
+            return self._encode(enabled_labels, values)
 
-        label_to_bits = {}
-        for bit_string, label in parser.evaluator.items():
-            label_to_bits.setdefault(label, []).append(bit_string)
-
-        labels = list(label_to_bits.keys())
-        name = _infer_multibit_name(labels)
-        group_info[parser] = {
-            "indices": indices,
-            "num_bits": num_bits,
-            "label_to_bits": label_to_bits,
-            "name": name,
-        }
-        if name:
-            name_to_groups.setdefault(name, []).append(parser)
-        for descriptor_index in indices:
-            index_to_group[descriptor_index] = parser
-
-    group_set = set()
-    bit_values = [0] * bitFieldDescriptorLength
-
-    def apply_bit_string(indices, bit_string):
-        if len(bit_string) != len(indices):
-            raise ValueError("Multi-bit value does not match descriptor bit count")
-        for index, bit in zip(indices, bit_string):
-            if bit not in ("0", "1"):
-                raise ValueError("Multi-bit value must be a binary string")
-            bit_values[index] = 1 if bit == "1" else 0
-
-    unused_values = {}
-    addressed_values = []
-    for key, value in values.items():
-        if not isinstance(key, str):
-            raise ValueError("values keys must be strings")
-        base, descriptor_index = _parse_label_address(key, byte_length)
-        if descriptor_index is None:
-            unused_values[base] = value
-        else:
-            addressed_values.append((base, descriptor_index, value))
-
-    for base, descriptor_index, value in addressed_values:
-        descriptor = descriptors[descriptor_index]
-        if not isinstance(descriptor, MultiBitValueParser):
-            raise ValueError(f"Addressed value '{base}' does not point to a multi-bit field")
-
-        parser = descriptor
-        info = group_info[parser]
-        if info["name"] and base != info["name"]:
-            raise ValueError(f"Addressed value '{base}' does not match field name '{info['name']}'")
-        if parser in group_set:
-            raise ValueError(f"Multi-bit field '{base}' is already set")
-        if not isinstance(value, int):
-            raise ValueError(f"Value for '{base}' must be an integer")
-        if value < 0:
-            raise ValueError(f"Value for '{base}' must be non-negative")
-        bit_string = format(value, f"0{info['num_bits']}b")
-        if bit_string not in parser.evaluator:
-            raise ValueError(f"Value {value} for '{base}' is not defined in descriptors")
-        apply_bit_string(info["indices"], bit_string)
-        group_set.add(parser)
-
-    for name, groups in name_to_groups.items():
-        if name in unused_values and len(groups) > 1:
-            raise ValueError(f"Multi-bit field name '{name}' is ambiguous; use 'name:byte:bit'")
-
-    for parser, info in group_info.items():
-        name = info["name"]
-        if name and name in unused_values:
-            value = unused_values.pop(name)
-            if not isinstance(value, int):
-                raise ValueError(f"Value for '{name}' must be an integer")
-            if value < 0:
-                raise ValueError(f"Value for '{name}' must be non-negative")
-            bit_string = format(value, f"0{info['num_bits']}b")
-            if bit_string not in parser.evaluator:
-                raise ValueError(f"Value {value} for '{name}' is not defined in descriptors")
-            apply_bit_string(info["indices"], bit_string)
-            group_set.add(parser)
-
-    multi_label_groups = {}
-    for parser, info in group_info.items():
-        for label in info["label_to_bits"]:
-            multi_label_groups.setdefault(label, []).append(parser)
-
-    for label in enabled_labels:
-        label_base, descriptor_index = _parse_label_address(label, byte_length)
-        if descriptor_index is not None:
-            descriptor = descriptors[descriptor_index]
-            if isinstance(descriptor, MultiBitValueParser):
-                parser = descriptor
-                info = group_info[parser]
-                if label_base not in info["label_to_bits"]:
-                    raise ValueError(f"Unknown label '{label_base}' for addressed multi-bit field")
-                if parser in group_set:
-                    raise ValueError(f"Multi-bit field '{label_base}' is already set")
-                label_bits = info["label_to_bits"][label_base]
-                if len(label_bits) != 1:
-                    raise ValueError(f"Label '{label_base}' is ambiguous for multi-bit encoding")
-                apply_bit_string(info["indices"], label_bits[0])
-                group_set.add(parser)
-            else:
-                if descriptor != label_base:
-                    raise ValueError(
-                        f"Label '{label_base}' does not match descriptor at byte {descriptor_index // 8} bit {7 - (descriptor_index % 8)}"
-                    )
-                bit_values[descriptor_index] = 1
-            continue
-
-        has_single = label in single_label_positions and single_label_positions[label]
-        has_multi = label in multi_label_groups
-        if has_single and has_multi:
-            raise ValueError(f"Label '{label}' is ambiguous between single and multi-bit descriptors")
-
-        if has_single:
-            if len(single_label_positions[label]) > 1:
-                raise ValueError(f"Label '{label}' matches multiple bits; use 'label:byte:bit'")
-            bit_index = single_label_positions[label].pop(0)
-            bit_values[bit_index] = 1
-            continue
-
-        if has_multi:
-            groups = multi_label_groups[label]
-            if len(groups) > 1:
-                raise ValueError(f"Label '{label}' matches multiple multi-bit groups")
-            parser = groups[0]
-            if parser in group_set:
-                raise ValueError(f"Multi-bit group for '{label}' is already set")
-            label_bits = group_info[parser]["label_to_bits"][label]
-            if len(label_bits) != 1:
-                raise ValueError(f"Label '{label}' is ambiguous for multi-bit encoding")
-            apply_bit_string(group_info[parser]["indices"], label_bits[0])
-            group_set.add(parser)
-            continue
-
-        raise ValueError(f"Unknown label '{label}'")
-
-    if unused_values:
-        unknown = ", ".join(sorted(unused_values.keys()))
-        raise ValueError(f"Unknown multi-bit field(s): {unknown}")
-
-    for parser, info in group_info.items():
-        if parser not in group_set:
-            name = info["name"] or "unnamed"
-            raise ValueError(f"Missing value for multi-bit field '{name}'")
-
-    byte_values = [0] * (bitFieldDescriptorLength // 8)
-    for index, bit in enumerate(bit_values):
-        if bit:
-            byte_index = index // 8
-            bit_index = index % 8
-            byte_values[byte_index] |= 1 << (7 - bit_index)
-
-    return binascii.hexlify(bytes(byte_values)).decode("ascii").upper()
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        result = self._encode(enabled_labels, values)
+        with self._cache_lock:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def encode_bytes(self, enabled_labels, values=None) -> bytes:
+        return self.encode_int(enabled_labels, values).to_bytes(self.layout.byte_length, self.layout.byte_order)
+
+    def encode(self, enabled_labels, values=None, output_format="hex") -> str:
+        """Returns the encoded payload as an uppercase hex string, like encode_bits(), or in another output_format."""
+        return self.layout._format_output(self.encode_int(enabled_labels, values), output_format)
+
+
+class _LazyEntry(Mapping):
+    """Read-only, dict-like view of one parse_full entry, computed from the raw payload on access."""
+
+    __slots__ = ("_result", "_ref")
+
+    def __init__(self, result, ref):
+        self._result = result
+        self._ref = ref
+
+    def __getitem__(self, key):
+        if key not in self._keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class BitEntry(_LazyEntry):
+    __slots__ = ()
+    kind = "bit"
+    _SINGLE_KEYS = ("kind", "label", "enabled", "raw_bit", "byte_index", "bit_index", "descriptor_index")
+    _GROUP_KEYS = _SINGLE_KEYS + ("group_id", "group_bit_index", "group_label", "summary_index")
+
+    def _keys(self):
+        return self._GROUP_KEYS if self._group_ref else self._SINGLE_KEYS
+
+    @property
+    def _group_ref(self):
+        return self._result.layout._index_to_group[self._ref]
+
+    @property
+    def descriptor_index(self):
+        return self._ref
+
+    @property
+    def byte_index(self):
+        return self._result.layout._bit_columns[self._ref] // 8
+
+    @property
+    def bit_index(self):
+        return self._result.layout._bit_columns[self._ref] % 8
+
+    @property
+    def raw_bit(self):
+        return (self._result.value >> self._result.layout._shifts[self._ref]) & 1
+
+    @property
+    def enabled(self):
+        return self.raw_bit == 1
+
+    @property
+    def label(self):
+        if self._group_ref:
+            return None
+        return self._result.layout.descriptors[self._ref]
+
+    @property
+    def group_id(self):
+        return self._group_ref[0].group_id
+
+    @property
+    def group_bit_index(self):
+        return self._group_ref[1]
+
+    @property
+    def group_label(self):
+        return self._group_ref[0].parser.evaluate(self._group_ref[0].extract(self._result.value))
+
+    @property
+    def summary_index(self):
+        return self._result.layout._full_plan()[1][self._group_ref[0].group_id]
+
+
+class MultiBitEntry(_LazyEntry):
+    __slots__ = ()
+    kind = "multi_bit"
+    enabled = True
+    _KEYS = ("kind", "label", "enabled", "raw_bits", "value_int", "group_id", "descriptor_indices")
+
+    def _keys(self):
+        return self._KEYS
+
+    @property
+    def value_int(self):
+        return self._ref.extract(self._result.value)
+
+    @property
+    def raw_bits(self):
+        return format(self.value_int, f"0{self._ref.num_bits}b")
+
+    @property
+    def label(self):
+        return self._ref.parser.evaluate(self.value_int)
+
+    @property
+    def group_id(self):
+        return self._ref.group_id
+
+    @property
+    def descriptor_indices(self):
+        return list(self._ref.indices)
+
+
+class FullParseResult(Sequence):
+    """Lazy parse_full() result: keeps only the payload int and materializes entries when indexed.
+
+    Entries support dict-style access (entry["label"]); undefined multi-bit values raise
+    KeyError when the affected entry is read rather than when the payload is parsed.
+    """
+
+    __slots__ = ("layout", "value")
+
+    def __init__(self, layout, value):
+        self.layout = layout
+        self.value = value
+
+    def __len__(self):
+        return len(self.layout._full_plan()[0])
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[index] for index in range(*position.indices(len(self)))]
+        is_bit, ref = self.layout._full_plan()[0][position]
+        return BitEntry(self, ref) if is_bit else MultiBitEntry(self, ref)
+
+    def __eq__(self, other):
+        if isinstance(other, (FullParseResult, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def to_list(self) -> list:
+        """Returns the same list of dicts as parse_full()."""
+        return self.layout._parse_value_full(self.value)
+
+
+def compile_descriptors(descriptors: list, validate=False, **options) -> CompiledLayout:
+    """Returns a CompiledLayout (unchanged if one is passed). With validate=True, raises ValueError for invalid descriptors."""
+    layout = descriptors if isinstance(descriptors, CompiledLayout) else CompiledLayout(descriptors, **options)
+    if validate:
+        layout.validate()
+    return layout
+
+
+# layouts compiled for the module-level functions, most recently used last
+LAYOUT_CACHE_SIZE = 128
+_layout_cache = OrderedDict()
+_layout_cache_lock = threading.Lock()
+
+
+def _cached_layout(descriptors) -> CompiledLayout:
+    """compile_descriptors() for the module-level functions: recent descriptor lists are compiled once.
+
+    Lists are keyed by their content; parser objects compare by identity, so a list
+    rebuilt from the same parsers reuses the layout. Unhashable descriptors are compiled
+    on every call.
+    """
+    if isinstance(descriptors, CompiledLayout):
+        return descriptors
+    key = tuple(descriptors)
+    try:
+        hash(key)
+    except TypeError:
+        return CompiledLayout(key)
+
+    with _layout_cache_lock:
+        layout = _layout_cache.get(key)
+        if layout is not None:
+            _layout_cache.move_to_end(key)
+            return layout
+
+    layout = CompiledLayout(key)
+    with _layout_cache_lock:
+        _layout_cache[key] = layout
+        if len(_layout_cache) > LAYOUT_CACHE_SIZE:
+            _layout_cache.popitem(last=False)
+    return layout
@@ -2,7 +2,14 @@ from BitParser.BitParser import (
     parse_bits,
     parse_bits_full,
     encode_bits,
+    parse_int,
+    encode_int,
     describe_bits,
     MultiBitValueParser,
+    IntField,
     SameValueRange,
+    CompiledLayout,
+    BitEncoder,
+    FullParseResult,
+    compile_descriptors,
 )
@@ -0,0 +1,423 @@
+/*
+ * Optional C kernels for BitParser.accel.
+ *
+ * A Table is a flattened compiled layout: one entry per parse() result position (a
+ * single-bit label or a multi-bit field), each entry listing its bits as (payload byte,
+ * mask in that byte, bit of the entry value). Extraction and packing work on raw record
+ * bytes only and run without the GIL; labels are attached afterwards.
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <stdint.h>
+#include <string.h>
+
+typedef struct {
+    PyObject_HEAD
+    Py_ssize_t byte_length;
+    Py_ssize_t entry_count;
+    uint32_t *entry_start;  /* entry_count + 1 offsets into the bit arrays */
+    uint32_t *byte_pos;
+    uint8_t *bit_mask;
+    uint8_t *target;
+    uint8_t *is_field;      /* entry_count flags: 1 for a multi-bit field, 0 for a single bit */
+    PyObject *labels;       /* tuple: label of each single-bit entry (any object, None too) */
+    PyObject *tables;       /* tuple: dense label tuple of each field, or None */
+    PyObject *evaluators;   /* tuple: evaluate() of each field, or None */
+    PyObject *undefined;
+} TableObject;
+
+static void *
+copy_array(const char *data, Py_ssize_t size)
+{
+    void *copy = PyMem_Malloc(size ? size : 1);
+    if (copy == NULL) {
+        PyErr_NoMemory();
+        return NULL;
+    }
+    memcpy(copy, data, size);
+    return copy;
+}
+
+static void
+Table_dealloc(TableObject *self)
+{
+    PyMem_Free(self->entry_start);
+    PyMem_Free(self->byte_pos);
+    PyMem_Free(self->bit_mask);
+    PyMem_Free(self->target);
+    PyMem_Free(self->is_field);
+    Py_XDECREF(self->labels);
+    Py_XDECREF(self->tables);
+    Py_XDECREF(self->evaluators);
+    Py_XDECREF(self->undefined);
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+static int
+Table_init(TableObject *self, PyObject *args, PyObject *kwds)
+{
+    Py_ssize_t byte_length;
+    const char *entry_start, *byte_pos, *bit_mask, *target, *is_field;
+    Py_ssize_t entry_start_size, byte_pos_size, bit_mask_size, target_size, is_field_size;
+    PyObject *labels, *tables, *evaluators, *undefined;
+
+    if (!PyArg_ParseTuple(args, "ny#y#y#y#y#O!O!O!O:Table", &byte_length,
+                          &entry_start, &entry_start_size, &byte_pos, &byte_pos_size,
+                          &bit_mask, &bit_mask_size, &target, &target_size, &is_field, &is_field_size,
+                          &PyTuple_Type, &labels, &PyTuple_Type, &tables,
+                          &PyTuple_Type, &evaluators, &undefined)) {
+        return -1;
+    }
+    if (self->entry_start != NULL) {
+        PyErr_SetString(PyExc_TypeError, "Table is already initialised");
+        return -1;
+    }
+
+    Py_ssize_t entry_count = PyTuple_GET_SIZE(labels);
+    Py_ssize_t bit_count = bit_mask_size;
+    if (byte_length < 0 || entry_start_size != (entry_count + 1) * (Py_ssize_t)sizeof(uint32_t)
+        || byte_pos_size != bit_count * (Py_ssize_t)sizeof(uint32_t) || target_size != bit_count
+        || is_field_size != entry_count
+        || PyTuple_GET_SIZE(tables) != entry_count || PyTuple_GET_SIZE(evaluators) != entry_count) {
+        PyErr_SetString(PyExc_ValueError, "inconsistent table arrays");
+        return -1;
+    }
+
+    self->entry_start = copy_array(entry_start, entry_start_size);
+    self->byte_pos = copy_array(byte_pos, byte_pos_size);
+    self->bit_mask = copy_array(bit_mask, bit_mask_size);
+    self->target = copy_array(target, target_size);
+    self->is_field = copy_array(is_field, is_field_size);
+    if (!self->entry_start || !self->byte_pos || !self->bit_mask || !self->target || !self->is_field) {
+        return -1;
+    }
+
+    if (self->entry_start[0] != 0 || self->entry_start[entry_count] != (uint32_t)bit_count) {
+        PyErr_SetString(PyExc_ValueError, "inconsistent table arrays");
+        return -1;
+    }
+    for (Py_ssize_t entry = 0; entry < entry_count; entry++) {
+        if (self->entry_start[entry + 1] < self->entry_start[entry]
+            || self->entry_start[entry + 1] - self->entry_start[entry] > 64) {
+            PyErr_SetString(PyExc_ValueError, "entries must have 1 to 64 bits");
+            return -1;
+        }
+    }
+    for (Py_ssize_t bit = 0; bit < bit_count; bit++) {
+        if (self->byte_pos[bit] >= (uint32_t)byte_length || self->target[bit] >= 64) {
+            PyErr_SetString(PyExc_ValueError, "bit position out of range");
+            return -1;
+        }
+    }
+
+    self->byte_length = byte_length;
+    self->entry_count = entry_count;
+    Py_INCREF(labels);
+    self->labels = labels;
+    Py_INCREF(tables);
+    self->tables = tables;
+    Py_INCREF(evaluators);
+    self->evaluators = evaluators;
+    Py_INCREF(undefined);
+    self->undefined = undefined;
+    return 0;
+}
+
+static int
+check_ready(TableObject *self)
+{
+    if (self->entry_start == NULL || self->labels == NULL) {
+        PyErr_SetString(PyExc_ValueError, "Table is not initialised");
+        return -1;
+    }
+    return 0;
+}
+
+static inline uint64_t
+extract_entry(const TableObject *self, const uint8_t *record, Py_ssize_t entry)
+{
+    uint64_t value = 0;
+    for (uint32_t bit = self->entry_start[entry]; bit < self->entry_start[entry + 1]; bit++) {
+        if (record[self->byte_pos[bit]] & self->bit_mask[bit]) {
+            value |= (uint64_t)1 << self->target[bit];
+        }
+    }
+    return value;
+}
+
+static void
+extract_records(const TableObject *self, const uint8_t *data, Py_ssize_t count,
+                Py_ssize_t stride, uint8_t *codes)
+{
+    for (Py_ssize_t record = 0; record < count; record++) {
+        const uint8_t *bytes = data + record * stride;
+        for (Py_ssize_t entry = 0; entry < self->entry_count; entry++) {
+            uint64_t code = extract_entry(self, bytes, entry);
+            memcpy(codes, &code, sizeof(code));
+            codes += sizeof(code);
+        }
+    }
+}
+
+/* appends the parse() labels of one record's entry codes to list */
+static int
+append_labels(const TableObject *self, const uint64_t *codes, PyObject *list)
+{
+    for (Py_ssize_t entry = 0; entry < self->entry_count; entry++) {
+        uint64_t code = codes[entry];
+        PyObject *label;
+        if (!self->is_field[entry]) {
+            if (code && PyList_Append(list, PyTuple_GET_ITEM(self->labels, entry)) < 0) {
+                return -1;
+            }
+            continue;
+        }
+
+        PyObject *table = PyTuple_GET_ITEM(self->tables, entry);
+        if (table != Py_None && code < (uint64_t)PyTuple_GET_SIZE(table)) {
+            label = PyTuple_GET_ITEM(table, (Py_ssize_t)code);
+            if (label != self->undefined) {
+                if (PyList_Append(list, label) < 0) {
+                    return -1;
+                }
+                continue;
+            }
+        }
+        PyObject *value = PyLong_FromUnsignedLongLong(code);
+        if (value == NULL) {
+            return -1;
+        }
+        label = PyObject_CallFunctionObjArgs(PyTuple_GET_ITEM(self->evaluators, entry), value, NULL);
+        Py_DECREF(value);
+        if (label == NULL) {
+            return -1;
+        }
+        int result = PyList_Append(list, label);
+        Py_DECREF(label);
+        if (result < 0) {
+            return -1;
+        }
+    }
+    return 0;
+}
+
+/* checks that count records of byte_length bytes, stride bytes apart from offset, fit in view */
+static int
+check_records(const TableObject *self, const Py_buffer *view, Py_ssize_t count,
+              Py_ssize_t stride, Py_ssize_t offset)
+{
+    if (count < 0 || offset < 0 || stride < self->byte_length) {
+        PyErr_SetString(PyExc_ValueError, "count and offset must be non-negative and stride at least the record size");
+        return -1;
+    }
+    if (count && (count - 1 > (PY_SSIZE_T_MAX - offset - self->byte_length) / (stride ? stride : 1)
+                  || offset + (count - 1) * stride + self->byte_length > view->len)) {
+        PyErr_Format(PyExc_ValueError, "Buffer of %zd bytes has no room for %zd records of %zd bytes",
+                     view->len, count, self->byte_length);
+        return -1;
+    }
+    return 0;
+}
+
+static PyObject *
+Table_parse(TableObject *self, PyObject *args)
+{
+    Py_buffer view;
+    Py_ssize_t offset = 0;
+    if (check_ready(self) < 0 || !PyArg_ParseTuple(args, "y*|n:parse", &view, &offset)) {
+        return NULL;
+    }
+    PyObject *list = NULL;
+    uint64_t small[64];
+    uint64_t *codes = small;
+    if (check_records(self, &view, 1, self->byte_length, offset) < 0) {
+        goto done;
+    }
+    if (self->entry_count > 64) {
+        codes = PyMem_Malloc(self->entry_count * sizeof(uint64_t));
+        if (codes == NULL) {
+            PyErr_NoMemory();
+            goto done;
+        }
+    }
+    extract_records(self, (const uint8_t *)view.buf + offset, 1, self->byte_length, (uint8_t *)codes);
+    list = PyList_New(0);
+    if (list != NULL && append_labels(self, codes, list) < 0) {
+        Py_CLEAR(list);
+    }
+done:
+    if (codes != small) {
+        PyMem_Free(codes);
+    }
+    PyBuffer_Release(&view);
+    return list;
+}
+
+static PyObject *
+Table_parse_batch(TableObject *self, PyObject *args)
+{
+    Py_buffer view;
+    Py_ssize_t count, stride, offset = 0;
+    if (check_ready(self) < 0 || !PyArg_ParseTuple(args, "y*nn|n:parse_batch", &view, &count, &stride, &offset)) {
+        return NULL;
+    }
+    PyObject *results = NULL;
+    uint64_t *codes = NULL;
+    if (check_records(self, &view, count, stride, offset) < 0) {
+        goto done;
+    }
+    if (self->entry_count && count > PY_SSIZE_T_MAX / (self->entry_count * (Py_ssize_t)sizeof(uint64_t))) {
+        PyErr_NoMemory();
+        goto done;
+    }
+    codes = PyMem_RawMalloc(count * self->entry_count * sizeof(uint64_t) + 1);
+    if (codes == NULL) {
+        PyErr_NoMemory();
+        goto done;
+    }
+    Py_BEGIN_ALLOW_THREADS
+    extract_records(self, (const uint8_t *)view.buf + offset, count, stride, (uint8_t *)codes);
+    Py_END_ALLOW_THREADS
+
+    results = PyList_New(count);
+    if (results == NULL) {
+        goto done;
+    }
+    for (Py_ssize_t record = 0; record < count; record++) {
+        PyObject *list = PyList_New(0);
+        if (list == NULL || append_labels(self, codes + record * self->entry_count, list) < 0) {
+            Py_XDECREF(list);
+            Py_CLEAR(results);
+            goto done;
+        }
+        PyList_SET_ITEM(results, record, list);
+    }
+done:
+    PyMem_RawFree(codes);
+    PyBuffer_Release(&view);
+    return results;
+}
+
+static PyObject *
+Table_extract_batch(TableObject *self, PyObject *args)
+{
+    Py_buffer view;
+    Py_ssize_t count, stride, offset = 0;
+    if (check_ready(self) < 0 || !PyArg_ParseTuple(args, "y*nn|n:extract_batch", &view, &count, &stride, &offset)) {
+        return NULL;
+    }
+    PyObject *result = NULL;
+    if (check_records(self, &view, count, stride, offset) < 0) {
+        goto done;
+    }
+    if (self->entry_count && count > PY_SSIZE_T_MAX / (self->entry_count * (Py_ssize_t)sizeof(uint64_t))) {
+        PyErr_NoMemory();
+        goto done;
+    }
+    result = PyBytes_FromStringAndSize(NULL, count * self->entry_count * sizeof(uint64_t));
+    if (result == NULL) {
+        goto done;
+    }
+    uint8_t *codes = (uint8_t *)PyBytes_AS_STRING(result);
+    Py_BEGIN_ALLOW_THREADS
+    extract_records(self, (const uint8_t *)view.buf + offset, count, stride, codes);
+    Py_END_ALLOW_THREADS
+done:
+    PyBuffer_Release(&view);
+    return result;
+}
+
+static PyObject *
+Table_encode_batch(TableObject *self, PyObject *args)
+{
+    Py_buffer view;
+    if (check_ready(self) < 0 || !PyArg_ParseTuple(args, "y*:encode_batch", &view)) {
+        return NULL;
+    }
+    PyObject *result = NULL;
+    Py_ssize_t row_size = self->entry_count * sizeof(uint64_t);
+    if (row_size == 0 ? view.len != 0 : view.len % row_size != 0) {
+        PyErr_Format(PyExc_ValueError, "codes buffer of %zd bytes does not hold rows of %zd entries", view.len, self->entry_count);
+        goto done;
+    }
+    Py_ssize_t count = row_size ? view.len / row_size : 0;
+    if (self->byte_length && count > PY_SSIZE_T_MAX / self->byte_length) {
+        PyErr_NoMemory();
+        goto done;
+    }
+    result = PyBytes_FromStringAndSize(NULL, count * self->byte_length);
+    if (result == NULL) {
+        goto done;
+    }
+    uint8_t *out = (uint8_t *)PyBytes_AS_STRING(result);
+    const uint8_t *codes_data = (const uint8_t *)view.buf;
+    Py_BEGIN_ALLOW_THREADS
+    memset(out, 0, count * self->byte_length);
+    for (Py_ssize_t record = 0; record < count; record++) {
+        uint8_t *bytes = out + record * self->byte_length;
+        for (Py_ssize_t entry = 0; entry < self->entry_count; entry++) {
+            uint64_t code;
+            /* the codes buffer may come from any exporter, so it is read without alignment assumptions */
+            memcpy(&code, codes_data + (record * self->entry_count + entry) * sizeof(uint64_t), sizeof(code));
+            for (uint32_t bit = self->entry_start[entry]; bit < self->entry_start[entry + 1]; bit++) {
+                if ((code >> self->target[bit]) & 1) {
+                    bytes[self->byte_pos[bit]] |= self->bit_mask[bit];
+                }
+            }
+        }
+    }
+    Py_END_ALLOW_THREADS
+done:
+    PyBuffer_Release(&view);
+    return result;
+}
+
+static PyMethodDef Table_methods[] = {
+    {"parse", (PyCFunction)Table_parse, METH_VARARGS,
+     "parse(buffer, offset=0) -> labels of the record at offset, like CompiledLayout.parse()"},
+    {"parse_batch", (PyCFunction)Table_parse_batch, METH_VARARGS,
+     "parse_batch(buffer, count, stride, offset=0) -> list of parse() results; extraction runs without the GIL"},
+    {"extract_batch", (PyCFunction)Table_extract_batch, METH_VARARGS,
+     "extract_batch(buffer, count, stride, offset=0) -> bytes of native uint64 entry values, one row per record"},
+    {"encode_batch", (PyCFunction)Table_encode_batch, METH_VARARGS,
+     "encode_batch(codes) -> concatenated records built from rows of native uint64 entry values"},
+    {NULL, NULL, 0, NULL}
+};
+
+static PyTypeObject TableType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "BitParser._accel.Table",
+    .tp_basicsize = sizeof(TableObject),
+    .tp_dealloc = (destructor)Table_dealloc,
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_doc = "Flattened compiled layout used by the C kernels.",
+    .tp_methods = Table_methods,
+    .tp_init = (initproc)Table_init,
+    .tp_new = PyType_GenericNew,
+};
+
+static struct PyModuleDef accel_module = {
+    PyModuleDef_HEAD_INIT,
+    .m_name = "BitParser._accel",
+    .m_doc = "C kernels for BitParser.accel.",
+    .m_size = -1,
+};
+
+PyMODINIT_FUNC
+PyInit__accel(void)
+{
+    if (PyType_Ready(&TableType) < 0) {
+        return NULL;
+    }
+    PyObject *module = PyModule_Create(&accel_module);
+    if (module == NULL) {
+        return NULL;
+    }
+    Py_INCREF(&TableType);
+    if (PyModule_AddObject(module, "Table", (PyObject *)&TableType) < 0) {
+        Py_DECREF(&TableType);
+        Py_DECREF(module);
+        return NULL;
+    }
+    return module;
+}
@@ -0,0 +1,212 @@
+import os
+from array import array
+
+try:
+    from BitParser import _accel
+except ImportError:
+    _accel = None
+
+from BitParser.BitParser import compile_descriptors, _UNDEFINED
+
+BACKENDS = ("auto", "c", "python")
+# widest multi-bit field the C kernels handle; entry values are uint64
+CODE_BITS = 64
+
+
+def available() -> bool:
+    """Whether the C kernels are built (BITPARSER_BUILD_ACCEL=1 pip install ., or build_ext --inplace in a checkout)."""
+    return _accel is not None
+
+
+class _PythonKernels():
+    """Pure-Python kernels with the interface of _accel.Table, built on the layout's own code."""
+
+    def __init__(self, layout, entries):
+        self.layout = layout
+        self.entries = entries
+
+    def _values(self, buffer, count, stride, offset):
+        layout = self.layout
+        view = memoryview(buffer).cast("B")
+        for start in range(offset, offset + count * stride, stride):
+            yield int.from_bytes(view[start:start + layout.byte_length], layout.byte_order)
+
+    def parse(self, buffer, offset=0):
+        return self.parse_batch(buffer, 1, self.layout.byte_length, offset)[0]
+
+    def parse_batch(self, buffer, count, stride, offset=0):
+        parse_value = self.layout._parse_value
+        return [parse_value(value) for value in self._values(buffer, count, stride, offset)]
+
+    def extract_batch(self, buffer, count, stride, offset=0):
+        codes = array("Q")
+        append = codes.append
+        for value in self._values(buffer, count, stride, offset):
+            for mask, group, _ in self.entries:
+                if group is None:
+                    append(1 if value & mask else 0)
+                else:
+                    append(group.extract(value))
+        return codes.tobytes()
+
+    def encode_batch(self, codes):
+        layout = self.layout
+        codes = memoryview(codes).cast("B").cast("Q")
+        width = len(self.entries)
+        if (len(codes) % width if width else len(codes)):
+            raise ValueError(f"codes buffer of {codes.nbytes} bytes does not hold rows of {width} entries")
+        records = []
+        for first in range(0, len(codes) if width else 0, width):
+            value = 0
+            for (mask, group, _), code in zip(self.entries, codes[first:first + width]):
+                if group is None:
+                    if code & 1:
+                        value |= mask
+                else:
+                    value |= group.place(code)
+            records.append(value.to_bytes(layout.byte_length, layout.byte_order))
+        return b"".join(records)
+
+
+def _c_table(layout, entries):
+    """Flattens a layout into an _accel.Table: for every entry, the (payload byte, mask, value bit) of its bits."""
+    entry_start = array("I", [0])
+    byte_pos = array("I")
+    bit_mask = bytearray()
+    target = bytearray()
+    is_field = bytearray()
+    labels = []
+    tables = []
+    evaluators = []
+    for _, group, index in entries:
+        if group is None:
+            bits = [(index, 0)]
+            is_field.append(0)
+            labels.append(layout.descriptors[index])
+            tables.append(None)
+            evaluators.append(None)
+        else:
+            bits = zip(group.indices, group.targets)
+            is_field.append(1)
+            labels.append(None)
+            tables.append(group.parser.value_table.dense)
+            evaluators.append(group.parser.evaluate)
+        for bit_index, value_bit in bits:
+            byte_index, position = divmod(layout._bit_columns[bit_index], 8)
+            byte_pos.append(byte_index)
+            bit_mask.append(0x80 >> position)
+            target.append(value_bit)
+        entry_start.append(len(byte_pos))
+    return _accel.Table(layout.byte_length, entry_start.tobytes(), byte_pos.tobytes(), bytes(bit_mask), bytes(target),
+                        bytes(is_field), tuple(labels), tuple(tables), tuple(evaluators), _UNDEFINED)
+
+
+class Accelerator():
+    """parse() and batch kernels of a compiled layout, run by the C module when it is built.
+
+    backend="auto" picks the C kernels when they are available (unless the
+    BITPARSER_NO_ACCEL environment variable is set) and the pure-Python ones otherwise;
+    "c" and "python" force one of them. Both give the same results as the layout. The C
+    batch calls release the GIL while reading or writing records, so threads sharing an
+    Accelerator run in parallel. Layouts with fields wider than 64 bits always use Python.
+    """
+
+    def __init__(self, descriptors, backend="auto"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {', '.join(BACKENDS)}")
+        layout = compile_descriptors(descriptors)
+        owners = layout._owner_of_shift()
+        # one entry per parse() position: (payload mask, group or None, descriptor index of a flag)
+        entries = [(mask, group, None if group is not None else owners[mask.bit_length() - 1])
+                   for mask, _, _, group in layout._parse_plan]
+        wide = any(group is not None and group.num_bits > CODE_BITS for _, group, _ in entries)
+
+        if backend == "auto":
+            backend = "c" if _accel is not None and not wide and not os.environ.get("BITPARSER_NO_ACCEL") else "python"
+        elif backend == "c":
+            if _accel is None:
+                raise ImportError("The C accelerator is not built: BITPARSER_BUILD_ACCEL=1 python setup.py build_ext --inplace")
+            if wide:
+                raise ValueError(f"The C accelerator handles fields of up to {CODE_BITS} bits")
+        self.layout = layout
+        self.backend = backend
+        self._entries = entries
+        self._kernels = _c_table(layout, entries) if backend == "c" else _PythonKernels(layout, entries)
+
+    @property
+    def entry_names(self) -> list:
+        """Column names of extract_batch(): the label of each flag and the name of each multi-bit field."""
+        layout = self.layout
+        names = []
+        for _, group, index in self._entries:
+            if group is None:
+                names.append(layout.descriptors[index])
+            else:
+                names.append(group.name or layout._address("field", group.indices[0]))
+        return names
+
+    def parse(self, bytes, offset=None, input_format=None) -> list:
+        """Same as CompiledLayout.parse()."""
+        layout = self.layout
+        if input_format is not None or isinstance(bytes, str):
+            bytes = layout._to_int(bytes, offset, input_format).to_bytes(layout.byte_length, layout.byte_order)
+            offset = None
+        if offset is None:
+            layout._check_length(len(bytes))
+            offset = 0
+        else:
+            layout._window(bytes, offset)
+        return self._kernels.parse(bytes, offset)
+
+    def _records(self, records, stride, offset):
+        """Returns (buffer, count, stride, offset) for a list of records or a buffer of fixed-size records."""
+        layout = self.layout
+        if isinstance(records, (list, tuple)):
+            if stride is not None or offset:
+                raise ValueError("stride and offset apply to a buffer of records, not to a list")
+            chunks = []
+            for record in records:
+                if isinstance(record, str):
+                    record = layout._unhexlify(record, None)
+                else:
+                    layout._check_length(len(record))
+                chunks.append(record)
+            return b"".join(chunks), len(chunks), layout.byte_length, 0
+
+        view = memoryview(records)
+        if view.ndim != 1 or view.itemsize != 1:
+            view = view.cast("B")
+        stride = layout.byte_length if stride is None else stride
+        if offset < 0 or stride < 1 or offset + layout.byte_length > stride:
+            raise ValueError(f"A record of {layout.byte_length} bytes at offset {offset} does not fit in a stride of {stride} bytes")
+        if len(view) % stride:
+            raise ValueError(f"Buffer size ({len(view)}) is not a multiple of the record stride ({stride})")
+        return view, len(view) // stride, stride, offset
+
+    def parse_batch(self, records, stride=None, offset=0) -> list:
+        """parse() of every record of a list, or of a buffer holding one record every stride bytes (at offset in each)."""
+        buffer, count, stride, offset = self._records(records, stride, offset)
+        return self._kernels.parse_batch(buffer, count, stride, offset)
+
+    def extract_batch(self, records, stride=None, offset=0) -> memoryview:
+        """Returns the raw value of every parse() entry of every record as a (records, entries) uint64 memoryview.
+
+        Columns follow entry_names: 0 or 1 for a flag, the field value for a multi-bit
+        field. numpy.asarray() wraps the result without copying.
+        """
+        buffer, count, stride, offset = self._records(records, stride, offset)
+        codes = memoryview(self._kernels.extract_batch(buffer, count, stride, offset)).cast("Q")
+        return codes.cast("B").cast("Q", (count, len(self._entries))) if len(codes) else codes
+
+    def encode_batch(self, codes) -> bytes:
+        """Inverse of extract_batch(): concatenated records built from rows of native uint64 entry values.
+
+        Values are placed as given, cut to the field width; use CompiledLayout.encode() to
+        validate labels and values.
+        """
+        return self._kernels.encode_batch(codes)
+
+
+def accelerate(descriptors, backend="auto") -> Accelerator:
+    """Returns an Accelerator for descriptors (or a compiled layout)."""
+    return Accelerator(descriptors, backend)
@@ -0,0 +1,146 @@
+import binascii
+
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
+
+from BitParser.BitParser import compile_descriptors
+
+
+def column_names(layout) -> tuple:
+    """Returns ([(column, descriptor_index)], [(column, group)]) for single-bit flags and multi-bit fields.
+
+    Columns are named after the label (or the inferred field name). Names that would
+    be ambiguous fall back to the 'label:byte:bit' form understood by encode_bits.
+    """
+    layout = compile_descriptors(layout)
+    layout._analyse()
+
+    flag_indices = [index for index, group_ref in enumerate(layout._index_to_group) if group_ref is None]
+    label_counts = {}
+    for index in flag_indices:
+        label = layout.descriptors[index]
+        label_counts[label] = label_counts.get(label, 0) + 1
+
+    flags = []
+    for index in flag_indices:
+        label = layout.descriptors[index]
+        name = label if label_counts[label] == 1 else layout._address(label, index)
+        flags.append((name, index))
+
+    name_counts = {}
+    for group in layout.groups:
+        name_counts[group.name] = name_counts.get(group.name, 0) + 1
+
+    fields = []
+    for group in layout.groups:
+        name = group.name
+        if name is None or name_counts[name] > 1 or name in label_counts:
+            name = layout._address(name or "field", group.indices[0])
+        fields.append((name, group))
+
+    return flags, fields
+
+
+def _records_to_matrix(records, byte_length):
+    if isinstance(records, np.ndarray):
+        if records.dtype != np.uint8 or records.ndim != 2:
+            raise ValueError("records array must be a 2-D uint8 array")
+        if records.shape[1] != byte_length:
+            raise ValueError(f"records array width ({records.shape[1]}) does not correspond to descriptors list length ({byte_length})")
+        return records
+
+    chunks = []
+    for record in records:
+        if isinstance(record, str):
+            record = binascii.unhexlify(record)
+        if len(record) != byte_length:
+            raise ValueError(f"bytesStr length ({len(record)}) does not correspond to descriptors list length ({byte_length})")
+        chunks.append(bytes(record))
+    return np.frombuffer(b"".join(chunks), dtype=np.uint8).reshape(len(chunks), byte_length)
+
+
+def _field_values(bits, layout, group):
+    columns = [layout._bit_columns[index] for index in group.indices]
+    if group.num_bits <= 63:
+        weights = np.array([1 << target for target in group.targets], dtype=np.int64)
+        return bits[:, columns].astype(np.int64) @ weights
+
+    values = np.zeros(len(bits), dtype=object)
+    for column, target in zip(columns, group.targets):
+        values += bits[:, column].astype(object) * (1 << target)
+    return values
+
+
+def _field_categories(values, group):
+    """Returns (codes, categories): each distinct value is evaluated once and equal labels share a category."""
+    uniques, inverse = np.unique(values, return_inverse=True)
+    positions = {}
+    unique_codes = np.empty(len(uniques), dtype=np.int32)
+    for position, value in enumerate(uniques):
+        unique_codes[position] = positions.setdefault(group.parser.evaluate(int(value)), len(positions))
+    return unique_codes[inverse.reshape(-1)], list(positions)
+
+
+def _field_labels(values, group):
+    codes, categories = _field_categories(values, group)
+    labels = np.empty(len(categories), dtype=object)
+    labels[:] = categories
+    return labels[codes]
+
+
+def _parse_batch_numpy(records, layout):
+    matrix = _records_to_matrix(records, layout.byte_length)
+    bits = np.unpackbits(matrix, axis=1)
+    flag_columns, field_columns = column_names(layout)
+
+    fields = {}
+    field_labels = {}
+    for name, group in field_columns:
+        values = _field_values(bits, layout, group)
+        fields[name] = values
+        field_labels[name] = _field_labels(values, group)
+
+    return {
+        "flags": {name: bits[:, layout._bit_columns[index]].astype(bool) for name, index in flag_columns},
+        "fields": fields,
+        "field_labels": field_labels,
+    }
+
+
+def _parse_batch_python(records, layout, columnar):
+    if np is not None and isinstance(records, np.ndarray):
+        buffer = _records_to_matrix(records, layout.byte_length).tobytes()
+        width = layout.byte_length
+        records = [buffer[row * width:(row + 1) * width] for row in range(len(records))]
+    values = [layout._to_int(record) for record in records]
+    if not columnar:
+        return [layout._parse_value(value) for value in values]
+
+    flag_columns, field_columns = column_names(layout)
+    result = {"flags": {}, "fields": {}, "field_labels": {}}
+    for name, index in flag_columns:
+        mask = 1 << layout._shifts[index]
+        result["flags"][name] = [bool(value & mask) for value in values]
+    for name, group in field_columns:
+        field_values = [group.extract(value) for value in values]
+        result["fields"][name] = field_values
+        result["field_labels"][name] = [group.parser.evaluate(value) for value in field_values]
+    return result
+
+
+def parse_bits_batch(records, descriptors: list, columnar=False):
+    """Parses many fixed-width records against one descriptor list.
+
+    records is a sequence of bytes or hex strings, or a 2-D uint8 NumPy array with one
+    record per row. By default returns one parse_bits() result per record. With
+    columnar=True returns {"flags": {column: bools}, "fields": {column: ints},
+    "field_labels": {column: labels}} (see column_names() for naming), as NumPy
+    arrays when NumPy is installed and plain Python lists otherwise. Label output always
+    walks the compiled layout record by record, which beats building an object matrix.
+    """
+    layout = compile_descriptors(descriptors)
+    if columnar and np is not None:
+        return _parse_batch_numpy(records, layout)
+    return _parse_batch_python(records, layout, columnar)
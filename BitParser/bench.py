@@ -0,0 +1,213 @@
+"""Benchmarks for parse_bits, parse_bits_full, parse_bits_batch, encode_bits and describe_bits.
+
+    python -m BitParser.bench                        # print results
+    python -m BitParser.bench --save baseline.json   # store a baseline
+    python -m BitParser.bench --compare baseline.json --threshold 0.2
+
+Layouts from 1 to 256 bytes are generated with a given share of bits taken by multi-bit
+fields. For each case the suite reports operations per second and the memory blocks/bytes
+each call leaves allocated (the result) plus the peak traced memory of one call.
+"""
+import argparse
+import binascii
+import gc
+import json
+import platform
+import random
+import sys
+import timeit
+import tracemalloc
+
+from BitParser.BitParser import (
+    MultiBitValueParser,
+    SameValueRange,
+    parse_bits,
+    parse_bits_full,
+    encode_bits,
+    describe_bits,
+)
+from BitParser.batch import parse_bits_batch
+
+DEFAULT_SIZES = (1, 4, 16, 64, 256)
+DEFAULT_DENSITIES = (0.0, 0.25, 0.75)
+# records per parse_bits_batch call
+BATCH_SIZE = 100
+
+
+def build_layout(byte_length, multibit_density, seed=0):
+    """Returns (descriptors, enabled_labels, values) for a generated layout.
+
+    Roughly multibit_density of the bits belong to 2 to 4 bit wide fields named "field N";
+    the remaining bits are flags named "flag N". enabled_labels and values describe one
+    valid payload for encode_bits.
+    """
+    rng = random.Random(seed)
+    descriptors = []
+    enabled_labels = []
+    values = {}
+    bit_length = byte_length * 8
+    while len(descriptors) < bit_length:
+        remaining = bit_length - len(descriptors)
+        if remaining >= 2 and rng.random() < multibit_density:
+            num_bits = min(rng.randint(2, 4), remaining)
+            name = f"field {len(values)}"
+            parser = MultiBitValueParser(SameValueRange(0, 2 ** num_bits - 1, num_bits, name, return_value_instead_of_name=True))
+            descriptors.extend([parser] * num_bits)
+            values[name] = rng.randrange(2 ** num_bits)
+        else:
+            label = f"flag {len(descriptors)}"
+            descriptors.append(label)
+            if rng.random() < 0.5:
+                enabled_labels.append(label)
+    return descriptors, enabled_labels, values
+
+
+def _cases(byte_length, density, seed):
+    descriptors, enabled_labels, values = build_layout(byte_length, density, seed)
+    payload = encode_bits(enabled_labels, descriptors, values=values)
+    raw = binascii.unhexlify(payload)
+    inputs = {"bytes": raw, "hex": payload, "memoryview": memoryview(raw)}
+
+    cases = []
+    for input_name, data in inputs.items():
+        cases.append((f"parse_bits[{input_name}]", lambda data=data: parse_bits(data, descriptors)))
+        cases.append((f"parse_bits_full[{input_name}]", lambda data=data: parse_bits_full(data, descriptors)))
+    records = [raw] * BATCH_SIZE
+    cases.append(("parse_bits_batch", lambda: parse_bits_batch(records, descriptors)))
+    cases.append(("encode_bits", lambda: encode_bits(enabled_labels, descriptors, values=values)))
+    cases.append(("describe_bits", lambda: describe_bits(descriptors)))
+    return cases
+
+
+def _ops_per_sec(function, min_time, repeat):
+    timer = timeit.Timer(function)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time / 10:
+            break
+        number *= 10
+    best = min([elapsed] + timer.repeat(repeat - 1, number)) if repeat > 1 else elapsed
+    return number / best
+
+
+def _allocations(function, calls=5):
+    tracemalloc.start()
+    try:
+        tracemalloc.clear_traces()
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.clear_traces()
+        results = [function() for _ in range(calls)]
+        gc.collect()
+        statistics = tracemalloc.take_snapshot().statistics("filename")
+    finally:
+        tracemalloc.stop()
+    del results
+    blocks = sum(statistic.count for statistic in statistics)
+    size = sum(statistic.size for statistic in statistics)
+    return blocks / calls, size / calls, peak
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, densities=DEFAULT_DENSITIES, min_time=0.2, repeat=3, seed=0, report=None):
+    """Runs every case and returns a list of result dicts."""
+    results = []
+    for byte_length in sizes:
+        for density in densities:
+            for name, function in _cases(byte_length, density, seed):
+                blocks, size, peak = _allocations(function)
+                result = {
+                    "name": name,
+                    "byte_length": byte_length,
+                    "multibit_density": density,
+                    "ops_per_sec": _ops_per_sec(function, min_time, repeat),
+                    "alloc_blocks": blocks,
+                    "alloc_bytes": size,
+                    "peak_bytes": peak,
+                }
+                results.append(result)
+                if report:
+                    report(result)
+    return results
+
+
+def _package_version():
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:  # pragma: no cover - Python < 3.8
+        return "unknown"
+    try:
+        return version("bit-parser")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def _case_key(result):
+    return (result["name"], result["byte_length"], result["multibit_density"])
+
+
+def compare(baseline, results, threshold=0.2):
+    """Returns [(result, baseline_result, ratio)] for cases slower than the baseline by more than threshold."""
+    previous = {_case_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = previous.get(_case_key(result))
+        if old is None:
+            continue
+        ratio = result["ops_per_sec"] / old["ops_per_sec"]
+        if ratio < 1 - threshold:
+            regressions.append((result, old, ratio))
+    return regressions
+
+
+def _format_result(result):
+    return (f"{result['name']:<26} {result['byte_length']:>4} B  density {result['multibit_density']:<5}"
+            f" {result['ops_per_sec']:>12,.0f} ops/s  {result['alloc_blocks']:>8.1f} blocks"
+            f"  {result['alloc_bytes']:>10,.0f} B  peak {result['peak_bytes']:>10,} B")
+
+
+def _float_list(text):
+    return [float(item) for item in text.split(",") if item]
+
+
+def _int_list(text):
+    return [int(item) for item in text.split(",") if item]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m BitParser.bench", description="Benchmark bit-parser.")
+    parser.add_argument("--sizes", type=_int_list, default=list(DEFAULT_SIZES), help="comma separated layout sizes in bytes")
+    parser.add_argument("--densities", type=_float_list, default=list(DEFAULT_DENSITIES), help="comma separated share of multi-bit bits")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per timing run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before a case counts as a regression")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.densities, args.min_time, args.repeat,
+                             report=lambda result: print(_format_result(result)))
+
+    if args.save:
+        with open(args.save, "w") as output:
+            json.dump({
+                "version": _package_version(),
+                "python": platform.python_version(),
+                "results": results,
+            }, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(baseline, results, args.threshold)
+        for result, old, ratio in regressions:
+            print(f"REGRESSION {result['name']} {result['byte_length']} B density {result['multibit_density']}: "
+                  f"{old['ops_per_sec']:,.0f} -> {result['ops_per_sec']:,.0f} ops/s ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.compare} (version {baseline.get('version', 'unknown')})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+from BitParser.BitParser import compile_descriptors, _cached_layout
+
+
+def _diff_values(layout, old, new) -> list:
+    changed = old ^ new
+    if not changed:
+        return []
+
+    owners = layout._owner_of_shift()
+    indices = []
+    while changed:
+        lowest = changed & -changed
+        indices.append(owners[lowest.bit_length() - 1])
+        changed ^= lowest
+    indices.sort()
+
+    events = []
+    seen_groups = set()
+    for index in indices:
+        group_ref = layout._index_to_group[index]
+        if group_ref is None:
+            events.append({
+                "event": "set" if (new >> layout._shifts[index]) & 1 else "cleared",
+                "label": layout.descriptors[index],
+                "descriptor_index": index,
+            })
+            continue
+
+        group = group_ref[0]
+        if group.group_id in seen_groups:
+            continue
+        seen_groups.add(group.group_id)
+        old_value = group.extract(old)
+        new_value = group.extract(new)
+        events.append({
+            "event": "changed",
+            "name": group.name,
+            "group_id": group.group_id,
+            "old_value": old_value,
+            "new_value": new_value,
+            "old_label": group.parser.evaluate(old_value),
+            "new_label": group.parser.evaluate(new_value),
+        })
+    return events
+
+
+def diff_bits(old, new, descriptors: list, input_format=None) -> list:
+    """Returns the events turning sample old into sample new, in descriptor order.
+
+    Samples are anything parse_bits() accepts. Single-bit labels produce
+    {"event": "set" | "cleared", "label", "descriptor_index"}; a multi-bit field produces
+    one {"event": "changed", "name", "group_id", "old_value", "new_value", "old_label",
+    "new_label"}. Only the bits that differ are decoded; equal samples return [] after a
+    single XOR.
+    """
+    layout = _cached_layout(descriptors)
+    return _diff_values(layout, layout._to_int(old, None, input_format), layout._to_int(new, None, input_format))
+
+
+class BitfieldTracker():
+    """Keeps the last sample of a polled bitfield and reports what changed with each new one.
+
+    The first update() only records the sample, unless an initial sample was given.
+    """
+
+    def __init__(self, descriptors: list, initial=None, input_format=None):
+        self.layout = compile_descriptors(descriptors)
+        self.input_format = input_format
+        self.value = None if initial is None else self.layout._to_int(initial, None, input_format)
+
+    def update(self, sample, offset=None) -> list:
+        """Records sample and returns diff_bits() events against the previous one."""
+        value = self.layout._to_int(sample, offset, self.input_format)
+        previous = self.value
+        self.value = value
+        if previous is None or previous == value:
+            return []
+        return _diff_values(self.layout, previous, value)
+
+    def reset(self):
+        self.value = None
@@ -0,0 +1,121 @@
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
+
+try:
+    import pandas as pd
+except ModuleNotFoundError:
+    pd = None
+
+try:
+    import pyarrow as pa
+except ModuleNotFoundError:
+    pa = None
+
+from BitParser.BitParser import compile_descriptors
+from BitParser.batch import column_names, _records_to_matrix, _field_values, _field_categories
+
+LABEL_COLUMN_SUFFIX = " label"
+
+
+def _label_column_name(name, group, layout, taken):
+    column = name + LABEL_COLUMN_SUFFIX
+    if column in taken:
+        column = layout._address(name, group.indices[0]) + LABEL_COLUMN_SUFFIX
+    return column
+
+
+def _extract_columns(records, layout):
+    """Returns [(column, kind, data)] in descriptor order.
+
+    kind is "flag" (data: bools), "field" (data: ints) or "label" (data: (codes, categories)).
+    """
+    flag_columns, field_columns = column_names(layout)
+    taken = {name for name, _ in flag_columns} | {name for name, _ in field_columns}
+
+    if np is not None:
+        bits = np.unpackbits(_records_to_matrix(records, layout.byte_length), axis=1)
+        flag_data = [bits[:, layout._bit_columns[index]].astype(bool) for _, index in flag_columns]
+        field_data = []
+        for _, group in field_columns:
+            values = _field_values(bits, layout, group)
+            field_data.append((values, _field_categories(values, group)))
+    else:
+        values = [layout._to_int(record) for record in records]
+        flag_data = [[bool(value & (1 << layout._shifts[index])) for value in values] for _, index in flag_columns]
+        field_data = []
+        for _, group in field_columns:
+            field_values = [group.extract(value) for value in values]
+            positions = {}
+            codes = [positions.setdefault(group.parser.evaluate(value), len(positions)) for value in field_values]
+            field_data.append((field_values, (codes, list(positions))))
+
+    columns = [(name, index, "flag", data) for (name, index), data in zip(flag_columns, flag_data)]
+    for (name, group), (values, categories) in zip(field_columns, field_data):
+        columns.append((name, group.indices[0], "field", values))
+        columns.append((_label_column_name(name, group, layout, taken), group.indices[0], "label", categories))
+    columns.sort(key=lambda column: column[1])
+    return [(name, kind, data) for name, _, kind, data in columns]
+
+
+def to_columns(records, descriptors: list) -> dict:
+    """Parses a batch of records into a dict of columns in descriptor order.
+
+    Every single-bit label becomes a bool column and every multi-bit field an int column
+    named like in column_names(), followed by a "<name> label" column with the value
+    labels. Columns are NumPy arrays when NumPy is installed, lists otherwise.
+    """
+    layout = compile_descriptors(descriptors)
+    result = {}
+    for name, kind, data in _extract_columns(records, layout):
+        if kind == "label":
+            codes, categories = data
+            if np is not None:
+                labels = np.empty(len(categories), dtype=object)
+                labels[:] = categories
+                data = labels[codes]
+            else:
+                data = [categories[code] for code in codes]
+        result[name] = data
+    return result
+
+
+def to_dataframe(records, descriptors: list):
+    """Like to_columns(), returned as a pandas DataFrame with categorical label columns."""
+    if pd is None:
+        raise ImportError("to_dataframe() requires pandas: pip install bit-parser[pandas]")
+    layout = compile_descriptors(descriptors)
+    data = {}
+    for name, kind, column in _extract_columns(records, layout):
+        if kind == "label":
+            codes, categories = column
+            column = pd.Categorical.from_codes(codes, categories=pd.Index(categories, dtype=object))
+        data[name] = column
+    return pd.DataFrame(data)
+
+
+def _arrow_dictionary(categories):
+    try:
+        return pa.array(categories)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # mixed label types (e.g. numbers and "RFU") are stored as strings
+        return pa.array([str(category) for category in categories])
+
+
+def to_arrow(records, descriptors: list):
+    """Like to_columns(), returned as a pyarrow Table with dictionary-encoded label columns."""
+    if pa is None:
+        raise ImportError("to_arrow() requires pyarrow: pip install bit-parser[arrow]")
+    layout = compile_descriptors(descriptors)
+    names = []
+    arrays = []
+    for name, kind, column in _extract_columns(records, layout):
+        if kind == "label":
+            codes, categories = column
+            column = pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int32()), _arrow_dictionary(categories))
+        else:
+            column = pa.array(column)
+        names.append(name)
+        arrays.append(column)
+    return pa.Table.from_arrays(arrays, names=names)
@@ -0,0 +1,100 @@
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from BitParser.BitParser import compile_descriptors
+
+DEFAULT_CHUNKSIZE = 20000
+
+_worker_layout = None
+_worker_parse_value = None
+
+
+def _init_worker(layout, mode):
+    # the compiled layout is shipped once per worker process instead of once per chunk
+    global _worker_layout, _worker_parse_value
+    _worker_layout = layout
+    _worker_parse_value = layout._parse_value_full if mode == "full" else layout._parse_value
+
+
+def _parse_buffer(buffer, count, stride, offset):
+    to_int = _worker_layout._to_int
+    return [_worker_parse_value(to_int(buffer, record * stride + offset)) for record in range(count)]
+
+
+def _parse_records_chunk(records):
+    to_int = _worker_layout._to_int
+    return [_worker_parse_value(to_int(record)) for record in records]
+
+
+def _parse_file_chunk(path, first_record, count, stride, offset):
+    start = first_record * stride
+    map_start = start - start % mmap.ALLOCATIONGRANULARITY
+    with open(path, "rb") as source:
+        with mmap.mmap(source.fileno(), start + count * stride - map_start, access=mmap.ACCESS_READ, offset=map_start) as mapped:
+            return _parse_buffer(mapped, count, stride, start - map_start + offset)
+
+
+def _record_count(records, stride):
+    if isinstance(records, (str, os.PathLike)):
+        size = os.path.getsize(records)
+    elif isinstance(records, (list, tuple)):
+        return len(records)
+    else:
+        size = memoryview(records).nbytes
+    if size % stride:
+        raise ValueError(f"Input size ({size}) is not a multiple of the record stride ({stride})")
+    return size // stride
+
+
+def _tasks(records, count, stride, offset, chunksize):
+    if isinstance(records, (str, os.PathLike)):
+        path = os.fspath(records)
+        for first in range(0, count, chunksize):
+            yield _parse_file_chunk, (path, first, min(chunksize, count - first), stride, offset)
+    elif isinstance(records, (list, tuple)):
+        for first in range(0, count, chunksize):
+            yield _parse_records_chunk, (records[first:first + chunksize],)
+    else:
+        view = memoryview(records).cast("B")
+        for first in range(0, count, chunksize):
+            chunk_count = min(chunksize, count - first)
+            chunk = bytes(view[first * stride:(first + chunk_count) * stride])
+            yield _parse_buffer, (chunk, chunk_count, stride, offset)
+
+
+def _run(tasks, layout, mode, workers):
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(layout, mode)) as executor:
+        pending = deque()
+        for function, arguments in tasks:
+            pending.append(executor.submit(function, *arguments))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def parse_bits_parallel(records, descriptors: list, workers=None, chunksize=DEFAULT_CHUNKSIZE, stride=None, offset=0, mode="labels"):
+    """Parses many records on a pool of worker processes and yields the results in input order.
+
+    records is a path to a file of fixed-size records, a bytes-like buffer of consecutive
+    records (bytes, bytearray, memoryview, mmap) or a list of records. Records start every
+    stride bytes (default: the layout size) and the bitfield sits offset bytes into each
+    record. Workers receive the compiled layout once and memory-map their own slice of a
+    file. mode="full" yields parse_bits_full() results. At most two chunks per worker are
+    in flight, so results can be consumed as a stream.
+    """
+    layout = compile_descriptors(descriptors)
+    if mode not in ("labels", "full"):
+        raise ValueError(f"Unknown mode '{mode}', expected 'labels' or 'full'")
+    if stride is None:
+        stride = layout.byte_length
+    if offset < 0 or offset + layout.byte_length > stride:
+        raise ValueError(f"A {layout.byte_length} byte bitfield at offset {offset} does not fit in a {stride} byte record")
+    if chunksize < 1:
+        raise ValueError("chunksize must be positive")
+
+    workers = workers or os.cpu_count() or 1
+    count = _record_count(records, stride)
+    return _run(_tasks(records, count, stride, offset, chunksize), layout, mode, workers)
@@ -0,0 +1,352 @@
+import ast
+import operator
+
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
+
+from BitParser.BitParser import compile_descriptors, _MultiBitGroup
+from BitParser.batch import _records_to_matrix, _field_values
+
+# Compiled queries are trees of tuples:
+#   ("const", bool)
+#   ("match", mask, expected)        payload & mask == expected
+#   ("range", group, low, high)      low <= field value <= high
+#   ("not", node), ("and", [nodes]), ("or", [nodes])
+_TRUE = ("const", True)
+_FALSE = ("const", False)
+
+_COMPARISONS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+# the operator to use when the constant is written on the left, e.g. 3 < Status
+_MIRRORED = {
+    operator.eq: operator.eq,
+    operator.ne: operator.ne,
+    operator.lt: operator.gt,
+    operator.le: operator.ge,
+    operator.gt: operator.lt,
+    operator.ge: operator.le,
+}
+
+
+def _and(nodes):
+    flat = []
+    for node in nodes:
+        flat.extend(node[1] if node[0] == "and" else [node])
+
+    mask = 0
+    expected = 0
+    rest = []
+    for node in flat:
+        if node == _FALSE:
+            return _FALSE
+        if node[0] == "match":
+            if (expected ^ node[2]) & mask & node[1]:
+                return _FALSE
+            mask |= node[1]
+            expected |= node[2]
+        elif node != _TRUE:
+            rest.append(node)
+    # every label and equality test of a conjunction becomes one mask-and-compare
+    if mask:
+        rest.insert(0, ("match", mask, expected))
+    if not rest:
+        return _TRUE
+    return rest[0] if len(rest) == 1 else ("and", rest)
+
+
+def _or(nodes):
+    flat = []
+    for node in nodes:
+        flat.extend(node[1] if node[0] == "or" else [node])
+    if _TRUE in flat:
+        return _TRUE
+    rest = [node for node in flat if node != _FALSE]
+    if not rest:
+        return _FALSE
+    return rest[0] if len(rest) == 1 else ("or", rest)
+
+
+def _not(node):
+    if node[0] == "const":
+        return _FALSE if node[1] else _TRUE
+    if node[0] == "not":
+        return node[1]
+    if node[0] == "match" and not node[1] & (node[1] - 1):
+        # a cleared single bit is still a mask-and-compare
+        return ("match", node[1], node[2] ^ node[1])
+    return ("not", node)
+
+
+def _range_node(layout, target, low, high):
+    """Node for low <= value <= high of a single-bit label (descriptor index) or multi-bit group."""
+    if isinstance(target, _MultiBitGroup):
+        width_mask = (1 << target.num_bits) - 1
+        low, high = max(low, 0), min(high, width_mask)
+        if low > high:
+            return _FALSE
+        if low == 0 and high == width_mask:
+            return _TRUE
+        if low == high:
+            return ("match", target.place(width_mask), target.place(low))
+        return ("range", target, low, high)
+
+    low, high = max(low, 0), min(high, 1)
+    if low > high:
+        return _FALSE
+    if low == 0 and high == 1:
+        return _TRUE
+    mask = 1 << layout._shifts[target]
+    return ("match", mask, mask if low else 0)
+
+
+class _QueryCompiler():
+    def __init__(self, layout):
+        self.layout = layout
+        self.expression = ""
+
+    def source(self, node):
+        return ast.get_source_segment(self.expression, node) or type(node).__name__
+
+    def compile(self, expression):
+        self.expression = expression.strip()
+        try:
+            tree = ast.parse(self.expression, mode="eval")
+        except SyntaxError as error:
+            raise ValueError(f"Invalid query {expression!r}: {error.msg}") from None
+        return self.node(tree.body)
+
+    def node(self, node):
+        if isinstance(node, ast.BoolOp):
+            nodes = [self.node(value) for value in node.values]
+            return _and(nodes) if isinstance(node.op, ast.And) else _or(nodes)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return _not(self.node(node.operand))
+        if isinstance(node, ast.Compare):
+            nodes = []
+            left = node.left
+            for op, right in zip(node.ops, node.comparators):
+                nodes.append(self.comparison(left, op, right))
+                left = right
+            return _and(nodes)
+        if isinstance(node, ast.Constant) and isinstance(node.value, bool):
+            return _TRUE if node.value else _FALSE
+        name = self.name(node)
+        if name is not None:
+            return self.presence(name)
+        raise ValueError(f"Unsupported query element '{self.source(node)}'")
+
+    @staticmethod
+    def name(node):
+        if isinstance(node, ast.Name):
+            return node.id
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return node.value
+        return None
+
+    def presence(self, name):
+        """A label is present when set (or, for a multi-bit value label, when its field holds that value)."""
+        layout = self.layout
+        try:
+            mask, expected = layout._label_term(name)
+        except ValueError as error:
+            # a field name on its own tests for a non-zero value
+            try:
+                target = layout._selection_target(name)
+            except ValueError:
+                raise error from None
+            return _not(_range_node(layout, target, 0, 0))
+        return ("match", mask, expected)
+
+    def comparison(self, left, op, right):
+        compare = _COMPARISONS.get(type(op))
+        if compare is None:
+            raise ValueError(f"Unsupported comparison operator {type(op).__name__}")
+        if isinstance(left, ast.Constant) and not isinstance(left.value, str):
+            left, right, compare = right, left, _MIRRORED[compare]
+        name = self.name(left)
+        if name is None:
+            raise ValueError(f"Left side of a comparison must be a field or label, got '{self.source(left)}'")
+        target = self.layout._selection_target(name)
+
+        if isinstance(right, ast.Constant) and isinstance(right.value, str):
+            if compare not in (operator.eq, operator.ne):
+                raise ValueError(f"Value labels can only be compared with == or !=, got '{right.value}'")
+            node = _or([_range_node(self.layout, target, low, high) for low, high in self.label_ranges(target, right.value)])
+            return node if compare is operator.eq else _not(node)
+        if not isinstance(right, ast.Constant) or not isinstance(right.value, int):
+            raise ValueError(f"'{name}' must be compared with an integer or a value label, got '{self.source(right)}'")
+
+        value = int(right.value)
+        width_max = (1 << target.num_bits) - 1 if isinstance(target, _MultiBitGroup) else 1
+        low, high = {
+            operator.eq: (value, value),
+            operator.ne: (value, value),
+            operator.lt: (0, value - 1),
+            operator.le: (0, value),
+            operator.gt: (value + 1, width_max),
+            operator.ge: (value, width_max),
+        }[compare]
+        node = _range_node(self.layout, target, low, high)
+        return _not(node) if compare is operator.ne else node
+
+    def label_ranges(self, target, label):
+        if not isinstance(target, _MultiBitGroup):
+            raise ValueError(f"Single-bit label '{self.layout.descriptors[target]}' can only be compared with integers")
+        table = target.parser.value_table
+        ranges = [(start, end) for start, end, segment_label, with_value in table.segments if segment_label == label and not with_value]
+        if not ranges:
+            # "label: value" labels of ranges that report their value
+            ranges = [(value, value) for value in table.find(label)]
+        if not ranges:
+            raise ValueError(f"Unknown value label '{label}'")
+        return ranges
+
+
+def _python_test(node):
+    """Turns a query node into a function of the payload int."""
+    kind = node[0]
+    if kind == "const":
+        result = node[1]
+        return lambda value: result
+    if kind == "match":
+        _, mask, expected = node
+        return lambda value: value & mask == expected
+    if kind == "range":
+        _, group, low, high = node
+        if group.shift >= 0:
+            shift, mask = group.shift, group.mask
+            return lambda value: low <= (value >> shift) & mask <= high
+        extract = group.extract
+        return lambda value: low <= extract(value) <= high
+    if kind == "not":
+        test = _python_test(node[1])
+        return lambda value: not test(value)
+    tests = [_python_test(child) for child in node[1]]
+    if kind == "and":
+        return lambda value: all(test(value) for test in tests)
+    return lambda value: any(test(value) for test in tests)
+
+
+def _numpy_test(node, matrix, layout, context):
+    """Evaluates a query node over a 2-D uint8 matrix of records, returning a bool per row."""
+    kind = node[0]
+    if kind == "const":
+        return np.full(len(matrix), node[1], dtype=bool)
+    if kind == "match":
+        _, mask, expected = node
+        mask_bytes = np.frombuffer(mask.to_bytes(layout.byte_length, layout.byte_order), dtype=np.uint8)
+        expected_bytes = np.frombuffer(expected.to_bytes(layout.byte_length, layout.byte_order), dtype=np.uint8)
+        columns = np.flatnonzero(mask_bytes)
+        return ((matrix[:, columns] & mask_bytes[columns]) == expected_bytes[columns]).all(axis=1)
+    if kind == "range":
+        _, group, low, high = node
+        if "bits" not in context:
+            context["bits"] = np.unpackbits(matrix, axis=1)
+        values = _field_values(context["bits"], layout, group)
+        return (values >= low) & (values <= high)
+    if kind == "not":
+        return ~_numpy_test(node[1], matrix, layout, context)
+    results = [_numpy_test(child, matrix, layout, context) for child in node[1]]
+    combine = np.logical_and if kind == "and" else np.logical_or
+    return combine.reduce(results)
+
+
+class Query():
+    """Expression over the labels of a layout, compiled to mask-and-compare tests on the payload int.
+
+    Returned by compile_query(); see there for the expression syntax.
+    """
+
+    def __init__(self, layout, expression, node):
+        self.layout = layout
+        self.expression = expression
+        self.node = node
+        self._test = _python_test(node)
+
+    def test_int(self, value) -> bool:
+        return self._test(value)
+
+    def __call__(self, bytes, offset=None, input_format=None) -> bool:
+        return self._test(self.layout._to_int(bytes, offset, input_format))
+
+    def _is_array(self, records):
+        return np is not None and isinstance(records, np.ndarray)
+
+    def _matrix(self, records):
+        if records.ndim == 1 and records.dtype == np.uint8 and self.layout.byte_length and len(records) % self.layout.byte_length == 0:
+            records = records.reshape(-1, self.layout.byte_length)
+        return _records_to_matrix(records, self.layout.byte_length)
+
+    def mask(self, records):
+        """Returns one bool per record: a NumPy array for NumPy input, a list otherwise."""
+        if self._is_array(records):
+            return _numpy_test(self.node, self._matrix(records), self.layout, {})
+        to_int = self.layout._to_int
+        test = self._test
+        return [test(to_int(record)) for record in records]
+
+    def indices(self, records) -> list:
+        """Returns the positions of the matching records."""
+        if self._is_array(records):
+            return np.flatnonzero(self.mask(records)).tolist()
+        to_int = self.layout._to_int
+        test = self._test
+        return [index for index, record in enumerate(records) if test(to_int(record))]
+
+    def filter(self, records):
+        """Returns the matching records: the matching rows for a NumPy array, a list otherwise."""
+        if self._is_array(records):
+            matrix = self._matrix(records)
+            return matrix[_numpy_test(self.node, matrix, self.layout, {})]
+        to_int = self.layout._to_int
+        test = self._test
+        return [record for record in records if test(to_int(record))]
+
+    def parse(self, records, full=False) -> list:
+        """Returns [(index, parse result)] for the matching records only; full=True uses parse_full()."""
+        layout = self.layout
+        parse_value = layout._parse_value_full if full else layout._parse_value
+        if self._is_array(records):
+            matrix = self._matrix(records)
+            matching = np.flatnonzero(_numpy_test(self.node, matrix, layout, {}))
+            return [(int(index), parse_value(layout._to_int(matrix[index]))) for index in matching]
+        results = []
+        test = self._test
+        for index, record in enumerate(records):
+            value = layout._to_int(record)
+            if test(value):
+                results.append((index, parse_value(value)))
+        return results
+
+
+def compile_query(expression: str, descriptors: list) -> Query:
+    """Compiles a filter expression over the labels and field names of a layout.
+
+    Terms are the labels accepted by encode_bits (quoted when they are not identifiers,
+    'label:byte:bit' included) and the field names of describe_bits, combined with and,
+    or, not and parentheses:
+
+        "Heater ON" and not "Fault" and Status == 3
+
+    A label is true when it is set, a multi-bit value label when its field holds that
+    value. Fields compare with integers (==, !=, <, <=, >, >=, chained comparisons too)
+    or with value labels (== and !=); a field name on its own is true when non-zero.
+    Equality tests joined by and are folded into one mask-and-compare.
+    """
+    layout = compile_descriptors(descriptors)
+    if not isinstance(expression, str):
+        raise ValueError("expression must be a str")
+    return Query(layout, expression, _QueryCompiler(layout).compile(expression))
+
+
+def query_bits(records, expression: str, descriptors: list):
+    """Returns the records matching expression; see compile_query() and Query.filter()."""
+    return compile_query(expression, descriptors).filter(records)
@@ -0,0 +1,272 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+
+try:
+    import yaml
+except ModuleNotFoundError:
+    yaml = None
+
+from BitParser import BitParser as _core
+from BitParser.BitParser import (
+    MultiBitValueParser,
+    SameValueRange,
+    IntField,
+    CompiledLayout,
+    compile_descriptors,
+    _infer_multibit_name_weighted,
+)
+
+SCHEMA_SUFFIXES = (".json", ".yaml", ".yml")
+# part of every cache key; bump when the pickled layout format changes
+CACHE_FORMAT = 1
+
+_core_digest = None
+
+
+def layout_to_schema(descriptors: list) -> dict:
+    """Returns the declarative schema of a layout: describe_bits() plus non-default bit and byte order."""
+    layout = compile_descriptors(descriptors)
+    schema = layout.describe()
+    if layout.bit_order != "msb":
+        schema["bit_order"] = layout.bit_order
+    if layout.byte_order != "big":
+        schema["byte_order"] = layout.byte_order
+    return schema
+
+
+def _field_segments(field, num_bits):
+    """(start, end, label, with_value) ranges of a multi_bit entry, from "ranges" or else "values"."""
+    if "ranges" in field:
+        return [(item["start"], item["end"], item["label"], bool(item.get("with_value", False))) for item in field["ranges"]]
+    segments = []
+    for item in field.get("values", []):
+        value = item["value_int"] if "value_int" in item else int(item["bits"], 2)
+        segments.append((value, value, item["label"], False))
+    return segments
+
+
+def _field_parser(field):
+    num_bits = field["num_bits"]
+    name = field.get("name")
+    segments = _field_segments(field, num_bits)
+    if field.get("type", "enum") == "int":
+        if not name:
+            raise ValueError(f"Integer field {field.get('group_id')} needs a name")
+        labels = [(start, end, label) for start, end, label, with_value in segments if not with_value]
+        return IntField(num_bits, name, labels)
+
+    if not segments:
+        raise ValueError(f"Multi-bit field '{name or field.get('group_id')}' has no values")
+    parser = MultiBitValueParser(*[
+        SameValueRange(start, end, num_bits, label, return_value_instead_of_name=with_value)
+        for start, end, label, with_value in segments
+    ])
+    # only names that differ from the inferred one are pinned, so encode keeps inferring as before
+    if name and name != _infer_multibit_name_weighted(parser.value_table.weighted_labels()):
+        parser.field_name = name
+    return parser
+
+
+def descriptors_from_schema(schema: dict) -> list:
+    """Builds the descriptor list described by a schema (a describe_bits() result or a hand-written one).
+
+    "bits" lists every bit in descriptor order, either as a label string or as a dict
+    with "label" for single bits and "group_id" for bits of a multi-bit field. Each
+    "multi_bit" entry gives "group_id", "num_bits", optionally "name" and "type"
+    ("enum" or "int"), and its labels as "ranges" ({"start", "end", "label",
+    "with_value"}) or "values" ({"bits" or "value_int", "label"}).
+    """
+    if not isinstance(schema, dict) or "bits" not in schema:
+        raise ValueError("Layout schema must be a dict with a 'bits' list")
+
+    fields = {}
+    for field in schema.get("multi_bit", []):
+        group_id = field.get("group_id")
+        if group_id in fields:
+            raise ValueError(f"Multi-bit group {group_id} is defined twice")
+        fields[group_id] = (field, _field_parser(field))
+
+    descriptors = []
+    group_indices = {group_id: [] for group_id in fields}
+    for index, bit in enumerate(schema["bits"]):
+        if isinstance(bit, str):
+            descriptors.append(bit)
+            continue
+        group_id = bit.get("group_id")
+        if bit.get("kind") == "bit" or (group_id is None and "label" in bit):
+            descriptors.append(bit["label"])
+            continue
+        if group_id not in fields:
+            raise ValueError(f"Bit {index} refers to unknown multi-bit group {group_id}")
+        descriptors.append(fields[group_id][1])
+        group_indices[group_id].append(index)
+
+    for group_id, (field, parser) in fields.items():
+        indices = group_indices[group_id]
+        if len(indices) != field["num_bits"]:
+            raise ValueError(f"Multi-bit group {group_id} has {field['num_bits']} bits but {len(indices)} bits refer to it")
+        if "descriptor_indices" in field and list(field["descriptor_indices"]) != indices:
+            raise ValueError(f"descriptor_indices of multi-bit group {group_id} do not match its bits: {indices}")
+    if "byte_length" in schema and schema["byte_length"] * 8 != len(descriptors):
+        raise ValueError(f"byte_length ({schema['byte_length']}) does not correspond to {len(descriptors)} bits")
+    return descriptors
+
+
+def compile_schema(schema: dict, **options) -> CompiledLayout:
+    """Compiles a schema; its bit_order and byte_order apply unless given in options."""
+    options.setdefault("bit_order", schema.get("bit_order", "msb"))
+    options.setdefault("byte_order", schema.get("byte_order", "big"))
+    return compile_descriptors(descriptors_from_schema(schema), **options)
+
+
+def _read_schema_text(text, path):
+    if str(path).endswith(".json"):
+        return json.loads(text)
+    if yaml is None:
+        raise ImportError(f"Loading {path} requires PyYAML: pip install bit-parser[yaml]")
+    return yaml.safe_load(text)
+
+
+def dump_layout(descriptors: list, path):
+    """Writes the schema of a layout to a .json, .yaml or .yml file."""
+    schema = layout_to_schema(descriptors)
+    path = os.fspath(path)
+    if path.endswith(".json"):
+        text = json.dumps(schema, indent=2)
+    else:
+        if yaml is None:
+            raise ImportError(f"Writing {path} requires PyYAML: pip install bit-parser[yaml]")
+        text = yaml.safe_dump(schema, sort_keys=False)
+    with open(path, "w") as output:
+        output.write(text)
+
+
+def _cache_key(content: bytes) -> str:
+    # compiled layouts are only reused by the same version of the compiling code
+    global _core_digest
+    if _core_digest is None:
+        with open(_core.__file__, "rb") as source:
+            _core_digest = hashlib.sha256(source.read()).hexdigest()
+    digest = hashlib.sha256(f"{CACHE_FORMAT}:{_core_digest}:".encode())
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def _load_cached(cache_path):
+    try:
+        with open(cache_path, "rb") as cached:
+            layout = pickle.load(cached)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # unreadable or outdated entries are compiled again and overwritten
+        return None
+    return layout if isinstance(layout, CompiledLayout) else None
+
+
+def _store_cached(cache_path, layout):
+    directory = os.path.dirname(cache_path)
+    os.makedirs(directory, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as output:
+            pickle.dump(layout, output, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, cache_path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def load_layout(source, cache_dir=None) -> CompiledLayout:
+    """Compiles a layout schema given as a dict or a path to a .json/.yaml/.yml file.
+
+    With cache_dir, the compiled layout (masks, value tables and label indexes) is
+    pickled under the SHA-256 of the schema content, so later processes load it without
+    reading the schema or compiling again. Changed schemas get a new entry.
+    """
+    if isinstance(source, dict):
+        content = json.dumps(source, sort_keys=True, default=str).encode()
+        schema = source
+    else:
+        path = os.fspath(source)
+        if not path.endswith(SCHEMA_SUFFIXES):
+            raise ValueError(f"Unknown layout file type '{path}', expected one of {', '.join(SCHEMA_SUFFIXES)}")
+        with open(path, "rb") as schema_file:
+            content = schema_file.read()
+        schema = None
+
+    cache_path = None
+    if cache_dir is not None:
+        suffix = "json" if schema is not None else os.path.splitext(path)[1][1:]
+        cache_path = os.path.join(os.fspath(cache_dir), _cache_key(suffix.encode() + b"\0" + content) + ".pickle")
+        layout = _load_cached(cache_path)
+        if layout is not None:
+            return layout
+
+    if schema is None:
+        schema = _read_schema_text(content.decode("utf-8"), path)
+    layout = compile_schema(schema)
+    if cache_path is not None:
+        layout._analyse()
+        _store_cached(cache_path, layout)
+    return layout
+
+
+class LayoutRegistry():
+    """Layouts by name, each loaded and compiled on first use.
+
+    Names come from register() or from the schema files of add_directory() (file name
+    without extension). Loaded layouts are kept for the lifetime of the registry.
+    """
+
+    def __init__(self, directory=None, cache_dir=None):
+        self.cache_dir = cache_dir
+        self._sources = {}
+        self._layouts = {}
+        self._lock = threading.Lock()
+        if directory is not None:
+            self.add_directory(directory)
+
+    def register(self, name, source):
+        """Registers a schema dict, schema file path or descriptor list under name."""
+        with self._lock:
+            self._sources[name] = source
+            self._layouts.pop(name, None)
+
+    def add_directory(self, directory):
+        """Registers every .json/.yaml/.yml file of directory; nothing is read until a layout is used."""
+        for entry in sorted(os.listdir(directory)):
+            stem, suffix = os.path.splitext(entry)
+            if suffix in SCHEMA_SUFFIXES:
+                self.register(stem, os.path.join(directory, entry))
+
+    def names(self) -> list:
+        return sorted(self._sources)
+
+    def __contains__(self, name):
+        return name in self._sources
+
+    def __len__(self):
+        return len(self._sources)
+
+    def get(self, name) -> CompiledLayout:
+        layout = self._layouts.get(name)
+        if layout is not None:
+            return layout
+        with self._lock:
+            if name not in self._layouts:
+                if name not in self._sources:
+                    raise KeyError(f"Unknown layout '{name}'")
+                source = self._sources[name]
+                if isinstance(source, (list, tuple, CompiledLayout)):
+                    layout = compile_descriptors(source)
+                else:
+                    layout = load_layout(source, self.cache_dir)
+                self._layouts[name] = layout
+            return self._layouts[name]
+
+    __getitem__ = get
@@ -0,0 +1,204 @@
+import linecache
+import os
+import sys
+from itertools import count
+
+from BitParser.BitParser import MultiBitValueParser, IntField, _UNDEFINED
+
+_sources = count()
+
+
+class _Source():
+    """Collects generated lines and the objects they refer to by name."""
+
+    def __init__(self):
+        self.lines = []
+        self.constants = {}
+
+    def line(self, indent, text):
+        self.lines.append("    " * indent + text)
+
+    def literal(self, value, prefix, key=None):
+        """Returns source for value: a literal for str/int/None, otherwise a closure variable.
+
+        Objects are shared by identity, or by key when given (bound methods are new objects on every access).
+        """
+        if value is None or type(value) in (str, int, bool):
+            return repr(value)
+        key = value if key is None else key
+        for name, (constant_key, _) in self.constants.items():
+            if constant_key is key:
+                return name
+        name = f"{prefix}{len(self.constants)}"
+        self.constants[name] = (key, value)
+        return name
+
+
+def _extraction(group):
+    """Source computing the value of a multi-bit group from `value`."""
+    if group.shift >= 0:
+        return f"(value >> {group.shift}) & {group.mask:#x}" if group.shift else f"value & {group.mask:#x}"
+    parts = []
+    for shift, mask, target in group.runs:
+        part = f"((value >> {shift}) & {mask:#x})"
+        parts.append(f"{part} << {target}" if target else part)
+    return " | ".join(parts)
+
+
+def _table_is_evaluate(parser):
+    """Whether evaluate() of parser is a plain lookup in its dense value table."""
+    evaluate = type(parser).evaluate
+    if evaluate is IntField.evaluate:
+        return parser._label_function is None
+    return evaluate is MultiBitValueParser.evaluate
+
+
+def _emit_field(source, indent, group, value_name, label_name, use_table):
+    """Lines setting label_name to the label of a group value; misses go to evaluate(), errors included."""
+    evaluate = source.literal(group.parser.evaluate, "evaluate_", group.parser)
+    dense = group.parser.value_table.dense
+    if dense is None or not use_table:
+        source.line(indent, f"{label_name} = {evaluate}({value_name})")
+        return
+    table = source.literal(dense, "table_")
+    source.line(indent, f"{label_name} = {table}[{value_name}]")
+    source.line(indent, f"if {label_name} is _U:")
+    source.line(indent + 1, f"{label_name} = {evaluate}({value_name})")
+
+
+def _lut_table(layout, table_index):
+    """The complete byte value -> labels table of a flag-only byte."""
+    for byte_value in range(256):
+        table = layout._lut_tables[table_index]
+        if table is None or table[byte_value] is None:
+            layout._lut_entry(table_index, byte_value)
+    return tuple(layout._lut_tables[table_index])
+
+
+def _emit_parse(source, layout):
+    source.line(1, "def parse(value):")
+    source.line(2, "results = []")
+    source.line(2, "append = results.append")
+    if layout._lut_positions:
+        source.line(2, "extend = results.extend")
+        source.line(2, f"data = value.to_bytes({layout.byte_length}, 'big')")
+    for table_index, int_byte, plan in layout._segments:
+        if plan is None:
+            # flag-only bytes keep their lookup table: one index instead of eight tests
+            table = source.literal(_lut_table(layout, table_index), "byte_labels_")
+            source.line(2, f"extend({table}[data[{int_byte}]])")
+            continue
+        for mask, label, shift, group in plan:
+            if group is None:
+                source.line(2, f"if value & {mask:#x}:")
+                source.line(3, f"append({source.literal(label, 'label_')})")
+                continue
+            source.line(2, f"field = {_extraction(group)}")
+            # same lookup as CompiledLayout._parse_value_masks()
+            _emit_field(source, 2, group, "field", "label", True)
+            source.line(2, "append(label)")
+    source.line(2, "return results")
+
+
+def _emit_parse_full(source, layout):
+    source.line(1, "def parse_full(value):")
+    positions, summary_positions = layout._full_plan()
+    # group values are needed by every bit entry of the group, so they are computed first,
+    # in the order parse_full() evaluates them (at the last bit of each group)
+    for is_bit, item in positions:
+        if not is_bit:
+            group_id = item.group_id
+            source.line(2, f"v{group_id} = {_extraction(item)}")
+            _emit_field(source, 2, item, f"v{group_id}", f"l{group_id}", _table_is_evaluate(item.parser))
+
+    source.line(2, "return [")
+    for is_bit, item in positions:
+        if not is_bit:
+            group = item
+            source.line(3, "{" + ", ".join([
+                '"kind": "multi_bit"',
+                f'"label": l{group.group_id}',
+                '"enabled": True',
+                f'"raw_bits": format(v{group.group_id}, "0{group.num_bits}b")',
+                f'"value_int": v{group.group_id}',
+                f'"group_id": {group.group_id}',
+                f'"descriptor_indices": {list(group.indices)!r}',
+            ]) + "},")
+            continue
+
+        index = item
+        shift = layout._shifts[index]
+        bit = f"(value >> {shift}) & 1" if shift else "value & 1"
+        enabled = f"value & {1 << shift:#x} != 0"
+        byte_index, bit_index = divmod(layout._bit_columns[index], 8)
+        group_ref = layout._index_to_group[index]
+        fields = ['"kind": "bit"']
+        if group_ref is None:
+            fields.append(f'"label": {source.literal(layout.descriptors[index], "label_")}')
+        else:
+            fields.append('"label": None')
+        fields += [
+            f'"enabled": {enabled}',
+            f'"raw_bit": {bit}',
+            f'"byte_index": {byte_index}',
+            f'"bit_index": {bit_index}',
+            f'"descriptor_index": {index}',
+        ]
+        if group_ref is not None:
+            group, group_bit_index = group_ref
+            fields += [
+                f'"group_id": {group.group_id}',
+                f'"group_bit_index": {group_bit_index}',
+                f'"group_label": l{group.group_id}',
+                f'"summary_index": {summary_positions[group.group_id]}',
+            ]
+        source.line(3, "{" + ", ".join(fields) + "},")
+    source.line(2, "]")
+
+
+def generate_source(layout) -> tuple:
+    """Returns (source, constants) of a factory building the specialized parse functions of a layout."""
+    source = _Source()
+    _emit_parse(source, layout)
+    source.lines.append("")
+    _emit_parse_full(source, layout)
+    source.line(1, "return parse, parse_full")
+    # the constants become closure variables of the generated functions
+    header = f"def specialize({', '.join(['_U'] + list(source.constants))}):"
+    return "\n".join([header] + source.lines) + "\n", source.constants
+
+
+class SpecializedLayout():
+    """parse()/parse_full() of a layout as generated straight-line functions.
+
+    Every mask, shift and label is a constant of the generated code, so a call runs one
+    test per flag and one extraction per multi-bit field with no loops or type checks.
+    Results are identical to the layout's parse() and parse_full(). The generated code is
+    available as .source.
+    """
+
+    def __init__(self, layout, debug=False):
+        self.layout = layout
+        self.source, constants = generate_source(layout)
+        filename = f"<bit-parser specialized {next(_sources)}>"
+        if debug:
+            # makes tracebacks and inspect.getsource() show the generated lines
+            linecache.cache[filename] = (len(self.source), None, self.source.splitlines(True), filename)
+            if debug is True:
+                sys.stderr.write(self.source)
+            else:
+                with open(os.fspath(debug), "w") as output:
+                    output.write(self.source)
+        namespace = {}
+        exec(compile(self.source, filename, "exec"), namespace)
+        self._parse_value, self._parse_value_full = namespace["specialize"](_UNDEFINED, *[value for _, value in constants.values()])
+
+    def parse(self, bytes, offset=None, input_format=None) -> list:
+        return self._parse_value(self.layout._to_int(bytes, offset, input_format))
+
+    def parse_full(self, bytes, offset=None, input_format=None) -> list:
+        return self._parse_value_full(self.layout._to_int(bytes, offset, input_format))
+
+    def parse_int(self, value) -> list:
+        """parse() of a payload int that is known to fit the layout."""
+        return self._parse_value(value)
@@ -0,0 +1,178 @@
+import asyncio
+
+from BitParser.BitParser import compile_descriptors
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_BATCH_FRAMES = 256
+DEFAULT_MAX_PENDING = 4
+
+
+def _partial_frame_error(size, frame_size):
+    return ValueError(f"Stream ended with a partial frame ({size} of {frame_size} bytes)")
+
+
+def _iter_frames_from_reader(readinto, frame_size, chunk_size):
+    buffer = bytearray(max(1, chunk_size // frame_size) * frame_size)
+    view = memoryview(buffer)
+    filled = 0
+    while True:
+        received = readinto(view[filled:])
+        if not received:
+            break
+        filled += received
+        complete = filled - filled % frame_size
+        for offset in range(0, complete, frame_size):
+            yield view[offset:offset + frame_size]
+        if complete:
+            view[:filled - complete] = view[complete:filled]
+            filled -= complete
+    if filled:
+        raise _partial_frame_error(filled, frame_size)
+
+
+def _iter_frames_from_chunks(chunks, frame_size):
+    pending = bytearray()
+    for chunk in chunks:
+        view = memoryview(chunk)
+        if pending:
+            needed = frame_size - len(pending)
+            pending += view[:needed]
+            if len(pending) < frame_size:
+                continue
+            yield pending
+            pending = bytearray()
+            view = view[needed:]
+        complete = len(view) - len(view) % frame_size
+        for offset in range(0, complete, frame_size):
+            yield view[offset:offset + frame_size]
+        pending += view[complete:]
+    if pending:
+        raise _partial_frame_error(len(pending), frame_size)
+
+
+def _iter_frames(source, frame_size, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yields consecutive frame_size long memoryviews. A frame is only valid until the next one is requested."""
+    if isinstance(source, str):
+        raise TypeError("iter_parse expects binary input, not str")
+
+    # buffers come first: mmap also has read(), but is parsed whole, not from its seek position
+    try:
+        view = memoryview(source)
+    except TypeError:
+        pass
+    else:
+        return _iter_frames_from_chunks((view,), frame_size)
+
+    readinto = getattr(source, "readinto", None) or getattr(source, "recv_into", None)
+    if readinto is not None:
+        return _iter_frames_from_reader(readinto, frame_size, chunk_size)
+
+    if hasattr(source, "read"):
+        return _iter_frames_from_chunks(iter(lambda: source.read(chunk_size), b""), frame_size)
+    return _iter_frames_from_chunks(source, frame_size)
+
+
+def _frame_size(layout):
+    if not layout.byte_length:
+        raise ValueError("Cannot split a stream into frames of an empty layout")
+    return layout.byte_length
+
+
+def _parse_function(layout, mode):
+    if mode == "labels":
+        return layout._parse_value
+    if mode == "full":
+        return layout._parse_value_full
+    raise ValueError(f"Unknown mode '{mode}', expected 'labels' or 'full'")
+
+
+def iter_parse(source, descriptors: list, mode="labels", chunk_size=DEFAULT_CHUNK_SIZE):
+    """Lazily parses consecutive fixed-size frames.
+
+    source can be a binary file object, a socket, any bytes-like buffer (bytes, bytearray,
+    memoryview, mmap) or an iterable of bytes-like chunks of any size; frames may span
+    chunk boundaries. Yields one parse_bits() result per frame, or one parse_bits_full()
+    result with mode="full". Files and sockets are read through one reusable buffer of
+    about chunk_size bytes, so memory use does not grow with the stream.
+    """
+    layout = compile_descriptors(descriptors)
+    parse_value = _parse_function(layout, mode)
+    to_int = layout._to_int
+    for frame in _iter_frames(source, _frame_size(layout), chunk_size):
+        yield parse_value(to_int(frame))
+
+
+def _parse_frames(layout, mode, data):
+    parse_value = _parse_function(layout, mode)
+    to_int = layout._to_int
+    return [parse_value(to_int(data, offset)) for offset in range(0, len(data), layout.byte_length)]
+
+
+async def _read_frames(reader, frame_size, batch_frames):
+    """Returns the next block of whole frames (at most batch_frames of them), or b"" at a clean end of stream."""
+    data = await reader.read(frame_size * batch_frames)
+    missing = -len(data) % frame_size
+    if missing:
+        try:
+            data += await reader.readexactly(missing)
+        except asyncio.IncompleteReadError as error:
+            raise _partial_frame_error(len(data) % frame_size + len(error.partial), frame_size) from None
+    return data
+
+
+async def _produce(reader, queue, layout, mode, executor, batch_frames):
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            data = await _read_frames(reader, layout.byte_length, batch_frames)
+            if not data:
+                break
+            await queue.put(loop.run_in_executor(executor, _parse_frames, layout, mode, data))
+    except Exception as error:
+        failed = loop.create_future()
+        failed.set_exception(error)
+        await queue.put(failed)
+    await queue.put(None)
+
+
+async def aparse_stream(reader, descriptors: list, mode="labels", executor=None,
+                        batch_frames=DEFAULT_BATCH_FRAMES, max_pending=DEFAULT_MAX_PENDING):
+    """Asynchronously parses fixed-size frames read from an asyncio.StreamReader.
+
+    Usage: async for result in aparse_stream(reader, descriptors): ...
+
+    Yields one parse_bits() result per frame, or one parse_bits_full() result with
+    mode="full". Whatever is already buffered is taken in blocks of up to batch_frames
+    frames and a split frame is completed with readexactly(). Without an executor the
+    frames are parsed on the event loop and nothing is read until the consumer asks for
+    more. With an executor each block is parsed there, a reader task keeps up to
+    max_pending blocks in flight and stops reading (so TCP flow control pushes back on
+    the sender) once that bound is reached. Results keep the stream order.
+    """
+    layout = compile_descriptors(descriptors)
+    parse_value = _parse_function(layout, mode)
+    _frame_size(layout)
+    if batch_frames < 1 or max_pending < 1:
+        raise ValueError("batch_frames and max_pending must be positive")
+
+    if executor is None:
+        to_int = layout._to_int
+        frame_size = layout.byte_length
+        while True:
+            data = await _read_frames(reader, frame_size, batch_frames)
+            if not data:
+                return
+            for offset in range(0, len(data), frame_size):
+                yield parse_value(to_int(data, offset))
+
+    queue = asyncio.Queue(maxsize=max_pending)
+    producer = asyncio.ensure_future(_produce(reader, queue, layout, mode, executor, batch_frames))
+    try:
+        while True:
+            parsed = await queue.get()
+            if parsed is None:
+                break
+            for result in await parsed:
+                yield result
+    finally:
+        producer.cancel()
@@ -0,0 +1,13 @@
+import os
+
+from setuptools import Extension, setup
+
+# Project metadata lives in pyproject.toml. The C accelerator is opt-in: an extension
+# makes the wheel platform specific, and releases publish one pure-Python wheel. Build it
+# with BITPARSER_BUILD_ACCEL=1 (pip install . or python setup.py build_ext --inplace);
+# without it BitParser.accel runs its pure-Python kernels.
+ext_modules = []
+if os.environ.get("BITPARSER_BUILD_ACCEL"):
+    ext_modules.append(Extension("BitParser._accel", ["BitParser/_accel.c"], optional=True))
+
+setup(ext_modules=ext_modules)
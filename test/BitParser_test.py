@@ -8,7 +8,8 @@ import sys
 if not '../bit-parser' in sys.path:
     sys.path.insert(1, '../bit-parser')
 
-from BitParser.BitParser import MultiBitValueParser, parse_bits, parse_bits_full, SameValueRange, parse_bits_binary, encode_bits, describe_bits
+from BitParser.BitParser import MultiBitValueParser, parse_bits, parse_bits_full, SameValueRange, parse_bits_binary, encode_bits, describe_bits, compile_descriptors, parse_int, encode_int, IntField
+from BitParser.batch import parse_bits_batch
 
 
 @pytest.fixture(scope="class")  # scope="function" is default
@@ -238,6 +239,48 @@ def advanced_multibyte_protocol_parser():
     return advanced_protocol_parser
 
 
+def make_advanced_protocol():
+    heating_mode = MultiBitValueParser({ "0000": "heating mode off",
+                                         "0001": "heating mode 1",
+                                         "0010": "heating mode 2",
+                                         "0011": "heating mode 3",
+                                         "0100": "heating mode 4",
+                                         "0101": "heating mode 5",
+                                         "0110": "heating mode 6",
+                                         "0111": "heating mode 7",
+                                         "1000": "heating mode 8"},
+                                         SameValueRange(0b1001, 0b1111, 4, "RFU"))
+
+    status = MultiBitValueParser({  "00": "temperature OK",
+                                    "01": "temperature too low",
+                                    "10": "temperature too high",
+                                    "11": "broken sensor"})
+
+    led_status = MultiBitValueParser({"0": "LED is OFF",
+                                      "1": "LED is ON"})
+
+    sensor_id = MultiBitValueParser(SameValueRange(0b000, 0b111, 3, "sensor ID", return_value_instead_of_name=True))
+
+    return [
+             sensor_id,
+             sensor_id,
+             sensor_id,
+             status,
+             status,
+             led_status,
+             heating_mode,
+             heating_mode,
+             heating_mode,
+             heating_mode,
+             "heating module 1 on",
+             "heating module 2 on",
+             "heating module 3 on",
+             "heating module 4 on",
+             "RFU",
+             "RFU",
+           ]
+
+
 class TestBitParser:
     def test_simple_parser_80(self, simple_one_byte_parser):
         parsed_80 = simple_one_byte_parser("80")
@@ -605,3 +648,593 @@ class TestBitParser:
 
         encoded = encode_bits([], descriptors, values={"mode:0:7": 2, "mode:0:3": 1})
         assert encoded == "84"
+
+
+class TestCompiledLayout:
+    def test_compiled_parse_matches_parse_bits(self):
+        descriptors = make_advanced_protocol()
+        layout = compile_descriptors(descriptors)
+        for value in ("48F0", "0CF0", "0000", "FFF3", "1234"):
+            assert layout.parse(value) == parse_bits(value, descriptors)
+            assert layout.parse(binascii.unhexlify(value)) == parse_bits(value, descriptors)
+
+
+    def test_compiled_parse_full_matches_parse_bits_full(self):
+        descriptors = make_advanced_protocol()
+        layout = compile_descriptors(descriptors)
+        for value in ("48F0", "0CF0", "0000", "FFF3"):
+            assert layout.parse_full(value) == parse_bits_full(value, descriptors)
+
+
+    def test_compiled_describe_and_encode(self):
+        descriptors = make_advanced_protocol()
+        layout = compile_descriptors(descriptors)
+        assert layout.describe() == describe_bits(descriptors)
+        encoded = layout.encode(
+            ["temperature too low", "LED is OFF", "heating module 1 on", "heating module 2 on"],
+            values={"heating mode": 3, "sensor ID": 2},
+        )
+        assert encoded == "48F0"
+
+
+    def test_compiled_layout_is_reusable(self):
+        descriptors = [ "RFU",
+                        "RFU",
+                        "flag a",
+                        "flag b",
+                        "flag c",
+                        "flag d",
+                        "flag e",
+                        "flag f"]
+        layout = compile_descriptors(descriptors)
+        assert layout.encode(["flag a"]) == "20"
+        assert layout.encode(["flag a"]) == "20"
+        with pytest.raises(ValueError):
+            layout.encode(["flag a", "flag a"])
+        assert layout.encode(["RFU:0:7", "RFU:0:6"]) == "C0"
+
+
+    def test_module_functions_reuse_compiled_layouts(self, monkeypatch):
+        from BitParser import BitParser as module
+        descriptors = make_advanced_protocol()
+        monkeypatch.setattr(module, "_layout_cache", module.OrderedDict())
+        monkeypatch.setattr(module, "LAYOUT_CACHE_SIZE", 2)
+        layout = module._cached_layout(descriptors)
+        # equal lists share one layout; the list itself is not kept
+        assert module._cached_layout(list(descriptors)) is layout
+        assert parse_bits("48F0", descriptors) == layout.parse("48F0")
+        assert encode_bits(["temperature too low", "LED is OFF", "heating module 1 on", "heating module 2 on"], descriptors,
+                           values={"heating mode": 3, "sensor ID": 2}) == "48F0"
+        assert describe_bits(descriptors) == layout.describe()
+        assert len(module._layout_cache) == 1
+
+        # a changed list is a new key; the cache keeps the most recent LAYOUT_CACHE_SIZE layouts
+        descriptors[15] = "renamed"
+        assert parse_bits("0001", descriptors)[-1] == "renamed"
+        parse_bits("00", ["flag"] * 8)
+        assert len(module._layout_cache) == 2
+        assert layout not in module._layout_cache.values()
+
+        # unhashable labels cannot be cache keys; such lists are compiled on every call
+        marker = {"name": "a"}
+        assert parse_bits("81", [marker] + ["b"] * 7) == [marker, "b"]
+        assert parse_bits_full("81", [marker] + ["b"] * 7)[0]["label"] == marker
+        assert len(module._layout_cache) == 2
+
+
+    def test_compiled_layout_rejects_bad_descriptors(self):
+        mode = MultiBitValueParser({ "00": "mode 0",
+                                     "01": "mode 1",
+                                     "10": "mode 2",
+                                     "11": "mode 3"})
+        with pytest.raises(ValueError):
+            compile_descriptors(["flag a"] * 7)
+        with pytest.raises(ValueError):
+            compile_descriptors([mode, mode, mode, "a", "b", "c", "d", "e"])
+
+        shared = compile_descriptors([mode, mode, mode, mode, "a", "b", "c", "d"])
+        assert shared.parse("6C") == ["mode 1", "mode 2", "a", "b"]
+        with pytest.raises(ValueError):
+            shared.describe()
+
+
+    def test_unhashable_labels_parse(self):
+        marker = {"name": "a"}
+        layout = compile_descriptors([marker] + ["b"] * 7)
+        assert layout.parse("81") == [marker, "b"]
+        assert layout.parse_full("81")[0]["label"] == marker
+        assert layout.describe()["bits"][0]["label"] == marker
+        assert layout.encode(["b:0:0"]) == "01"
+
+
+    def test_compiled_parse_wide_layout_matches_parse_bits(self):
+        import random
+        rng = random.Random(1234)
+        mode = MultiBitValueParser({ "00": "mode 0",
+                                     "01": "mode 1",
+                                     "10": "mode 2",
+                                     "11": "mode 3"})
+        counter = MultiBitValueParser(SameValueRange(0, 0b111111, 6, "counter", return_value_instead_of_name=True))
+        descriptors = [f"flag {index}" for index in range(128)]
+        descriptors[5] = mode
+        descriptors[70] = mode
+        descriptors[13:19] = [counter] * 6
+        layout = compile_descriptors(descriptors)
+        for _ in range(50):
+            payload = bytes(rng.randrange(256) for _ in range(16))
+            assert layout.parse(payload) == parse_bits(payload, descriptors)
+            assert layout.parse_full(payload) == parse_bits_full(payload, descriptors)
+
+
+    def test_compiled_parse_undefined_value(self):
+        mode = MultiBitValueParser({ "00": "mode 0",
+                                     "01": "mode 1"})
+        layout = compile_descriptors([mode, mode, "a", "b", "c", "d", "e", "f"])
+        assert layout.parse("40") == ["mode 1"]
+        with pytest.raises(KeyError):
+            layout.parse("80")
+        assert layout.parse("00") == ["mode 0"]
+
+
+    def test_parse_bits_recovers_after_undefined_value(self):
+        mode = MultiBitValueParser({ "00": "mode 0",
+                                     "01": "mode 1"})
+        descriptors = [mode, mode, "a", "b", mode, mode, "c", "d"]
+        with pytest.raises(KeyError):
+            parse_bits("08", descriptors)
+        assert parse_bits("44", descriptors) == ["mode 1", "mode 1"]
+        assert mode.evaluate(1) == "mode 1"
+
+
+    def test_parse_bits_shared_descriptors_across_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+        descriptors = make_advanced_protocol()
+        payloads = [f"{value:04X}" for value in range(0, 0x10000, 97)]
+        expected = [parse_bits(payload, descriptors) for payload in payloads]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for _ in range(4):
+                assert list(pool.map(lambda payload: parse_bits(payload, descriptors), payloads)) == expected
+
+
+    def test_parse_bits_buffer_types_and_offset(self, tmp_path):
+        import mmap
+        descriptors = make_advanced_protocol()
+        expected = parse_bits("48F0", descriptors)
+        packet = b"\xAA" * 20 + b"\x48\xF0" + b"\x55" * 1478
+
+        assert parse_bits(bytearray(b"\x48\xF0"), descriptors) == expected
+        assert parse_bits(memoryview(packet)[20:22], descriptors) == expected
+        assert parse_bits(packet, descriptors, offset=20) == expected
+        assert parse_bits(memoryview(packet), descriptors, offset=20) == expected
+        assert parse_bits(packet.hex(), descriptors, offset=20) == expected
+        assert parse_bits_full(bytearray(packet), descriptors, offset=20) == parse_bits_full("48F0", descriptors)
+
+        path = tmp_path / "capture.bin"
+        path.write_bytes(packet)
+        with open(path, "rb") as capture:
+            with mmap.mmap(capture.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                assert parse_bits(mapped, descriptors, offset=20) == expected
+
+        with pytest.raises(ValueError):
+            parse_bits(packet, descriptors, offset=1499)
+        with pytest.raises(ValueError):
+            parse_bits(packet, descriptors, offset=-1)
+        with pytest.raises(ValueError):
+            parse_bits(packet, descriptors)
+        with pytest.raises(ValueError):
+            parse_bits("48F", descriptors)
+
+
+    def test_encoder_outputs_and_cache(self):
+        descriptors = make_advanced_protocol()
+        layout = compile_descriptors(descriptors)
+        labels = ["temperature too low", "LED is OFF", "heating module 1 on", "heating module 2 on"]
+        values = {"heating mode": 3, "sensor ID": 2}
+        encoder = layout.encoder(cache_size=2)
+        assert encoder.encode(labels, values) == "48F0"
+        assert encoder.encode(list(reversed(labels)), values) == "48F0"
+        assert encoder.encode_int(labels, values) == 0x48F0
+        assert encoder.encode_bytes(labels, values) == b"\x48\xF0"
+        assert len(encoder._cache) == 1
+
+        with pytest.raises(ValueError):
+            encoder.encode(labels + ["LED is OFF"], values)
+        with pytest.raises(ValueError):
+            encoder.encode(labels + ["heating module 1 on"], values)
+
+        for mode in range(4):
+            assert encoder.encode_int(labels, {"heating mode": mode, "sensor ID": 2}) == 0x4830 | (mode << 6)
+        assert len(encoder._cache) == 2
+
+        # labels resolve through the layout's label index, with-value labels by prefix and range
+        sensor, status, led, heating = layout.groups
+        assert layout._groups_with_label("sensor ID: 7") == [sensor]
+        assert layout._groups_with_label("sensor ID: 8") == []
+        assert layout._groups_with_label("temperature too low") == [status]
+        assert layout._groups_with_label("heating mode 3") == [heating]
+        assert layout._groups_with_label("LED is OFF") == [led]
+        assert layout._groups_with_label("fan on") == []
+
+        # a cached int value must not answer for a float that compares equal to it
+        with pytest.raises(ValueError):
+            encoder.encode(labels, {"heating mode": 3.0, "sensor ID": 2})
+
+
+    def test_parse_bits_full_lazy(self):
+        import tracemalloc
+        descriptors = make_advanced_protocol()
+        for value in ("48F0", "0CF0", "FFF3"):
+            eager = parse_bits_full(value, descriptors)
+            lazy = parse_bits_full(value, descriptors, lazy=True)
+            assert len(lazy) == len(eager)
+            assert lazy == eager
+            assert [dict(entry) for entry in lazy] == eager
+            assert lazy.to_list() == eager
+
+        lazy = compile_descriptors(descriptors).parse_full("48F0", lazy=True)
+        assert lazy[0]["group_label"] == "sensor ID: 2"
+        assert lazy[-1].get("group_id") is None
+        assert lazy[-1]["label"] == "RFU"
+        assert [entry["label"] for entry in lazy[-3:]] == ["heating module 4 on", "RFU", "RFU"]
+        summary = lazy[lazy[0]["summary_index"]]
+        assert summary["kind"] == "multi_bit" and summary["value_int"] == 2
+
+        layout = compile_descriptors([f"flag {index}" for index in range(256)])
+        payload = bytes(range(32))
+        layout.parse_full(payload, lazy=True)
+        tracemalloc.start()
+        eager_results = [layout.parse_full(payload) for _ in range(10)]
+        eager_size = tracemalloc.get_traced_memory()[0]
+        del eager_results
+        tracemalloc.stop()
+        tracemalloc.start()
+        lazy_results = [layout.parse_full(payload, lazy=True) for _ in range(10)]
+        lazy_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert lazy_size * 50 < eager_size
+
+
+    def test_lookup_tables_match_mask_path(self):
+        import random
+        rng = random.Random(99)
+        mode = MultiBitValueParser({ "00": "mode 0",
+                                     "01": "mode 1",
+                                     "10": "mode 2",
+                                     "11": "mode 3"})
+        descriptors = [f"flag {index}" for index in range(80)]
+        descriptors[30] = "RFU"
+        descriptors[31] = "RFU"
+        descriptors[21:23] = [mode, mode]
+        layout = compile_descriptors(descriptors, lut_max_tables=4)
+        masks_only = compile_descriptors(descriptors, lut_max_tables=0)
+        assert layout._lut_tables == [None] * 4
+        for _ in range(200):
+            payload = bytes(rng.randrange(256) for _ in range(10))
+            assert layout.parse(payload) == masks_only.parse(payload) == parse_bits(payload, descriptors)
+        assert len(layout._lut_tables) == 4
+        assert all(table is not None for table in layout._lut_tables)
+        assert layout._lut_tables[0][0x81] == ("flag 0", "flag 7")
+
+
+    def test_input_and_output_formats(self):
+        descriptors = make_advanced_protocol()
+        expected = parse_bits("48F0", descriptors)
+        assert parse_bits(0x48F0, descriptors, input_format="int") == expected
+        assert parse_bits("48f0", descriptors, input_format="hex") == expected
+        assert parse_bits(b"\x48\xF0", descriptors, input_format="bytes") == expected
+        assert parse_bits(bytearray(b"\x00\x48\xF0"), descriptors, offset=1, input_format="bytearray") == expected
+        assert parse_bits_full(0x48F0, descriptors, input_format="int") == parse_bits_full("48F0", descriptors)
+
+        labels = ["temperature too low", "LED is OFF", "heating module 1 on", "heating module 2 on"]
+        values = {"heating mode": 3, "sensor ID": 2}
+        assert encode_bits(labels, descriptors, values) == "48F0"
+        assert encode_bits(labels, descriptors, values, output_format="int") == 0x48F0
+        assert encode_bits(labels, descriptors, values, output_format="bytes") == b"\x48\xF0"
+        encoded = encode_bits(labels, descriptors, values, output_format="bytearray")
+        assert isinstance(encoded, bytearray) and encoded == b"\x48\xF0"
+
+        with pytest.raises(ValueError, match="does not fit"):
+            parse_bits(0x10000, descriptors, input_format="int")
+        with pytest.raises(ValueError, match="expects an int"):
+            parse_bits("48F0", descriptors, input_format="int")
+        with pytest.raises(ValueError, match="expects a str"):
+            parse_bits(b"\x48\xF0", descriptors, input_format="hex")
+        with pytest.raises(ValueError, match="bytes-like"):
+            parse_bits("48F0", descriptors, input_format="bytes")
+        with pytest.raises(ValueError, match="Unknown input_format"):
+            parse_bits("48F0", descriptors, input_format="base64")
+        with pytest.raises(ValueError, match="Unknown output_format"):
+            encode_bits(labels, descriptors, values, output_format="str")
+
+
+    def test_hex_input_errors(self):
+        descriptors = make_advanced_protocol()
+        with pytest.raises(binascii.Error, match="Odd-length"):
+            parse_bits("48F", descriptors)
+        with pytest.raises(binascii.Error, match="'G' at position 3"):
+            parse_bits("48FG", descriptors)
+        with pytest.raises(binascii.Error, match="'Z' at position 5"):
+            parse_bits("0048FZ", descriptors, offset=1)
+        with pytest.raises(binascii.Error, match="position 1"):
+            parse_bits("4ä", [f"bit {index}" for index in range(8)])
+        # length is validated before the characters are decoded
+        with pytest.raises(ValueError, match="length"):
+            parse_bits("XXXXXX", descriptors)
+
+
+    def test_parse_int_and_encode_int(self):
+        import struct
+        descriptors = make_advanced_protocol()
+        (register,) = struct.unpack(">H", b"\x48\xF0")
+        assert parse_int(register, descriptors) == parse_bits("48F0", descriptors)
+        assert parse_int(register, descriptors, width_bytes=2) == parse_bits("48F0", descriptors)
+        labels = ["temperature too low", "LED is OFF", "heating module 1 on", "heating module 2 on"]
+        assert encode_int(labels, descriptors, {"heating mode": 3, "sensor ID": 2}) == register
+
+        wide = [f"bit {index}" for index in range(256)]
+        assert parse_int(1 << 255 | 1, wide) == ["bit 0", "bit 255"]
+        assert encode_int(["bit 0", "bit 255"], wide) == 1 << 255 | 1
+
+        with pytest.raises(ValueError):
+            parse_int(register, descriptors, width_bytes=4)
+        with pytest.raises(ValueError):
+            parse_int(-1, descriptors)
+        with pytest.raises(ValueError):
+            parse_int(1 << 16, descriptors)
+
+
+    def test_layout_report_and_validation(self):
+        layout = compile_descriptors(make_advanced_protocol(), validate=True)
+        report = layout.report()
+        assert report["valid"] and report["errors"] == []
+        assert layout.report() is report
+
+        shared = MultiBitValueParser({"00": "a", "01": "b", "10": "c", "11": "d"})
+        mixed = MultiBitValueParser({"00": "off", "01": "low", "100": "high"})
+        sparse = MultiBitValueParser({"000": "idle", "111": "busy"})
+        descriptors = [shared, shared, shared, shared, mixed, "x", mixed, "x",
+                       sparse, sparse, sparse, "a", "y", "y", "z", "z"]
+        layout = compile_descriptors(descriptors)
+        report = layout.report()
+        assert layout.parse("0000") == ["a", "a", "off", "idle"]
+        assert {error["check"] for error in report["errors"]} == {"group_size", "key_width"}
+        assert [error["descriptor_indices"] for error in report["errors"]] == [[0, 1, 2, 3], [4, 6]]
+        warnings = {(warning["check"], tuple(warning["descriptor_indices"])) for warning in report["warnings"]}
+        assert ("contiguity", (4, 6)) in warnings
+        assert ("undefined_codes", (8, 9, 10)) in warnings
+        assert ("duplicate_label", (5, 7)) in warnings
+        assert ("duplicate_label", (11, 0, 1, 2, 3)) in warnings
+        assert not report["valid"]
+        with pytest.raises(ValueError, match="expects 2 bits but appears 4 times.*not 2 bit binary strings"):
+            compile_descriptors(descriptors, validate=True)
+
+        # keys of the right width that are not binary are reported, not converted
+        for bad_key in ("1x", "0_1"):
+            parser = MultiBitValueParser({"00": "a", "11": "b", bad_key: "c"} if len(bad_key) == 2 else {"000": "a", bad_key: "c"})
+            assert parser.bad_keys == [bad_key]
+            assert "c" not in parser.value_table.dense
+            layout = compile_descriptors([parser] * parser.numOfElements + ["x"] * (8 - parser.numOfElements))
+            assert [error["check"] for error in layout.report()["errors"]] == ["key_width"]
+        with pytest.raises(TypeError):
+            parser.evaluator["000"] = "changed"
+
+        # undefined codes are counted from the value ranges, without visiting each value
+        message = next(warning["message"] for warning in report["warnings"] if warning["descriptor_indices"] == [8, 9, 10])
+        assert message.startswith("6 of 8 values") and "['001', '010', '011', '100', '101', '110']" in message
+        wide = MultiBitValueParser(SameValueRange(0, 2 ** 22 - 2, 24, "wide"))
+        warning = compile_descriptors([wide] * 24).report()["warnings"][0]
+        assert warning["check"] == "undefined_codes"
+        assert warning["message"].startswith(f"{2 ** 24 - 2 ** 22 + 1} of {2 ** 24} values")
+        assert format(2 ** 22 - 1, "024b") in warning["message"] and format(2 ** 22 + 7, "024b") not in warning["message"]
+
+        # a range of another width is reported and leaves the dict labels in place
+        mismatched = MultiBitValueParser({"00": "a", "01": "b", "10": "c", "11": "d"}, SameValueRange(0, 7, 3, "wide"))
+        layout = compile_descriptors([mismatched, mismatched] + ["f"] * 6)
+        assert [layout.parse(code) for code in ("00", "40", "80", "C0")] == [["a"], ["b"], ["c"], ["d"]]
+        assert len(mismatched.bad_keys) == 1
+        assert [error["check"] for error in layout.report()["errors"]] == ["key_width"]
+        assert not any(warning["check"] == "undefined_codes" for warning in layout.report()["warnings"])
+
+
+    def test_descriptor_helper_argument_checks(self):
+        with pytest.raises(ValueError):
+            SameValueRange(0, 3, 0, "none")
+        with pytest.raises(ValueError):
+            SameValueRange(0, 8, 3, "too wide")
+        with pytest.raises(ValueError):
+            MultiBitValueParser({})
+
+
+    def test_value_tables_match_bit_string_dicts(self):
+        import pickle
+        import random
+        rng = random.Random(17)
+        for num_bits in (1, 3, 8, 11, 14):
+            sources = []
+            for _ in range(4):
+                if rng.random() < 0.5:
+                    start = rng.randrange(1 << num_bits)
+                    end = min((1 << num_bits) - 1, start + rng.randrange(300))
+                    sources.append(SameValueRange(start, end, num_bits, f"range {len(sources)}", return_value_instead_of_name=rng.random() < 0.5))
+                else:
+                    keys = [rng.randrange(1 << num_bits) for _ in range(rng.randrange(1, 20))]
+                    sources.append({format(key, f"0{num_bits}b"): rng.choice(["a", "b", "c"]) for key in keys})
+            parser = MultiBitValueParser(*sources)
+            table = parser.value_table
+            assert (table.dense is not None) == (num_bits <= 10)
+            assert len(table) == len(parser.evaluator)
+            restored = pickle.loads(pickle.dumps(parser))
+            for value in range(min(1 << num_bits, 4096)):
+                key = format(value, f"0{num_bits}b")
+                if key in parser.evaluator:
+                    assert parser.evaluate(value) == restored.evaluate(value) == parser.evaluator[key]
+                else:
+                    with pytest.raises(KeyError):
+                        parser.evaluate(value)
+                    with pytest.raises(KeyError):
+                        restored.evaluate(value)
+
+
+    def test_wide_range_is_stored_as_ranges(self):
+        counter = MultiBitValueParser({"0" * 24: "counter stopped"}, SameValueRange(1, 2 ** 24 - 1, 24, "counter", return_value_instead_of_name=True))
+        assert counter.value_table.segments == ((0, 0, "counter stopped", False), (1, 2 ** 24 - 1, "counter", True))
+        assert len(counter.value_table) == 2 ** 24
+        assert counter.evaluate(12345) == "counter: 12345"
+        assert counter.value_table.find("counter: 12345") == [12345]
+        assert counter.value_table.find("counter: 0") == []
+
+        descriptors = [counter] * 24
+        assert parse_bits("000102", descriptors) == ["counter: 258"]
+        assert encode_bits(["counter: 258"], descriptors) == "000102"
+        assert encode_bits([], descriptors, {"counter": 7}) == "000007"
+
+
+    def test_wide_integer_fields_spanning_bytes(self):
+        device_id = IntField(12, "device ID", labels={0: "unassigned", 0xFFF: "broadcast"})
+        counter = IntField(20, "counter", labels=[(0xFFF00, 0xFFFFF, "counter overflow")])
+        temperature = IntField(8, "temperature", labels=lambda value: f"{value - 40} C")
+        # 12-bit ID, 20-bit counter, 8-bit temperature: 40 bits, two fields crossing byte boundaries
+        descriptors = [device_id] * 12 + [counter] * 20 + [temperature] * 8
+
+        payload = "ABC12345" + "3C"
+        assert parse_bits(payload, descriptors) == ["device ID: 2748", "counter: 74565", "20 C"]
+        assert parse_bits("000FFF0028", descriptors) == ["unassigned", "counter overflow", "0 C"]
+
+        full = parse_bits_full(payload, descriptors)
+        summaries = [entry for entry in full if entry["kind"] == "multi_bit"]
+        assert [entry["value_int"] for entry in summaries] == [0xABC, 0x12345, 0x3C]
+        assert summaries[1]["raw_bits"] == format(0x12345, "020b")
+
+        assert encode_bits([], descriptors, {"device ID": 0xABC, "counter": 0x12345, "temperature": 0x3C}) == payload
+        assert encode_bits(["device ID: 2748", "counter: 74565", "temperature: 60"], descriptors) == payload
+        assert encode_bits(["broadcast"], descriptors, {"counter": 0, "temperature": 0}) == "FFF0000000"
+        with pytest.raises(ValueError):
+            encode_bits([], descriptors, {"device ID": 0x1000, "counter": 0, "temperature": 0})
+
+        schema = describe_bits(descriptors)
+        fields = {group["name"]: group for group in schema["multi_bit"]}
+        assert fields["counter"]["type"] == "int"
+        assert fields["counter"]["values"] == []
+        assert fields["counter"]["ranges"] == [
+            {"start": 0, "end": 0xFFEFF, "label": "counter", "with_value": True},
+            {"start": 0xFFF00, "end": 0xFFFFF, "label": "counter overflow", "with_value": False},
+        ]
+        assert fields["device ID"]["descriptor_indices"] == list(range(12))
+
+        layout = compile_descriptors(descriptors)
+        assert [group.shift for group in layout.groups] == [28, 8, 0]
+        assert layout.report()["warnings"] == []
+
+
+    def test_bit_and_byte_order(self):
+        import random
+        counter = IntField(12, "counter")
+        # LSB-first numbering of a little-endian 16-bit word: descriptor i is bit i of the word
+        descriptors = ["ready", "error", "RFU", "RFU"] + [counter] * 12
+        layout = compile_descriptors(descriptors, bit_order="lsb", byte_order="little")
+        word = (0xABC << 4) | 0b0001
+        payload = word.to_bytes(2, "little")
+        assert parse_bits(payload, layout) == ["ready", "counter: 2748"]
+        assert parse_bits(payload.hex(), layout) == ["ready", "counter: 2748"]
+        assert parse_int(word, layout) == ["ready", "counter: 2748"]
+        assert encode_bits(["ready"], layout, {"counter": 0xABC}) == payload.hex().upper()
+        assert encode_int(["ready"], layout, {"counter": 0xABC}) == word
+        assert layout.encoder().encode_bytes(["ready"], {"counter": 0xABC}) == payload
+        assert [group.shift for group in layout.groups] == [4]
+
+        # physical positions: "ready" is bit 0 of payload byte 0, "error" bit 1
+        full = parse_bits_full(payload, layout)
+        assert (full[0]["byte_index"], full[0]["bit_index"]) == (0, 7)
+        assert parse_bits_full(payload, layout, lazy=True)[1]["bit_index"] == 6
+        schema = describe_bits(layout)
+        assert (schema["bits"][15]["byte_index"], schema["bits"][15]["bit_index"]) == (1, 0)
+        assert encode_bits(["error:0:1"], layout, {"counter": 0}) == "0200"
+        assert layout._address("error", 1) == "error:0:1"
+
+        # MSB-first register description sent little-endian
+        register = [f"bit {15 - index}" for index in range(16)]
+        msb_little = compile_descriptors(register, byte_order="little")
+        assert parse_bits(b"\x01\x80", msb_little) == ["bit 15", "bit 0"]
+        assert encode_bits(["bit 15", "bit 1"], msb_little) == "0280"
+        lsb_big = compile_descriptors([f"bit {index}" for index in range(16)], bit_order="lsb")
+        assert parse_bits(b"\x80\x01", lsb_big) == ["bit 0", "bit 15"]
+        assert parse_bits(b"\x00\x02", lsb_big) == ["bit 1"]
+
+        rng = random.Random(19)
+        mode = MultiBitValueParser({"00": "m0", "01": "m1", "10": "m2", "11": "m3"})
+        mixed = [f"flag {index}" for index in range(32)]
+        mixed[6:8] = [mode, mode]
+        mixed[14:26] = [IntField(12, "wide")] * 12
+        for bit_order in ("msb", "lsb"):
+            for byte_order in ("big", "little"):
+                layout = compile_descriptors(mixed, bit_order=bit_order, byte_order=byte_order)
+                masks_only = compile_descriptors(mixed, bit_order=bit_order, byte_order=byte_order, lut_max_tables=0)
+                records = [bytes(rng.randrange(256) for _ in range(4)) for _ in range(50)]
+                for record in records:
+                    labels = layout.parse(record)
+                    assert labels == masks_only.parse(record)
+                    values = {"wide": int(next(label for label in labels if label.startswith("wide: "))[6:])}
+                    enabled = [label for label in labels if label.startswith("flag") or label.startswith("m")]
+                    assert layout.encoder().encode_bytes(enabled, values) == record
+                    assert layout.parse_full(record, lazy=True).to_list() == layout.parse_full(record)
+                assert parse_bits_batch(records, layout) == [layout.parse(record) for record in records]
+        with pytest.raises(ValueError):
+            compile_descriptors(mixed, bit_order="little")
+        with pytest.raises(ValueError):
+            compile_descriptors(mixed, byte_order="msb")
+
+
+    def test_select_and_predicates(self):
+        import random
+        layout = compile_descriptors(make_advanced_protocol())
+        selection = layout.select(["heating module 2 on", "field:0:4", "heating mode"])
+        assert selection.parse("48F0") == ["temperature too low", "heating mode 3", "heating module 2 on"]
+        assert selection.parse(b"\x00\x00") == ["temperature OK", "heating mode off"]
+        assert layout.select(["heating module 2 on"]).parse(b"\xff\xef") == []
+        assert layout.select(["heating module 2 on"]).parse(b"\x00\x10") == ["heating module 2 on"]
+        assert layout.select(["RFU:1:1", "sensor ID"]).parse("48F0") == ["sensor ID: 2"]
+        assert layout.select(["RFU:1:0"]).parse(b"\x00\x01", input_format="bytes") == ["RFU"]
+
+        rng = random.Random(21)
+        mode = MultiBitValueParser({"000": "m0", "001": "m1", "010": "m2", "011": "m3"}, SameValueRange(4, 7, 3, "m4+"))
+        descriptors = [f"flag {index}" for index in range(64 * 8)]
+        descriptors[100:103] = [mode] * 3
+        descriptors[200:216] = [IntField(16, "level")] * 16
+        for options in ({}, {"bit_order": "lsb"}, {"byte_order": "little"}):
+            block = compile_descriptors(descriptors, **options)
+            selection = block.select(["flag 7", "flag 130", "m", "level"])
+            for _ in range(30):
+                record = bytes(rng.randrange(256) for _ in range(64))
+                full = block.parse(record)
+                expected = [label for label in full if label in ("flag 7", "flag 130") or label[0] == "m" or label.startswith("level")]
+                assert selection.parse(record) == expected
+                assert selection.parse(b"\x00" + record, offset=1) == expected
+                assert selection.parse(record.hex()) == expected
+                assert selection.parse(int.from_bytes(record, block.byte_order), input_format="int") == expected
+                assert block.any_set(["flag 7", "flag 130", "m3"])(record) == bool({"flag 7", "flag 130", "m3"} & set(full))
+                assert block.all_set(["flag 7", "flag 130", "m3"])(record) == ({"flag 7", "flag 130", "m3"} <= set(full))
+
+        status_low = layout.all_set(["temperature too low", "LED is OFF"])
+        assert status_low("48F0") and status_low.test_int(0x48F0)
+        assert not status_low("50F0")
+        assert layout.all_set([])("0000")
+        assert not layout.any_set([])("FFFF")
+        assert layout.any_set(["heating module 4 on", "broken sensor"])("1800")
+        assert layout.any_set(["heating module 4 on", "LED is ON"])(b"\x04\x00")
+        assert not layout.any_set(["heating module 4 on", "broken sensor"])("48F0")
+        assert layout.any_set(["RFU:1:0"])("0001")
+
+        with pytest.raises(ValueError):
+            layout.all_set(["temperature too low", "broken sensor"])
+        with pytest.raises(ValueError):
+            layout.any_set(["RFU"])
+        with pytest.raises(ValueError):
+            layout.select(["RFU"])
+        with pytest.raises(ValueError):
+            layout.select(["overheat"])
+        with pytest.raises(ValueError):
+            layout.select("status")
+        with pytest.raises(ValueError):
+            layout.select([])
+        with pytest.raises(ValueError):
+            layout.select(["LED is"]).parse("48")
@@ -0,0 +1,135 @@
+import random
+import threading
+from array import array
+
+import pytest
+import sys
+
+# insert at 1, 0 is the script path (or '' in REPL)
+if not '../bit-parser' in sys.path:
+    sys.path.insert(1, '../bit-parser')
+
+from BitParser.BitParser import IntField, compile_descriptors
+from BitParser.accel import Accelerator, available
+from BitParser.bench import build_layout
+
+BACKENDS = [
+    "python",
+    pytest.param("c", marks=pytest.mark.skipif(not available(), reason="C accelerator not built")),
+]
+
+
+def assert_parity(layout, accelerator, records, assert_parses_like):
+    """Per-record and batch parity; returns extract_batch() of the records and the layout's parse() of each."""
+    buffer = b"".join(records)
+    expected = [assert_parses_like(layout, accelerator, record, full=False) for record in records]
+    if None not in expected:
+        assert accelerator.parse_batch(buffer) == expected
+
+    codes = accelerator.extract_batch(buffer)
+    assert codes.shape == (len(records), len(accelerator.entry_names))
+    # every descriptor bit belongs to an entry, so the records are rebuilt exactly
+    assert accelerator.encode_batch(codes) == buffer
+    return codes, expected
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+class TestAccelerator:
+    @pytest.mark.parametrize("byte_length,density", [(1, 0.0), (2, 0.5), (8, 0.25), (16, 0.75), (64, 0.1)])
+    def test_generated_layouts(self, backend, byte_length, density, assert_parses_like):
+        rng = random.Random(byte_length)
+        descriptors, _, _ = build_layout(byte_length, density, seed=byte_length)
+        for options in ({}, {"bit_order": "lsb", "byte_order": "little"}):
+            layout = compile_descriptors(descriptors, **options)
+            accelerator = Accelerator(layout, backend)
+            assert accelerator.backend == backend
+            records = [bytes(rng.randrange(256) for _ in range(byte_length)) for _ in range(50)]
+            assert_parity(layout, accelerator, records, assert_parses_like)
+
+    def test_mixed_layouts_and_orders(self, backend, mixed_layout, assert_parses_like):
+        rng = random.Random(25)
+        descriptors = mixed_layout()
+        for bit_order in ("msb", "lsb"):
+            for byte_order in ("big", "little"):
+                layout = compile_descriptors(descriptors, bit_order=bit_order, byte_order=byte_order)
+                accelerator = Accelerator(layout, backend)
+                records = [bytes(rng.randrange(256) for _ in range(6)) for _ in range(100)]
+                codes, expected = assert_parity(layout, accelerator, records, assert_parses_like)
+                fields = [position for position, (_, group, _) in enumerate(accelerator._entries) if group is not None]
+                for row, record, result in zip(codes.tolist(), records, expected):
+                    if result is not None:
+                        full = layout.parse_full(record)
+                        assert [row[position] for position in fields] == [entry["value_int"] for entry in full if entry["kind"] == "multi_bit"]
+
+    def test_inputs_and_errors(self, backend, mixed_layout):
+        layout = compile_descriptors(mixed_layout())
+        accelerator = Accelerator(layout, backend)
+        record = layout.encode(["flag 3", "mode on", "b"], values={"counter": 7, "level": 2}, output_format="bytes")
+        expected = layout.parse(record)
+        assert accelerator.parse(record.hex()) == expected
+        assert accelerator.parse(b"\xff" + record, offset=1) == expected
+        assert accelerator.parse(int.from_bytes(record, "big"), input_format="int") == expected
+        assert accelerator.parse_batch([record, record.hex()]) == [expected, expected]
+        # one record every 8 bytes, starting 2 bytes into each
+        padded = b"".join(b"\x00\x00" + record for _ in range(3))
+        assert accelerator.parse_batch(padded, stride=8, offset=2) == [expected] * 3
+        assert accelerator.extract_batch(padded, stride=8, offset=2).tolist() == accelerator.extract_batch(record * 3).tolist()
+
+        assert accelerator.parse_batch(b"") == []
+        assert accelerator.encode_batch(accelerator.extract_batch(b"")) == b""
+        with pytest.raises(ValueError):
+            accelerator.parse(record[:-1])
+        with pytest.raises(ValueError):
+            accelerator.parse(record, offset=1)
+        with pytest.raises(ValueError):
+            accelerator.parse_batch(record + b"\x00")
+        with pytest.raises(ValueError):
+            accelerator.parse_batch(padded, stride=8, offset=3)
+        with pytest.raises(ValueError):
+            accelerator.encode_batch(array("Q", [0] * (len(accelerator.entry_names) + 1)))
+
+        codes = array("Q", accelerator.extract_batch(record).cast("B").cast("Q"))
+        codes[accelerator.entry_names.index("mode")] = 3
+        undefined = accelerator.encode_batch(codes)
+        with pytest.raises(KeyError) as raised:
+            accelerator.parse(undefined)
+        with pytest.raises(KeyError) as expected_error:
+            layout.parse(undefined)
+        assert raised.value.args == expected_error.value.args
+
+    def test_threads(self, backend):
+        descriptors, _, _ = build_layout(16, 0.0, seed=3)
+        accelerator = Accelerator(descriptors, backend)
+        rng = random.Random(3)
+        buffer = bytes(rng.randrange(256) for _ in range(16 * 500))
+        expected = accelerator.extract_batch(buffer).tolist()
+        results = [None] * 4
+
+        def run(slot):
+            results[slot] = accelerator.extract_batch(buffer).tolist()
+
+        threads = [threading.Thread(target=run, args=(slot,)) for slot in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == [expected] * 4
+
+
+def test_backend_selection(monkeypatch):
+    descriptors = ["a", "b", "c", "d", "e", "f", "g", "h"]
+    with pytest.raises(ValueError):
+        Accelerator(descriptors, "rust")
+    monkeypatch.setenv("BITPARSER_NO_ACCEL", "1")
+    assert Accelerator(descriptors).backend == "python"
+    monkeypatch.delenv("BITPARSER_NO_ACCEL")
+    assert Accelerator(descriptors).backend == ("c" if available() else "python")
+    # fields wider than 64 bits stay in Python
+    wide = [IntField(72, "wide")] * 72
+    assert Accelerator(wide).backend == "python"
+    if available():
+        with pytest.raises(ValueError):
+            Accelerator(wide, "c")
+    else:
+        with pytest.raises(ImportError):
+            Accelerator(descriptors, "c")
@@ -0,0 +1,86 @@
+import binascii
+import random
+
+import pytest
+import sys
+
+# insert at 1, 0 is the script path (or '' in REPL)
+if not '../bit-parser' in sys.path:
+    sys.path.insert(1, '../bit-parser')
+
+from BitParser.BitParser import MultiBitValueParser, SameValueRange, parse_bits, compile_descriptors
+from BitParser.batch import parse_bits_batch, column_names
+from BitParser.bench import build_layout
+
+
+@pytest.fixture
+def protocol():
+    mode = MultiBitValueParser({ "00": "mode 0",
+                                 "01": "mode 1",
+                                 "10": "mode 2",
+                                 "11": "mode 3"})
+    counter = MultiBitValueParser(SameValueRange(0, 0b1111, 4, "counter", return_value_instead_of_name=True))
+    return [ mode,
+             mode,
+             "heater on",
+             "fault",
+             "RFU",
+             counter,
+             counter,
+             counter,
+             # Byte 1:
+             counter,
+             "RFU",
+             "pump 1 on",
+             "pump 2 on",
+             "pump 3 on",
+             "pump 4 on",
+             "door open",
+             "light on"]
+
+
+class TestParseBitsBatch:
+    def test_labels_match_parse_bits(self, backend, protocol, records):
+        expected = [parse_bits(record, protocol) for record in records]
+        assert parse_bits_batch(records, protocol) == expected
+        hex_records = [binascii.hexlify(record).decode() for record in records]
+        assert parse_bits_batch(hex_records, compile_descriptors(protocol)) == expected
+
+
+    @pytest.mark.parametrize("byte_length,density", [(16, 0.0), (16, 0.25), (64, 0.1)])
+    def test_wide_records(self, backend, byte_length, density):
+        rng = random.Random(byte_length)
+        descriptors, _, _ = build_layout(byte_length, density, seed=byte_length)
+        records = [bytes(rng.randrange(256) for _ in range(byte_length)) for _ in range(50)]
+        assert parse_bits_batch(records, descriptors) == [parse_bits(record, descriptors) for record in records]
+        columns = parse_bits_batch(records, descriptors, columnar=True)
+        flag = next(iter(columns["flags"]))
+        assert [bool(value) for value in columns["flags"][flag]] == [flag in parse_bits(record, descriptors) for record in records]
+
+
+    def test_columnar(self, backend, protocol):
+        result = parse_bits_batch(["0000", "FFFF", "6A80"], protocol, columnar=True)
+        assert list(result["flags"]["heater on"]) == [False, True, True]
+        assert list(result["flags"]["RFU:1:6"]) == [False, True, False]
+        assert [int(value) for value in result["fields"]["mode"]] == [0, 3, 1]
+        assert [int(value) for value in result["fields"]["counter"]] == [0, 15, 5]
+        assert list(result["field_labels"]["counter"]) == ["counter: 0", "counter: 15", "counter: 5"]
+
+
+    def test_wrong_record_length(self, backend, protocol):
+        with pytest.raises(ValueError):
+            parse_bits_batch(["0000", "00"], protocol)
+
+
+    def test_numpy_matrix_input(self, protocol, records):
+        np = pytest.importorskip("numpy")
+        matrix = np.frombuffer(b"".join(records), dtype=np.uint8).reshape(len(records), 2)
+        assert parse_bits_batch(matrix, protocol) == [parse_bits(record, protocol) for record in records]
+        with pytest.raises(ValueError):
+            parse_bits_batch(matrix[:, :1], protocol)
+
+
+    def test_column_names(self, protocol):
+        flags, fields = column_names(protocol)
+        assert [name for name, _ in flags][:3] == ["heater on", "fault", "RFU:0:3"]
+        assert [name for name, _ in fields] == ["mode", "counter"]
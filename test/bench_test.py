@@ -0,0 +1,39 @@
+import json
+
+import sys
+
+# insert at 1, 0 is the script path (or '' in REPL)
+if not '../bit-parser' in sys.path:
+    sys.path.insert(1, '../bit-parser')
+
+from BitParser.BitParser import parse_bits, encode_bits
+from BitParser.bench import build_layout, run_benchmarks, compare, main
+
+
+class TestBench:
+    def test_build_layout_round_trips(self):
+        descriptors, enabled_labels, values = build_layout(4, 0.5, seed=3)
+        assert len(descriptors) == 32
+        encoded = encode_bits(enabled_labels, descriptors, values=values)
+        parsed = parse_bits(encoded, descriptors)
+        assert [label for label in parsed if label.startswith("flag")] == enabled_labels
+
+
+    def test_run_and_compare(self):
+        results = run_benchmarks(sizes=(1,), densities=(0.0, 0.5), min_time=0.001, repeat=1)
+        names = {result["name"] for result in results}
+        assert "parse_bits[memoryview]" in names and "parse_bits_batch" in names and "describe_bits" in names
+        assert all(result["ops_per_sec"] > 0 for result in results)
+
+        baseline = {"results": [dict(result, ops_per_sec=result["ops_per_sec"] * 10) for result in results]}
+        assert len(compare(baseline, results, threshold=0.2)) == len(results)
+        assert compare({"results": results}, results) == []
+
+
+    def test_main_save_and_compare(self, tmp_path, capsys):
+        baseline = tmp_path / "baseline.json"
+        arguments = ["--sizes", "1", "--densities", "0", "--min-time", "0.001", "--repeat", "1"]
+        assert main(arguments + ["--save", str(baseline)]) == 0
+        assert len(json.loads(baseline.read_text())["results"]) == 9
+        assert main(arguments + ["--compare", str(baseline), "--threshold", "0.99"]) == 0
+        assert "No regressions" in capsys.readouterr().out
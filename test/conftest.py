@@ -0,0 +1,99 @@
+import random
+
+import pytest
+import sys
+
+# insert at 1, 0 is the script path (or '' in REPL)
+if not '../bit-parser' in sys.path:
+    sys.path.insert(1, '../bit-parser')
+
+from BitParser.BitParser import MultiBitValueParser, SameValueRange, IntField
+from BitParser import batch, export, query
+
+
+@pytest.fixture
+def protocol():
+    """Two bytes: flags around a 2-bit temperature status, then eight zone flags.
+
+    Test modules needing another layout override this fixture; one that extends it can
+    take the original as its `protocol` argument.
+    """
+    status = MultiBitValueParser({  "00": "temperature OK",
+                                    "01": "temperature too low",
+                                    "10": "temperature too high",
+                                    "11": "broken sensor"})
+    return [ "door open",
+             status,
+             status,
+             "heater on",
+             "fan on",
+             "pump on",
+             "light on",
+             "alarm",
+             # Byte 1:
+             "zone 1",
+             "zone 2",
+             "zone 3",
+             "zone 4",
+             "zone 5",
+             "zone 6",
+             "zone 7",
+             "zone 8"]
+
+
+@pytest.fixture
+def records(protocol):
+    """200 reproducible random records as long as the protocol."""
+    rng = random.Random(42)
+    byte_length = len(protocol) // 8
+    return [bytes(rng.randrange(256) for _ in range(byte_length)) for _ in range(200)]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """Runs a test with NumPy, then with the plain Python paths (NumPy hidden from every module)."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        for module in (batch, export, query):
+            monkeypatch.setattr(module, "np", None)
+    return request.param
+
+
+@pytest.fixture
+def mixed_layout():
+    """Builds 48 flags (two labelled None) with an enum with undefined codes (at bit start), a split field and IntFields with table and callable labels."""
+    def build(start=1):
+        descriptors = [f"flag {index}" for index in range(48)]
+        mode = MultiBitValueParser({"00": "mode off", "01": "mode on", "10": "mode auto"})
+        split = MultiBitValueParser({"000": "a", "001": "b", "010": "c", "011": "d"}, SameValueRange(4, 7, 3, "split", return_value_instead_of_name=True))
+        descriptors[start:start + 2] = [mode, mode]
+        descriptors[8:9] = [split]
+        descriptors[10:12] = [split, split]
+        descriptors[20:32] = [IntField(12, "counter", labels={0: "idle"})] * 12
+        descriptors[33:38] = [IntField(5, "level", labels=lambda value: f"level {value * 10}%")] * 5
+        descriptors[40] = "flag 0"
+        descriptors[44] = descriptors[46] = None
+        return descriptors
+    return build
+
+
+@pytest.fixture
+def assert_parses_like():
+    """Checks that parser.parse() (and parse_full(), if full) of a record matches the layout, KeyErrors included.
+
+    Returns the layout's parse() result, or None when the record holds an undefined code.
+    """
+    def check(layout, parser, record, full=True):
+        try:
+            expected = layout.parse(record)
+        except KeyError as error:
+            with pytest.raises(KeyError) as raised:
+                parser.parse(record)
+            assert raised.value.args == error.args
+            return None
+        assert parser.parse(record) == expected
+        if full:
+            assert parser.parse_full(record) == layout.parse_full(record)
+        return expected
+    return check
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+import sys
+
+# insert at 1, 0 is the script path (or '' in REPL)
+if not '../bit-parser' in sys.path:
+    sys.path.insert(1, '../bit-parser')
+
+from BitParser.BitParser import IntField, compile_descriptors
+from BitParser.diff import diff_bits, BitfieldTracker
+
+
+@pytest.fixture
+def protocol(protocol):
+    # the shared layout with a 6-bit counter in front of the zone flags
+    return protocol[:8] + [IntField(6, "counter")] * 6 + protocol[8:10]
+
+
+class TestDiffBits:
+    def test_no_change(self, protocol):
+        assert diff_bits("8001", "8001", protocol) == []
+
+
+    def test_flag_and_field_events(self, protocol):
+        events = diff_bits("8001", "4406", protocol)
+        assert events == [
+            {"event": "cleared", "label": "door open", "descriptor_index": 0},
+            {"event": "changed", "name": None, "group_id": 0, "old_value": 0, "new_value": 2,
+             "old_label": "temperature OK", "new_label": "temperature too high"},
+            {"event": "set", "label": "pump on", "descriptor_index": 5},
+            {"event": "changed", "name": "counter", "group_id": 1, "old_value": 0, "new_value": 1,
+             "old_label": "counter: 0", "new_label": "counter: 1"},
+            {"event": "set", "label": "zone 1", "descriptor_index": 14},
+            {"event": "cleared", "label": "zone 2", "descriptor_index": 15},
+        ]
+
+
+    def test_events_match_full_parse(self, protocol):
+        rng = random.Random(20)
+        layout = compile_descriptors(protocol, bit_order="lsb", byte_order="little")
+        for _ in range(100):
+            old, new = (bytes(rng.randrange(256) for _ in range(2)) for _ in range(2))
+            before, after = layout.parse_full(old), layout.parse_full(new)
+            expected = []
+            for old_entry, new_entry in zip(before, after):
+                if old_entry["kind"] == "bit" and old_entry["label"] is not None and old_entry["enabled"] != new_entry["enabled"]:
+                    expected.append(("set" if new_entry["enabled"] else "cleared", new_entry["label"]))
+                elif old_entry["kind"] == "multi_bit" and old_entry["value_int"] != new_entry["value_int"]:
+                    expected.append(("changed", new_entry["label"]))
+            events = diff_bits(old, new, layout)
+            assert sorted((event["event"], event.get("label", event.get("new_label"))) for event in events) == sorted(expected)
+
+
+class TestBitfieldTracker:
+    def test_tracks_consecutive_samples(self, protocol):
+        tracker = BitfieldTracker(protocol)
+        assert tracker.update(b"\x80\x01") == []
+        assert tracker.update(b"\x80\x01") == []
+        assert [event["label"] for event in tracker.update(b"\x88\x01")] == ["fan on"]
+        assert tracker.value == 0x8801
+        tracker.reset()
+        assert tracker.update(b"\x00\x00") == []
+
+
+    def test_initial_sample_and_int_input(self, protocol):
+        tracker = BitfieldTracker(protocol, initial=0, input_format="int")
+        assert [event["event"] for event in tracker.update(0x0002)] == ["set"]
+        assert tracker.update(0x0002) == []
@@ -0,0 +1,84 @@
+import pytest
+import sys
+
+# insert at 1, 0 is the script path (or '' in REPL)
+if not '../bit-parser' in sys.path:
+    sys.path.insert(1, '../bit-parser')
+
+from BitParser.BitParser import MultiBitValueParser, SameValueRange, parse_bits_full
+from BitParser import export
+from BitParser.export import to_columns, to_dataframe, to_arrow
+
+
+@pytest.fixture
+def protocol():
+    mode = MultiBitValueParser({ "00": "mode 0",
+                                 "01": "mode 1",
+                                 "10": "mode 2",
+                                 "11": "mode 3"})
+    counter = MultiBitValueParser({"000": "idle"}, SameValueRange(1, 0b111, 3, "busy"))
+    return [ "heater on",
+             mode,
+             mode,
+             "fault",
+             counter,
+             counter,
+             counter,
+             "door open"]
+
+
+def expected_columns(records, descriptors):
+    columns = {"heater on": [], "mode": [], "mode label": [], "fault": [], "field:0:3": [], "field:0:3 label": [], "door open": []}
+    for record in records:
+        full = parse_bits_full(record, descriptors)
+        bits = [entry for entry in full if "bit_index" in entry]
+        summaries = [entry for entry in full if "value_int" in entry]
+        columns["heater on"].append(bits[0]["enabled"])
+        columns["fault"].append(bits[3]["enabled"])
+        columns["door open"].append(bits[7]["enabled"])
+        columns["mode"].append(summaries[0]["value_int"])
+        columns["mode label"].append(summaries[0]["label"])
+        columns["field:0:3"].append(summaries[1]["value_int"])
+        columns["field:0:3 label"].append(summaries[1]["label"])
+    return columns
+
+
+class TestExport:
+    def test_to_columns(self, backend, protocol, records):
+        columns = to_columns(records, protocol)
+        expected = expected_columns(records, protocol)
+        # "idle"/"busy" share no name, so the counter field is named by its address
+        assert list(columns) == list(expected)
+        for name, column in columns.items():
+            assert list(column) == expected[name]
+
+
+    def test_to_dataframe(self, protocol, records):
+        pytest.importorskip("pandas")
+        frame = to_dataframe(records, protocol)
+        expected = expected_columns(records, protocol)
+        assert frame.shape == (len(records), 7)
+        assert frame["heater on"].dtype == bool
+        assert str(frame["mode label"].dtype) == "category"
+        assert frame["mode"].tolist() == expected["mode"]
+        assert frame["mode label"].tolist() == expected["mode label"]
+
+
+    def test_to_arrow(self, protocol, records):
+        pa = pytest.importorskip("pyarrow")
+        table = to_arrow(records, protocol)
+        expected = expected_columns(records, protocol)
+        assert table.num_rows == len(records)
+        assert table.schema.field("fault").type == pa.bool_()
+        assert pa.types.is_dictionary(table.schema.field("mode label").type)
+        assert table.column("mode label").to_pylist() == expected["mode label"]
+        assert table.column("fault").to_pylist() == expected["fault"]
+
+
+    def test_missing_optional_dependencies(self, protocol, records, monkeypatch):
+        monkeypatch.setattr(export, "pd", None)
+        monkeypatch.setattr(export, "pa", None)
+        with pytest.raises(ImportError):
+            to_dataframe(records, protocol)
+        with pytest.raises(ImportError):
+            to_arrow(records, protocol)
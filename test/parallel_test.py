@@ -0,0 +1,41 @@
+import pytest
+import sys
+
+# insert at 1, 0 is the script path (or '' in REPL)
+if not '../bit-parser' in sys.path:
+    sys.path.insert(1, '../bit-parser')
+
+from BitParser.BitParser import parse_bits, parse_bits_full
+from BitParser.parallel import parse_bits_parallel
+
+
+def test_buffer_matches_sequential_parse(protocol, records):
+    result = list(parse_bits_parallel(b"".join(records), protocol, workers=2, chunksize=32))
+    assert result == [parse_bits(record, protocol) for record in records]
+
+
+def test_list_of_records_in_full_mode(protocol, records):
+    hex_records = [record.hex() for record in records]
+    result = list(parse_bits_parallel(hex_records, protocol, workers=2, chunksize=50, mode="full"))
+    assert result == [parse_bits_full(record, protocol) for record in records]
+
+
+def test_file_with_stride_and_offset(protocol, records, tmp_path):
+    # 5 byte records: 1 byte header, the 2 byte bitfield, 2 bytes trailer
+    path = tmp_path / "records.bin"
+    path.write_bytes(b"".join(b"\xAA" + record + b"\x00\xFF" for record in records))
+    result = list(parse_bits_parallel(path, protocol, workers=2, chunksize=37, stride=5, offset=1))
+    assert result == [parse_bits(record, protocol) for record in records]
+
+
+def test_empty_input(protocol):
+    assert list(parse_bits_parallel(b"", protocol, workers=1)) == []
+
+
+def test_invalid_arguments_fail_before_iteration(protocol):
+    with pytest.raises(ValueError, match="not a multiple"):
+        parse_bits_parallel(b"\x00" * 5, protocol)
+    with pytest.raises(ValueError, match="does not fit"):
+        parse_bits_parallel(b"\x00" * 6, protocol, stride=3, offset=2)
+    with pytest.raises(ValueError, match="Unknown mode"):
+        parse_bits_parallel(b"\x00" * 2, protocol, mode="columns")
@@ -0,0 +1,123 @@
+import pytest
+import sys
+
+# insert at 1, 0 is the script path (or '' in REPL)
+if not '../bit-parser' in sys.path:
+    sys.path.insert(1, '../bit-parser')
+
+from BitParser.BitParser import MultiBitValueParser, SameValueRange, IntField, compile_descriptors
+from BitParser.query import compile_query, query_bits
+
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
+
+
+@pytest.fixture
+def protocol():
+    mode = MultiBitValueParser({"00": "mode 0",
+                                "01": "mode 1",
+                                "10": "mode 2"},
+                               SameValueRange(0b11, 0b11, 2, "mode 3"))
+    status = IntField(3, "Status", labels={0: "idle", 3: "running"})
+    level = IntField(12, "level")
+    return [ "Heater ON",
+             "Fault",
+             mode,
+             mode,
+             status,
+             status,
+             status,
+             "Pump ON",
+             # Byte 1:
+             "Fan ON",
+             "RFU",
+             "RFU",
+             "Light ON",
+             level,
+             level,
+             level,
+             level,
+             # Byte 2:
+             level,
+             level,
+             level,
+             level,
+             level,
+             level,
+             level,
+             level]
+
+
+def reference(value):
+    """The fields of a payload int of the protocol fixture, decoded bit by bit."""
+    bits = format(value, "024b")
+    return {
+        "Heater ON": bits[0] == "1",
+        "Fault": bits[1] == "1",
+        "mode": int(bits[2:4], 2),
+        "Status": int(bits[4:7], 2),
+        "Pump ON": bits[7] == "1",
+        "Fan ON": bits[8] == "1",
+        "RFU:1:6": bits[9] == "1",
+        "level": int(bits[12:], 2),
+    }
+
+
+EXPRESSIONS = [
+    ('"Heater ON" and not "Fault" and Status == 3',
+     lambda f: f["Heater ON"] and not f["Fault"] and f["Status"] == 3),
+    ('"Fault" or "mode 2"', lambda f: f["Fault"] or f["mode"] == 2),
+    ('Status == "running" or Status > 5', lambda f: f["Status"] == 3 or f["Status"] > 5),
+    ('1 < Status <= 4 and not ("Pump ON" or "Fan ON")', lambda f: 1 < f["Status"] <= 4 and not (f["Pump ON"] or f["Fan ON"])),
+    ('level >= 2048 and mode != "mode 3"', lambda f: f["level"] >= 2048 and f["mode"] != 3),
+    ('level == "level: 100" or mode == 0', lambda f: f["level"] == 100 or f["mode"] == 0),
+    ('Status and "Heater ON" == 0', lambda f: f["Status"] != 0 and not f["Heater ON"]),
+    ('"RFU:1:6" or "mode 1" and "idle"', lambda f: f["RFU:1:6"] or (f["mode"] == 1 and f["Status"] == 0)),
+    ('Status < 0 or level > 4095', lambda f: False),
+    ('Status <= 7', lambda f: True),
+]
+
+
+class TestQuery:
+    def test_expressions_match_decoded_fields(self, protocol, records):
+        layout = compile_descriptors(protocol)
+        values = [int.from_bytes(record, "big") for record in records]
+        values += [0b10_00_011_0 << 16, 0b10_00_011_1 << 16, 0b11_00_011_0 << 16]
+        records = [value.to_bytes(3, "big") for value in values]
+        for expression, expected in EXPRESSIONS:
+            query = compile_query(expression, layout)
+            matching = [index for index, value in enumerate(values) if expected(reference(value))]
+            assert query.indices(records) == matching, expression
+            assert [query.test_int(value) for value in values] == [index in matching for index in range(len(values))]
+            assert query.filter([record.hex() for record in records]) == [records[index].hex() for index in matching]
+            if np is not None:
+                matrix = np.frombuffer(b"".join(records), dtype=np.uint8).reshape(-1, 3)
+                assert query.indices(matrix) == matching, expression
+                assert query.filter(matrix).tolist() == matrix[matching].tolist()
+                assert query.mask(matrix.reshape(-1)).tolist() == query.mask(records)
+
+    def test_conjunctions_fold_into_one_mask(self, protocol):
+        query = compile_query('"Heater ON" and not "Fault" and Status == 3 and "mode 1"', protocol)
+        assert query.node == ("match", 0b11111110 << 16, 0b10_01_011_0 << 16)
+        assert query(b"\x96\x00\x00") and query("96FFFF")
+        assert not query(b"\xd6\x00\x00")
+        assert compile_query('"Fault" and "Fault" == 0', protocol).node == ("const", False)
+
+    def test_parse_decodes_matching_rows_only(self, protocol):
+        layout = compile_descriptors(protocol)
+        records = [b"\x96\x00\x01", b"\x00\x00\x00", b"\x96\x80\x00"]
+        query = compile_query('"Heater ON" and Status == "running"', layout)
+        assert query.parse(records) == [(0, layout.parse(records[0])), (2, layout.parse(records[2]))]
+        assert query.parse(records, full=True)[1] == (2, layout.parse_full(records[2]))
+        assert query_bits(records, '"Fan ON"', layout) == [b"\x96\x80\x00"]
+        if np is not None:
+            matrix = np.frombuffer(b"".join(records), dtype=np.uint8).reshape(-1, 3)
+            assert query.parse(matrix) == query.parse(records)
+
+    def test_invalid_expressions(self, protocol):
+        for expression in ['"Heater ON" and', '"Overheat"', 'Status == "boost"', 'Status < "running"',
+                           '"RFU"', 'Status in (1, 2)', 'Status == 1.5', '"Fault" + 1', '3 == 3']:
+            with pytest.raises(ValueError):
+                compile_query(expression, protocol)
@@ -0,0 +1,166 @@
+import json
+import os
+
+import pytest
+import sys
+
+# insert at 1, 0 is the script path (or '' in REPL)
+if not '../bit-parser' in sys.path:
+    sys.path.insert(1, '../bit-parser')
+
+from BitParser.BitParser import MultiBitValueParser, SameValueRange, IntField, compile_descriptors, describe_bits
+from BitParser import schema as schema_module
+from BitParser.schema import layout_to_schema, descriptors_from_schema, compile_schema, dump_layout, load_layout, LayoutRegistry
+
+try:
+    import yaml
+except ModuleNotFoundError:
+    yaml = None
+
+
+@pytest.fixture
+def protocol():
+    heating_mode = MultiBitValueParser({ "0000": "heating mode off",
+                                         "0001": "heating mode 1",
+                                         "0010": "heating mode 2"},
+                                         SameValueRange(0b0011, 0b1111, 4, "RFU"))
+    status = MultiBitValueParser({  "00": "temperature OK",
+                                    "01": "temperature too low",
+                                    "10": "temperature too high",
+                                    "11": "broken sensor"})
+    sensor_id = MultiBitValueParser(SameValueRange(0b000, 0b111, 3, "sensor ID", return_value_instead_of_name=True))
+    counter = IntField(10, "counter", labels={0: "idle", 1023: "overflow"})
+    return [ sensor_id,
+             sensor_id,
+             sensor_id,
+             status,
+             status,
+             "LED is ON",
+             heating_mode,
+             heating_mode,
+             # Byte 1:
+             heating_mode,
+             heating_mode,
+             "heating module 1 on",
+             "heating module 2 on",
+             "RFU",
+             "RFU",
+             counter,
+             counter,
+             # Byte 2:
+             counter,
+             counter,
+             counter,
+             counter,
+             counter,
+             counter,
+             counter,
+             counter]
+
+
+def assert_same_layout(first, second, records):
+    assert first.describe() == second.describe()
+    for record in records:
+        assert first.parse(record) == second.parse(record)
+        assert first.parse_full(record) == second.parse_full(record)
+    assert first.encode(["LED is ON", "temperature too low"], {"sensor ID": 5, "heating mode": 2, "counter": 1023}) == \
+        second.encode(["LED is ON", "temperature too low"], {"sensor ID": 5, "heating mode": 2, "counter": 1023})
+
+
+class TestSchema:
+    def test_describe_round_trip(self, protocol, records):
+        for options in ({}, {"bit_order": "lsb", "byte_order": "little"}):
+            layout = compile_descriptors(protocol, **options)
+            schema = layout_to_schema(layout)
+            assert json.loads(json.dumps(schema)) == schema
+            rebuilt = compile_schema(json.loads(json.dumps(schema)))
+            assert (rebuilt.bit_order, rebuilt.byte_order) == (layout.bit_order, layout.byte_order)
+            assert_same_layout(layout, rebuilt, records)
+            assert layout_to_schema(rebuilt) == schema
+
+        assert describe_bits(descriptors_from_schema(describe_bits(protocol))) == describe_bits(protocol)
+
+        # adjacent values sharing a label come back as one range, like the schema's own
+        power = MultiBitValueParser({"00": "off", "01": "off", "10": "on", "11": "on"})
+        level = IntField(8, "level", labels={1: "low", 2: "low", 3: "high"})
+        layout = compile_descriptors([power, power] + [level] * 8 + ["a"] * 6)
+        rebuilt = compile_schema(json.loads(json.dumps(layout_to_schema(layout))))
+        assert rebuilt.describe() == layout.describe()
+        assert [item["label"] for item in layout.describe()["multi_bit"][0]["ranges"]] == ["off", "on"]
+
+    def test_hand_written_schema(self):
+        schema = {
+            "bits": ["door open", {"group_id": 0}, {"group_id": 0}, "heater on", "fan on", "pump on", "light on",
+                     {"kind": "bit", "label": "alarm"}],
+            "multi_bit": [{
+                "group_id": 0,
+                "name": "state",
+                "num_bits": 2,
+                "values": [{"bits": "00", "label": "idle"}, {"value_int": 1, "label": "running"}],
+                "ranges": [{"start": 0, "end": 0, "label": "idle"}, {"start": 1, "end": 3, "label": "running"}],
+            }],
+        }
+        layout = compile_schema(schema)
+        assert layout.parse("F1") == ["door open", "running", "heater on", "alarm"]
+        assert layout.encode(["idle", "fan on"]) == "08"
+        assert layout.describe()["multi_bit"][0]["name"] == "state"
+
+        del schema["multi_bit"][0]["ranges"]
+        assert compile_schema(schema).parse("00") == ["idle"]
+        with pytest.raises(KeyError):
+            compile_schema(schema).parse("E1")
+
+        for broken in ({"bits": ["a"] * 7 + [{"group_id": 3}]},
+                       {"bits": ["a"] * 8, "byte_length": 2},
+                       {"bits": [{"group_id": 0}] + ["a"] * 7, "multi_bit": [{"group_id": 0, "num_bits": 2, "values": [{"bits": "00", "label": "x"}]}]},
+                       {"multi_bit": []}):
+            with pytest.raises(ValueError):
+                compile_schema(broken)
+
+    def test_load_layout_uses_the_pickle_cache(self, protocol, tmp_path, monkeypatch):
+        path = tmp_path / "thermostat.json"
+        dump_layout(protocol, path)
+        cache_dir = tmp_path / "cache"
+        layout = load_layout(path, cache_dir=cache_dir)
+        assert_same_layout(layout, compile_descriptors(protocol), [b"\x48\xf0\x01"])
+        assert len(os.listdir(cache_dir)) == 1
+
+        # a warm start never parses or compiles the schema
+        monkeypatch.setattr(schema_module, "compile_schema", None)
+        cached = load_layout(path, cache_dir=cache_dir)
+        assert cached is not layout
+        assert_same_layout(cached, layout, [b"\x48\xf0\x01", b"\xff\xff\xff"])
+        assert cached._name_to_groups is not None
+
+        # changed content gets its own entry; unreadable entries are rebuilt
+        monkeypatch.undo()
+        path.write_text(path.read_text().replace("LED is ON", "LED on"))
+        assert "LED on" in load_layout(path, cache_dir=cache_dir).parse("04FFFF")
+        assert len(os.listdir(cache_dir)) == 2
+        for entry in os.listdir(cache_dir):
+            (cache_dir / entry).write_bytes(b"garbage")
+        assert "LED on" in load_layout(path, cache_dir=cache_dir).parse("04FFFF")
+        assert load_layout(layout_to_schema(protocol), cache_dir=cache_dir).describe() == layout.describe()
+
+        with pytest.raises(ValueError):
+            load_layout(tmp_path / "thermostat.txt")
+
+    @pytest.mark.skipif(yaml is None, reason="PyYAML is not installed")
+    def test_yaml_registry(self, protocol, tmp_path):
+        dump_layout(protocol, tmp_path / "thermostat.yaml")
+        dump_layout(protocol[:5] + ["a", "b", "c"], tmp_path / "sensor.yml")
+        (tmp_path / "notes.txt").write_text("not a layout")
+        registry = LayoutRegistry(tmp_path, cache_dir=tmp_path / "cache")
+        registry.register("inline", ["flag"] * 8)
+        assert registry.names() == ["inline", "sensor", "thermostat"]
+        assert "sensor" in registry and len(registry) == 3
+        assert not (tmp_path / "cache").exists()
+
+        thermostat = registry["thermostat"]
+        assert registry.get("thermostat") is thermostat
+        assert_same_layout(thermostat, compile_descriptors(protocol), [b"\x48\xf0\x01"])
+        assert registry["sensor"].parse("49") == ["sensor ID: 2", "temperature too low", "c"]
+        assert registry["inline"].parse("80") == ["flag"]
+        assert len(os.listdir(tmp_path / "cache")) == 2
+        with pytest.raises(KeyError):
+            registry.get("missing")
@@ -0,0 +1,55 @@
+import linecache
+import random
+
+import pytest
+import sys
+
+# insert at 1, 0 is the script path (or '' in REPL)
+if not '../bit-parser' in sys.path:
+    sys.path.insert(1, '../bit-parser')
+
+from BitParser.BitParser import MultiBitValueParser, compile_descriptors
+from BitParser.bench import build_layout
+
+
+class TestSpecialize:
+    @pytest.mark.parametrize("byte_length,density", [(1, 0.0), (2, 0.5), (8, 0.25), (16, 0.75), (64, 0.1)])
+    def test_generated_layouts(self, byte_length, density, assert_parses_like):
+        rng = random.Random(byte_length)
+        descriptors, _, _ = build_layout(byte_length, density, seed=byte_length)
+        for options in ({}, {"lut_max_tables": 0}, {"bit_order": "lsb", "byte_order": "little"}):
+            layout = compile_descriptors(descriptors, **options)
+            specialized = layout.specialize()
+            for _ in range(50):
+                assert_parses_like(layout, specialized, bytes(rng.randrange(256) for _ in range(byte_length)))
+
+    def test_mixed_layouts(self, mixed_layout, assert_parses_like):
+        rng = random.Random(24)
+        for _ in range(10):
+            descriptors = mixed_layout(start=rng.randrange(4))
+            for bit_order in ("msb", "lsb"):
+                for byte_order in ("big", "little"):
+                    layout = compile_descriptors(descriptors, bit_order=bit_order, byte_order=byte_order)
+                    specialized = layout.specialize()
+                    for _ in range(30):
+                        assert_parses_like(layout, specialized, bytes(rng.randrange(256) for _ in range(6)))
+
+    def test_straight_line_source_and_inputs(self, tmp_path, capsys):
+        layout = compile_descriptors(["flag"] * 6 + [MultiBitValueParser({"00": "x", "01": "y", "10": "z", "11": "w"})] * 2)
+        specialized = layout.specialize()
+        for statement in ("for ", "while ", "isinstance"):
+            assert statement not in specialized.source
+        assert "if value & 0x80:" in specialized.source
+        assert specialized.parse("C1") == ["flag", "flag", "y"]
+        assert specialized.parse(b"\x00\xc1", offset=1) == ["flag", "flag", "y"]
+        assert specialized.parse(0xC1, input_format="int") == specialized.parse_int(0xC1) == ["flag", "flag", "y"]
+        assert specialized.parse_full("C1", input_format="hex") == layout.parse_full("C1")
+        assert capsys.readouterr().err == ""
+
+        layout.specialize(debug=True)
+        assert capsys.readouterr().err == specialized.source
+        dumped = tmp_path / "layout.py"
+        debug = layout.specialize(debug=dumped)
+        assert dumped.read_text() == debug.source
+        filename = debug._parse_value.__code__.co_filename
+        assert linecache.getline(filename, 1).startswith("def specialize(")
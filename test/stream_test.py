@@ -0,0 +1,185 @@
+import asyncio
+import io
+import mmap
+import random
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import sys
+
+# insert at 1, 0 is the script path (or '' in REPL)
+if not '../bit-parser' in sys.path:
+    sys.path.insert(1, '../bit-parser')
+
+from BitParser.BitParser import parse_bits, parse_bits_full
+from BitParser.stream import iter_parse, aparse_stream
+
+
+@pytest.fixture
+def protocol(protocol):
+    # three byte frames: the shared layout and a reserved byte
+    return protocol + ["RFU"] * 8
+
+
+@pytest.fixture
+def payload(records):
+    return b"".join(records)
+
+
+def expected_labels(payload, descriptors):
+    return [parse_bits(payload[offset:offset + 3], descriptors) for offset in range(0, len(payload), 3)]
+
+
+class TestIterParse:
+    def test_file_object(self, protocol, payload):
+        assert list(iter_parse(io.BytesIO(payload), protocol, chunk_size=64)) == expected_labels(payload, protocol)
+
+
+    def test_buffers(self, protocol, payload):
+        expected = expected_labels(payload, protocol)
+        assert list(iter_parse(payload, protocol)) == expected
+        assert list(iter_parse(bytearray(payload), protocol)) == expected
+        assert list(iter_parse(memoryview(payload), protocol)) == expected
+
+
+    def test_mmap(self, protocol, payload, tmp_path):
+        path = tmp_path / "frames.bin"
+        path.write_bytes(payload)
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # a buffer is parsed whole, whatever its seek position
+            mapped.seek(2)
+            assert list(iter_parse(mapped, protocol)) == expected_labels(payload, protocol)
+
+
+    def test_chunks_spanning_frames(self, protocol, payload):
+        rng = random.Random(3)
+        chunks = []
+        offset = 0
+        while offset < len(payload):
+            size = rng.randrange(1, 8)
+            chunks.append(payload[offset:offset + size])
+            offset += size
+        assert list(iter_parse(iter(chunks), protocol)) == expected_labels(payload, protocol)
+
+
+    def test_read_only_object(self, protocol, payload):
+        class Reader:
+            def __init__(self, data):
+                self.stream = io.BytesIO(data)
+
+            def read(self, size):
+                return self.stream.read(size)
+
+        assert list(iter_parse(Reader(payload), protocol, chunk_size=10)) == expected_labels(payload, protocol)
+
+
+    def test_socket(self, protocol, payload):
+        left, right = socket.socketpair()
+
+        def send():
+            for offset in range(0, len(payload), 100):
+                left.sendall(payload[offset:offset + 100])
+            left.close()
+
+        sender = threading.Thread(target=send)
+        sender.start()
+        try:
+            assert list(iter_parse(right, protocol)) == expected_labels(payload, protocol)
+        finally:
+            sender.join()
+            right.close()
+
+
+    def test_full_mode(self, protocol, payload):
+        results = list(iter_parse(io.BytesIO(payload[:30]), protocol, mode="full"))
+        assert results == [parse_bits_full(payload[offset:offset + 3], protocol) for offset in range(0, 30, 3)]
+
+
+    def test_partial_frame(self, protocol, payload):
+        parsed = iter_parse(io.BytesIO(payload[:7]), protocol)
+        assert next(parsed) == parse_bits(payload[:3], protocol)
+        assert next(parsed) == parse_bits(payload[3:6], protocol)
+        with pytest.raises(ValueError):
+            next(parsed)
+        with pytest.raises(ValueError):
+            list(iter_parse([payload[:2], payload[2:4]], protocol))
+
+
+    def test_unknown_mode(self, protocol):
+        with pytest.raises(ValueError):
+            list(iter_parse(b"", protocol, mode="fast"))
+        with pytest.raises(ValueError):
+            list(iter_parse(b"", []))
+
+
+
+async def collect_from_loopback(payload, descriptors, chunk=100, **options):
+    async def serve(reader, writer):
+        for offset in range(0, len(payload), chunk):
+            writer.write(payload[offset:offset + chunk])
+            await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        return [result async for result in aparse_stream(reader, descriptors, **options)]
+    finally:
+        writer.close()
+        server.close()
+        await server.wait_closed()
+
+
+class TestAparseStream:
+    def test_loopback_labels(self, protocol, payload):
+        results = asyncio.run(collect_from_loopback(payload, protocol, chunk=7, batch_frames=4))
+        assert results == expected_labels(payload, protocol)
+
+
+    def test_loopback_full_mode_on_executor(self, protocol, payload):
+        with ThreadPoolExecutor(2) as executor:
+            results = asyncio.run(collect_from_loopback(payload, protocol, mode="full", executor=executor, batch_frames=16, max_pending=2))
+        assert results == [parse_bits_full(payload[offset:offset + 3], protocol) for offset in range(0, len(payload), 3)]
+
+
+    def test_partial_frame(self, protocol, payload):
+        with pytest.raises(ValueError, match="partial frame"):
+            asyncio.run(collect_from_loopback(payload[:8], protocol, chunk=3))
+        with ThreadPoolExecutor(1) as executor:
+            with pytest.raises(ValueError, match="partial frame"):
+                asyncio.run(collect_from_loopback(payload[:8], protocol, chunk=3, executor=executor))
+
+
+    def test_bounded_read_ahead(self, protocol, payload):
+        class CountingReader:
+            def __init__(self, reader):
+                self.reader = reader
+                self.reads = 0
+
+            async def read(self, size):
+                self.reads += 1
+                return await self.reader.read(size)
+
+            async def readexactly(self, size):
+                return await self.reader.readexactly(size)
+
+        async def run():
+            stream = asyncio.StreamReader()
+            stream.feed_data(payload)
+            stream.feed_eof()
+            reader = CountingReader(stream)
+            with ThreadPoolExecutor(1) as executor:
+                parsed = aparse_stream(reader, protocol, executor=executor, batch_frames=1, max_pending=2)
+                first = await parsed.__anext__()
+                await asyncio.sleep(0.05)
+                reads = reader.reads
+                await parsed.aclose()
+            return first, reads
+
+        first, reads = asyncio.run(run())
+        assert first == parse_bits(payload[:3], protocol)
+        # one block consumed, max_pending queued and one waiting to be queued
+        assert reads <= 4